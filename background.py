@@ -0,0 +1,169 @@
+import math
+import random
+
+import numpy as np
+import pygame
+
+from seeding import subsystem_numpy, subsystem_random
+
+
+class Nebula:
+    def __init__(self, width, height, color, num_points=100, rng=random):
+        self.width = width
+        self.height = height
+        self.color = color
+        self.points = []
+        self.num_points = num_points
+        self.generate_points(rng)
+
+    def generate_points(self, rng):
+        center_x = self.width // 2
+        center_y = self.height // 2
+        for i in range(self.num_points):
+            angle = (2 * math.pi * i) / self.num_points
+            radius = rng.uniform(100, 300)
+            x = center_x + radius * math.cos(angle)
+            y = center_y + radius * math.sin(angle)
+            self.points.append((x, y))
+
+    def draw(self, surface):
+        # Opaque target surface, so the line color is drawn without alpha
+        for i in range(len(self.points)):
+            p1 = self.points[i]
+            p2 = self.points[(i + 1) % len(self.points)]
+            pygame.draw.line(surface, self.color, p1, p2, 2)
+
+
+# Pixel offsets covered by pygame.draw.circle for an integer radius
+def _circle_offsets(radius):
+    dim = 2 * radius + 3
+    stamp = pygame.Surface((dim, dim))
+    pygame.draw.circle(stamp, (255, 255, 255), (radius + 1, radius + 1), radius)
+    dx, dy = np.nonzero(pygame.surfarray.array2d(stamp))
+    return dx - (radius + 1), dy - (radius + 1)
+
+
+# Deep space fill, nebula and twinkling starfield. Everything static is
+# rendered once into `base`; per frame the base is blitted and the star
+# pixels are rewritten in one vectorized pass from a brightness array.
+# width and height are logical; scale sets the pixel size of the surface it
+# draws to (see viewport.Viewport), and star_rects are in those pixels.
+class Background:
+    def __init__(self, width, height, color, nebula_color, num_stars=200, seed=None, scale=1.0):
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        self.rng = subsystem_numpy(seed, "stars") if seed is not None else np.random.default_rng()
+        self.seed = seed
+        self.color = color
+        self.nebula_color = nebula_color
+        self.base = pygame.Surface(self.size)
+        self.set_nebula_detail(100)
+        self.tick = 0
+        self._luts = {}
+        # Every star generated so far; set_star_count shows a prefix
+        self._stars_x = self._stars_y = self._stars_radius = np.zeros(0, dtype=np.intp)
+        self._stars_brightness = self._stars_twinkle = np.zeros(0)
+        self.set_star_count(num_stars)
+
+    def set_nebula_detail(self, num_points):
+        # Re-bake the static layer with a nebula outline of num_points points
+        nebula_rng = subsystem_random(self.seed, "nebula") if self.seed is not None else random
+        self.nebula = Nebula(self.width, self.height, self.nebula_color, num_points, rng=nebula_rng)
+        if self.scale == 1.0:
+            self.base.fill(self.color)
+            self.nebula.draw(self.base)
+        else:
+            layer = pygame.Surface((self.width, self.height))
+            layer.fill(self.color)
+            self.nebula.draw(layer)
+            pygame.transform.smoothscale(layer, self.size, self.base)
+
+    def set_star_count(self, num_stars):
+        # Shows the first num_stars stars of a fixed set, so lowering the
+        # count removes stars and raising it brings the same ones back
+        self._add_stars(num_stars)
+        self.num_stars = num_stars
+        x = self._stars_x[:num_stars]
+        y = self._stars_y[:num_stars]
+        radius = self._stars_radius[:num_stars]
+        self.initial_brightness = self._stars_brightness[:num_stars]
+        self.twinkle_speed = self._stars_twinkle[:num_stars]
+        if self.scale != 1.0:
+            x = (x * self.scale).astype(np.intp)
+            y = (y * self.scale).astype(np.intp)
+            radius = np.maximum((radius * self.scale).astype(np.intp), 1)
+        width, height = self.size
+
+        # Flatten every star into the screen pixels it covers
+        px, py, owner = [], [], []
+        for r in np.unique(radius).tolist():
+            stars = np.flatnonzero(radius == r)
+            dx, dy = _circle_offsets(r)
+            px.append((x[stars, None] + dx).ravel())
+            py.append((y[stars, None] + dy).ravel())
+            owner.append(np.repeat(stars, len(dx)))
+        px = np.concatenate(px) if px else np.zeros(0, dtype=np.intp)
+        py = np.concatenate(py) if py else np.zeros(0, dtype=np.intp)
+        owner = np.concatenate(owner) if owner else np.zeros(0, dtype=np.intp)
+        visible = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        self._px = px[visible]
+        self._py = py[visible]
+        self._owner = owner[visible]
+        # Screen area of each star, for partial display updates
+        screen_rect = pygame.Rect(0, 0, width, height)
+        self.star_rects = [pygame.Rect(sx - r - 1, sy - r - 1, 2 * r + 3, 2 * r + 3).clip(screen_rect)
+                           for sx, sy, r in zip(x.tolist(), y.tolist(), radius.tolist())]
+        self._levels = None
+
+    def _add_stars(self, num_stars):
+        # Generates stars up to num_stars; ones already made never change
+        count = num_stars - len(self._stars_x)
+        if count <= 0:
+            return
+        rng = self.rng
+        x = rng.integers(0, self.width, count, endpoint=True)
+        y = rng.integers(0, self.height, count, endpoint=True)
+        radius = rng.uniform(1, 3, count).astype(np.intp)  # draw.circle truncates
+        brightness = rng.uniform(0.3, 1.0, count)
+        twinkle = rng.uniform(0.02, 0.05, count)
+        self._stars_x = np.concatenate((self._stars_x, x))
+        self._stars_y = np.concatenate((self._stars_y, y))
+        self._stars_radius = np.concatenate((self._stars_radius, radius))
+        self._stars_brightness = np.concatenate((self._stars_brightness, brightness))
+        self._stars_twinkle = np.concatenate((self._stars_twinkle, twinkle))
+
+    def update(self):
+        self.tick += 1
+
+    def brightness(self):
+        # Triangle wave between 0.3 and 1.0, starting upwards from the initial brightness
+        phase = np.mod(self.initial_brightness - 0.3 + self.twinkle_speed * self.tick, 1.4)
+        return 0.3 + np.where(phase <= 0.7, phase, 1.4 - phase)
+
+    def _lut(self, surface):
+        key = (surface.get_bitsize(), surface.get_masks())
+        lut = self._luts.get(key)
+        if lut is None:
+            lut = self._luts[key] = np.array([surface.map_rgb((v, v, v)) for v in range(256)], dtype=np.int64)
+        return lut
+
+    def draw(self, surface):
+        surface.blit(self.base, (0, 0))
+        self.draw_stars(surface)
+
+    def draw_stars(self, surface):
+        # Writes every star pixel; returns the indices of the stars whose
+        # brightness changed since the previous call
+        if not len(self._owner):
+            return []
+        levels = (255 * self.brightness()).astype(np.intp)
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[self._px, self._py] = self._lut(surface)[levels[self._owner]].astype(pixels.dtype)
+        del pixels  # Unlock the surface
+        previous = self._levels
+        self._levels = levels
+        if previous is None:
+            return list(range(self.num_stars))
+        return np.flatnonzero(levels != previous).tolist()
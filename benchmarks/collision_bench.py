@@ -0,0 +1,98 @@
+"""Bullet/debris collision benchmark.
+
+Times the spatial-hash broad phase and the vectorized NumPy version (used
+by GameWorld) against the brute-force reference as the entity count grows
+(tests/test_collision.py checks that all three agree). The last table
+compares the circle approximation with pixel-exact mask collision on real
+asteroid shapes: how many hits differ and what each costs per tick.
+
+    python benchmarks/collision_bench.py
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import space_shooter  # noqa: E402
+from collision import SpatialHash, find_hits, find_hits_arrays, find_hits_brute_force, find_mask_hits  # noqa: E402
+from debris_field import DebrisField  # noqa: E402
+
+WIDTH, HEIGHT = 800, 600
+
+
+def random_scene(rng, num_bullets, num_debris):
+    bullets = [(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for _ in range(num_bullets)]
+    debris = []
+    for _ in range(num_debris):
+        size = rng.randint(25, 40)
+        debris.append((rng.randint(0, WIDTH - size) + size // 2, rng.uniform(-size, HEIGHT) + size // 2, size // 2))
+    return bullets, debris
+
+
+def as_arrays(bullets, debris):
+    points_x, points_y = np.array(bullets, dtype=float).reshape(-1, 2).T
+    centers_x, centers_y, radii = np.array(debris, dtype=float).reshape(-1, 3).T
+    return points_x, points_y, centers_x, centers_y, radii
+
+
+def best_time(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_masks(rng):
+    space_shooter.init_display()
+    world = space_shooter.GameWorld(seed=3)
+    point_mask = space_shooter.bullet_mask(3)
+    print(f"{'bullets':>8} {'debris':>8} {'circle ms':>10} {'mask ms':>10} {'circle hits':>12} {'mask hits':>10}")
+    for count in (100, 300, 1000):
+        field = DebrisField(capacity=count, view=space_shooter.Debris)
+        field.extend([space_shooter.random_debris(1.0, world.rng) for _ in range(count)])
+        field.y[:count] = [rng.uniform(0, HEIGHT) for _ in range(count)]
+        for debris in field:
+            debris.mask()  # Masks are cached per shape and frame; time the steady state
+        points_x = np.array([rng.uniform(0, WIDTH) for _ in range(count // 2)])
+        points_y = np.array([rng.uniform(0, HEIGHT) for _ in range(count // 2)])
+        x, y, size = field.x[:count], field.y[:count], field.size[:count]
+
+        def circle():
+            return find_hits_arrays(points_x, points_y, x + size // 2, y + size // 2, size // 2)
+
+        def exact():
+            return find_mask_hits(points_x, points_y, point_mask, x + size / 2, y + size / 2, size * 0.6 + 2,
+                                  lambda i: field[i].mask())
+        circle_hits = circle()
+        mask_hits = exact()
+        circle_ms = best_time(circle)
+        mask_ms = best_time(exact)
+        print(f"{len(points_x):>8} {count:>8} {circle_ms:>10.2f} {mask_ms:>10.2f} "
+              f"{len(circle_hits):>12} {len(mask_hits):>10}")
+
+
+def main():
+    rng = random.Random(2)
+    grid = SpatialHash()
+    print(f"{'bullets':>8} {'debris':>8} {'brute ms':>10} {'hash ms':>10} {'numpy ms':>10}")
+    for count in (50, 200, 1000, 3000):
+        bullets, debris = random_scene(rng, count, count)
+        arrays = as_arrays(bullets, debris)
+        brute = best_time(lambda: find_hits_brute_force(bullets, debris)) if count <= 1000 else float("nan")
+        hashed = best_time(lambda: find_hits(bullets, debris, grid))
+        vectorized = best_time(lambda: find_hits_arrays(*arrays))
+        print(f"{count:>8} {count:>8} {brute:>10.2f} {hashed:>10.2f} {vectorized:>10.2f}")
+    print()
+    bench_masks(rng)
+
+
+if __name__ == "__main__":
+    main()
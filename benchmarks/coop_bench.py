@@ -0,0 +1,109 @@
+"""Co-op server scaling benchmark.
+
+Starts a CoopServer on localhost with 1, 2, 4 and 8 bot clients in turn,
+all in this process, and lets each session run for --seconds. Bots steer
+towards random spots, fire now and then and interpolate a view every
+frame like a real client. The columns are:
+
+- server tick time, mean and 99th percentile (simulation, snapshot
+  quantization and per-client delta encoding);
+- snapshot bandwidth per client, downstream and upstream, in payload
+  bytes (IP/UDP headers add 28 bytes per datagram);
+- how many snapshots went out without a baseline (in full);
+- whether every client's newest decoded snapshot equals what the server
+  sent for that tick.
+
+    python benchmarks/coop_bench.py
+    python benchmarks/coop_bench.py --players 8 --max-debris 200 --snapshot-interval 1
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from multiplayer import MAX_PLAYERS, CoopClient, CoopServer  # noqa: E402
+from space_shooter import TICK_RATE, WINDOW_WIDTH  # noqa: E402
+
+
+async def bot(client, rng, stop):
+    target = rng.randrange(WINDOW_WIDTH)
+    while not stop.is_set():
+        view = client.view()
+        x = target
+        if view is not None:
+            rows = np.flatnonzero(view.players["id"] == client.player_id)
+            if len(rows):
+                x = view.players_x[rows[0]] + 20
+        if abs(x - target) < 10 or rng.random() < 0.01:
+            target = rng.randrange(WINDOW_WIDTH)
+        client.send_input(x > target + 5, x < target - 5, rng.random() < 0.2)
+        await asyncio.sleep(1 / TICK_RATE)
+
+
+def decoded_ok(server, clients):
+    players = {player.player_id: player for player in server.players.values()}
+    for client in clients:
+        state = client.latest
+        sent = players[client.player_id].sent.get(state.tick) if state is not None else None
+        if sent is None or not all(np.array_equal(getattr(state, name), getattr(sent, name))
+                                   for name in ("players", "bullets", "debris")):
+            return False
+    return True
+
+
+async def session(num_players, args):
+    server = CoopServer(args.snapshot_interval, max_debris=args.max_debris, seed=args.seed)
+    host, port = await server.start("127.0.0.1", 0)
+    server.world.invulnerable = True  # Keep everyone playing for the whole session
+    clients = [CoopClient() for _ in range(num_players)]
+    for client in clients:
+        await client.connect(host, port)
+    stop = asyncio.Event()
+    bots = [asyncio.create_task(bot(client, random.Random(args.seed + index), stop))
+            for index, client in enumerate(clients)]
+    await server.serve(args.seconds)
+    stop.set()
+    await asyncio.gather(*bots)
+    await asyncio.sleep(0.05)  # Let the last snapshots arrive
+    stats = server.stats()
+    ok = decoded_ok(server, clients)
+    for client in clients:
+        client.close()
+    server.close()
+    return stats, ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, nargs="*", default=[1, 2, 4, 8], help=f"at most {MAX_PLAYERS}")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--snapshot-interval", type=int, default=2, help="ticks between snapshots")
+    parser.add_argument("--max-debris", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    if max(args.players) > MAX_PLAYERS:
+        parser.error(f"at most {MAX_PLAYERS} players")
+
+    print(f"{'players':>7} {'ticks/s':>8} {'tick ms':>8} {'p99 ms':>8} {'down KB/s':>10} {'up KB/s':>8} "
+          f"{'full':>9} {'decoded':>8}")
+    for num_players in args.players:
+        stats, ok = asyncio.run(session(num_players, args))
+        clients = stats["clients"]
+        down = sum(client["down_bps"] for client in clients) / len(clients)
+        up = sum(client["up_bps"] for client in clients) / len(clients)
+        full = sum(client["full_snapshots"] for client in clients)
+        sent = sum(client["snapshots"] for client in clients)
+        print(f"{num_players:>7} {stats['ticks'] / args.seconds:>8.1f} {stats['tick_ms']:>8.3f} "
+              f"{stats['tick_ms_p99']:>8.3f} {down / 1024:>10.2f} {up / 1024:>8.2f} {f'{full}/{sent}':>9} "
+              f"{'ok' if ok else 'FAILED':>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
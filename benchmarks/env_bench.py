@@ -0,0 +1,77 @@
+"""Agent environment throughput benchmark.
+
+Times a single ShooterEnv stepping with random actions. It then times a
+VectorEnv with 1, 2, 4, ... worker processes, up to the CPU count or
+--workers. Each worker runs --envs-per-worker games. The efficiency
+column is the vector throughput divided by (workers x single-env
+throughput); 100% means perfectly linear scaling.
+
+    python benchmarks/env_bench.py
+    python benchmarks/env_bench.py --workers 8 --envs-per-worker 16 --seconds 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shooter_env import NUM_ACTIONS, ShooterEnv, VectorEnv  # noqa: E402
+
+
+def bench_single(seconds, max_steps, seed):
+    env = ShooterEnv(max_steps=max_steps)
+    env.reset(seed)
+    rng = np.random.default_rng(seed)
+    steps = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        _, _, terminated, truncated, _ = env.step(int(rng.integers(NUM_ACTIONS)))
+        steps += 1
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def bench_vector(workers, envs_per_worker, seconds, max_steps, seed):
+    num_envs = workers * envs_per_worker
+    rng = np.random.default_rng(seed)
+    with VectorEnv(num_envs, num_workers=workers, max_steps=max_steps) as env:
+        env.reset(seed)
+        steps = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            env.step(rng.integers(NUM_ACTIONS, size=num_envs))
+            steps += num_envs
+        return steps / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="largest worker count to try")
+    parser.add_argument("--envs-per-worker", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0, help="time per measurement")
+    parser.add_argument("--max-steps", type=int, default=2000, help="episode length limit")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    single = bench_single(args.seconds, args.max_steps, args.seed)
+    print(f"{os.cpu_count()} CPUs; single env: {single:.0f} steps/s")
+    print(f"{'workers':>7} {'envs':>6} {'steps/s':>10} {'speedup':>8} {'efficiency':>11}")
+    counts = [1]
+    while counts[-1] * 2 < args.workers:
+        counts.append(counts[-1] * 2)
+    if args.workers > 1:
+        counts.append(args.workers)
+    for workers in counts:
+        rate = bench_vector(workers, args.envs_per_worker, args.seconds, args.max_steps, args.seed)
+        print(f"{workers:>7} {workers * args.envs_per_worker:>6} {rate:>10.0f} {rate / single:>7.2f}x "
+              f"{rate / (single * workers):>10.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
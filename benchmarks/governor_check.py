@@ -0,0 +1,68 @@
+"""Quality governor check under vsync.
+
+Plays the real game loop (main()) headless in --frame-mode vsync for
+--seconds with no input, with a display flip that blocks until the next
+--refresh-hz tick, like a vsynced flip on a real display. The load is
+trivial, so the governor must stay at the top quality level; the time the
+flip spends waiting for the refresh is not work. Exits with status 1 if it
+stepped down.
+
+    python benchmarks/governor_check.py
+    python benchmarks/governor_check.py --refresh-hz 144 --seconds 5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame  # noqa: E402
+
+import space_shooter  # noqa: E402
+from quality import QualityGovernor  # noqa: E402
+
+
+def vsynced(flip, period):
+    # flip, then wait for the next refresh boundary
+    def wait_for_refresh(*args, **kwargs):
+        result = flip(*args, **kwargs)
+        now = time.perf_counter()
+        time.sleep(period - now % period)
+        return result
+    return wait_for_refresh
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--refresh-hz", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    period = 1 / args.refresh_hz
+    pygame.display.flip = vsynced(pygame.display.flip, period)
+    pygame.display.update = vsynced(pygame.display.update, period)
+    governor = QualityGovernor(budget_ms=1000 / 60, log=print)
+
+    def press(key):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+
+    # ENTER once the start screen is up, then quit the whole game
+    threading.Timer(0.5, press, (pygame.K_RETURN,)).start()
+    threading.Timer(0.5 + args.seconds, pygame.event.post, (pygame.event.Event(pygame.QUIT),)).start()
+    try:
+        space_shooter.main(frame_mode="vsync", seed=args.seed, governor=governor, rewind_seconds=0)
+    except SystemExit:
+        pass
+    ok = governor.level_index == 0
+    print(f"{governor.frame} frames at {args.refresh_hz:g} Hz vsync: {governor.summary()} "
+          f"-> {'ok' if ok else 'FAILED'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
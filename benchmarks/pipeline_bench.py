@@ -0,0 +1,103 @@
+"""Serial vs threaded simulation/render pipeline benchmark.
+
+Runs each scenario headless twice. The serial run does one simulation tick
+and then one draw per frame, as the game does by default. The threaded run
+puts the simulation on its own thread, ticking at the serial frame rate
+(or --tick-rate), while this thread draws the latest snapshot for the same
+wall time. The table shows:
+
+- whether the simulation kept up (ticks/s);
+- how many frames the renderer managed;
+- the CPU time each thread used;
+- how much of that CPU time ran in parallel.
+
+Under the GIL only NumPy work and pygame blits that release it can
+overlap. On a free-threaded build everything can.
+
+    python benchmarks/pipeline_bench.py
+    python benchmarks/pipeline_bench.py debris_1000 particles_10000 --frames 600
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import space_shooter  # noqa: E402
+from pipeline import GIL_ENABLED, RENDER, OverlapMeter, SimulationThread, SnapshotBuffers  # noqa: E402
+from scenarios import SCENARIOS  # noqa: E402
+
+
+def tick_function(scenario):
+    def tick():
+        if scenario.before_tick:
+            scenario.before_tick(scenario.world)
+        scenario.world.step(scenario.inputs())
+        return True
+    return tick
+
+
+def run_serial(scenario, canvas, frames):
+    tick = tick_function(scenario)
+    start = time.perf_counter()
+    for _ in range(frames):
+        tick()
+        scenario.background.update()
+        space_shooter.draw_world(canvas, scenario.world, scenario.background, scenario.hud)
+    return time.perf_counter() - start
+
+
+def run_threaded(scenario, canvas, duration, tick_rate):
+    meter = OverlapMeter(window=1_000_000)
+    buffers = SnapshotBuffers(space_shooter.WorldSnapshot)
+    world = scenario.world
+    simulation = SimulationThread(tick_function(scenario), lambda snapshot: snapshot.capture(world), buffers,
+                                  tick_rate, meter)
+    frames = 0
+    start = time.perf_counter()
+    simulation.start()
+    while time.perf_counter() - start < duration:
+        render_start = time.perf_counter()
+        render_cpu = time.thread_time()
+        view = buffers.latest()
+        scenario.background.tick = view.game_time
+        space_shooter.draw_world(canvas, view, scenario.background, scenario.hud, simulation.alpha(view))
+        meter.record(RENDER, render_start, time.perf_counter(), time.thread_time() - render_cpu)
+        frames += 1
+    simulation.stop()
+    return time.perf_counter() - start, simulation.ticks, frames, meter.summary(), buffers.skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--frames", type=int, default=300, help="serial frames; the threaded run gets the same time")
+    parser.add_argument("--tick-rate", type=float, help="threaded simulation rate (default: the serial frame rate)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    canvas = space_shooter.init_display()
+    space_shooter.warm_up_debris()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if GIL_ENABLED else 'disabled (free-threaded)'}")
+    print(f"{'scenario':<16} {'serial fps':>10} {'ticks/s':>9} {'frames/s':>9} "
+          f"{'sim CPU':>8} {'draw CPU':>9} {'parallel':>9} {'skipped':>8}")
+    for name in args.scenarios or SCENARIOS:
+        serial = run_serial(SCENARIOS[name](args.seed), canvas, args.frames)
+        tick_rate = args.tick_rate or args.frames / serial
+        wall, ticks, frames, stats, skipped = run_threaded(SCENARIOS[name](args.seed), canvas, serial, tick_rate)
+        # CPU columns are shares of the wall time; parallel is the share of
+        # the lighter side's CPU time that ran alongside the other side
+        print(f"{name:<16} {args.frames / serial:>10.0f} {ticks / wall:>9.0f} {frames / wall:>9.0f} "
+              f"{stats['simulation_cpu_ms'] / 1000 / wall:>8.0%} {stats['render_cpu_ms'] / 1000 / wall:>9.0%} "
+              f"{stats['parallel_share']:>9.0%} {skipped:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Rewind buffer cost benchmark.
+
+Runs each scenario headless for --ticks simulation ticks and records every
+tick into a RewindBuffer. The columns are:
+
+- how many seconds of history the buffer holds;
+- memory per second of history;
+- the average time one snapshot took, and the tick stride the buffer
+  settled on to stay within --budget-us;
+- how long a random seek (decoding one snapshot) takes;
+- whether restoring the oldest snapshot and re-running the ticks since
+  then reproduced the same state.
+
+    python benchmarks/rewind_bench.py
+    python benchmarks/rewind_bench.py debris_5000 --seconds 30 --max-mb 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replay import state_hash  # noqa: E402
+from rewind import RewindBuffer  # noqa: E402
+from scenarios import SCENARIOS  # noqa: E402
+
+
+def run(scenario, ticks, buffer):
+    world = scenario.world
+    inputs = []
+    for _ in range(ticks):
+        if scenario.before_tick:
+            scenario.before_tick(world)
+        frame_inputs = scenario.inputs()
+        inputs.append(frame_inputs)
+        world.step(frame_inputs)
+        buffer.record(world)
+    return inputs
+
+
+def seek_us(buffer, samples=200):
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(samples):
+        buffer.snapshot(rng.randrange(len(buffer)))
+    return (time.perf_counter() - start) / samples * 1e6
+
+
+def check_restore(name, seed, buffer, inputs, final):
+    # Restore the oldest snapshot into a fresh world and replay the rest
+    world = SCENARIOS[name](seed).world
+    buffer.restore(0, world)
+    for frame_inputs in inputs[world.game_time:]:
+        world.step(frame_inputs)
+    return state_hash(world) == final
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--ticks", type=int, default=1200)
+    parser.add_argument("--seconds", type=float, default=10.0, help="history to keep")
+    parser.add_argument("--max-mb", type=float, default=16.0, help="rewind buffer size")
+    parser.add_argument("--budget-us", type=float, default=300.0, help="snapshot time budget per tick")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    print(f"{'scenario':<16} {'debris':>6} {'kept':>6} {'KB/s':>8} {'us/snap':>8} {'stride':>6} "
+          f"{'seek us':>8} {'restore':>8}")
+    for name in args.scenarios or SCENARIOS:
+        scenario = SCENARIOS[name](args.seed)
+        # Scenarios inject load outside the recorded inputs; only check the pure ones
+        replayable = scenario.before_tick is None
+        buffer = RewindBuffer(args.seconds, max_bytes=int(args.max_mb * 1024 * 1024), budget_us=args.budget_us)
+        inputs = run(scenario, args.ticks, buffer)
+        stats = buffer.stats()
+        restored = "-"
+        if replayable:
+            restored = "ok" if check_restore(name, args.seed, buffer, inputs, state_hash(scenario.world)) else "FAILED"
+        print(f"{name:<16} {len(scenario.world.debris):>6} {stats['seconds']:>5.1f}s "
+              f"{stats['bytes_per_second'] / 1024:>8.1f} {stats['snapshot_us']:>8.0f} {stats['stride']:>6} "
+              f"{seek_us(buffer):>8.0f} {restored:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
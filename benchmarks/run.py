@@ -0,0 +1,256 @@
+"""Stress-scenario benchmark suite.
+
+Runs each scenario headless under the SDL dummy video driver and times the
+update, collision and draw phases of every frame separately. Draw calls are
+counted both ways: one batched blits call per render layer (what the game
+does) and one call per sprite (what drawing each entity on its own costs).
+
+    python benchmarks/run.py                                  # all scenarios
+    python benchmarks/run.py debris_1000 --frames 600
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --baseline results.json --threshold 0.25
+    python benchmarks/run.py --render-mode dirty              # partial updates
+
+With --baseline the run fails (exit status 1) when any phase's p95 frame
+time regresses by more than the threshold.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+import space_shooter  # noqa: E402
+from dirty_rects import DirtyRenderer  # noqa: E402
+from scenarios import SCENARIOS  # noqa: E402
+
+PHASES = ("update", "collision", "draw")
+# What each step of a frame is charged to (see run_scenario)
+STEP_PHASES = ("update", "collision", "update", "draw")
+# Regressions smaller than this are treated as timer noise
+MIN_REGRESSION_MS = 0.05
+
+
+def summarize(samples_ns, blocks, peaks):
+    ms = np.asarray(samples_ns) / 1e6
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+        "max_ms": float(ms.max()),
+        # Net memory blocks left allocated by the phase, per frame; about 0
+        # for a phase whose temporaries are all freed again
+        "net_blocks_per_frame": float(np.mean(blocks)),
+        # Most memory the phase had allocated at once on top of what it
+        # started with (tracemalloc), i.e. its temporaries, per frame
+        "peak_alloc_kb_per_frame": float(np.mean(peaks)) / 1024 if peaks else None,
+    }
+
+
+def run_scenario(scenario, screen, frames, warmup, render_mode="full", allocation_frames=60):
+    # Times frames frames after warmup ones, then traces allocations over
+    # allocation_frames more (tracemalloc slows everything down, so those
+    # frames are not timed)
+    world = scenario.world
+    dirty = DirtyRenderer() if render_mode == "dirty" else None
+    timings = {phase: [] for phase in PHASES + ("frame",)}
+    blocks = {phase: [] for phase in PHASES + ("frame",)}
+    peaks = {phase: [] for phase in PHASES + ("frame",)}
+    collections = [0]
+    queue = space_shooter.render_queue
+    batched_calls = []
+    sprite_calls = []
+
+    def count_collections(phase, info):
+        if phase == "start":
+            collections[0] += 1
+
+    def run_phases(inputs):
+        # One frame, yielding after each of the STEP_PHASES. Same order as
+        # GameWorld.step; "update" covers the entity and effect updates on
+        # either side of the collision pass.
+        world.update_entities(inputs)
+        yield "update"
+        world.resolve_collisions()
+        yield "collision"
+        if not world.game_over:
+            world.update_effects()
+        scenario.background.update()
+        yield "update"
+        space_shooter.draw_world(screen, world, scenario.background, scenario.hud, dirty=dirty)
+        if dirty:
+            dirty.present()
+        yield "draw"
+
+    clock = time.perf_counter_ns
+    allocated = sys.getallocatedblocks
+    stamps = [0] * (len(STEP_PHASES) + 1)
+    counts = [0] * (len(STEP_PHASES) + 1)
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            gc.callbacks.append(count_collections)
+        if scenario.before_tick:
+            scenario.before_tick(world)
+        inputs = scenario.inputs()
+
+        # Readings go into preallocated lists, so taking them doesn't
+        # itself leave blocks behind
+        steps = run_phases(inputs)
+        stamps[0] = clock()
+        counts[0] = allocated()
+        index = 1
+        for _ in steps:
+            stamps[index] = clock()
+            counts[index] = allocated()
+            index += 1
+
+        if frame >= warmup:
+            frame_ns = dict.fromkeys(PHASES, 0)
+            frame_blocks = dict.fromkeys(PHASES, 0)
+            for index, phase in enumerate(STEP_PHASES):
+                frame_ns[phase] += stamps[index + 1] - stamps[index]
+                frame_blocks[phase] += counts[index + 1] - counts[index]
+            for phase in PHASES:
+                timings[phase].append(frame_ns[phase])
+                blocks[phase].append(frame_blocks[phase])
+            timings["frame"].append(stamps[-1] - stamps[0])
+            blocks["frame"].append(counts[-1] - counts[0])
+            batched_calls.append(queue.submits)
+            sprite_calls.append(queue.sprites)
+    gc.callbacks.remove(count_collections)
+
+    tracemalloc.start()
+    for frame in range(allocation_frames):
+        if scenario.before_tick:
+            scenario.before_tick(world)
+        inputs = scenario.inputs()
+        frame_peaks = dict.fromkeys(PHASES, 0)
+        tracemalloc.reset_peak()
+        frame_start = phase_start = tracemalloc.get_traced_memory()[0]
+        frame_peak = 0
+        for phase in run_phases(inputs):  # Yields the STEP_PHASES
+            current, peak = tracemalloc.get_traced_memory()
+            frame_peaks[phase] = max(frame_peaks[phase], peak - phase_start)
+            frame_peak = max(frame_peak, peak - frame_start)
+            tracemalloc.reset_peak()
+            phase_start = current
+        for phase in PHASES:
+            peaks[phase].append(frame_peaks[phase])
+        peaks["frame"].append(frame_peak)
+    tracemalloc.stop()
+
+    result = {phase: summarize(timings[phase], blocks[phase], peaks[phase]) for phase in timings}
+    result["gc_collections"] = collections[0]
+    if dirty:
+        result["dirty_rects"] = {"partial_updates": dirty.partial_updates, "full_flips": dirty.full_flips}
+    result["draw_calls"] = {
+        "batched": float(np.mean(batched_calls)),
+        "unbatched": float(np.mean(sprite_calls)),
+    }
+    result["entities"] = {
+        "debris": len(world.debris),
+        "bullets": len(world.rocket.bullets),
+        "particles": len(world.particles),
+        "stars": scenario.background.num_stars,
+    }
+    return result
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        for phase in PHASES + ("frame",):
+            old = base[phase]["p95_ms"]
+            new = result[phase]["p95_ms"]
+            if new > old * (1 + threshold) and new - old > MIN_REGRESSION_MS:
+                regressions.append(f"{name}.{phase}: p95 {old:.3f} ms -> {new:.3f} ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'scenario':<16} {'phase':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'net blocks':>10} "
+          f"{'peak KB':>8}")
+    for name, result in results["scenarios"].items():
+        for phase in PHASES + ("frame",):
+            stats = result[phase]
+            peak = stats["peak_alloc_kb_per_frame"]
+            print(f"{name:<16} {phase:<10} {stats['p50_ms']:>8.3f} {stats['p95_ms']:>8.3f} "
+                  f"{stats['p99_ms']:>8.3f} {stats['net_blocks_per_frame']:>10.1f} "
+                  f"{'-' if peak is None else f'{peak:.1f}':>8}")
+    print()
+    print(f"{'scenario':<16} {'draw calls/frame':>17} {'unbatched':>10}")
+    for name, result in results["scenarios"].items():
+        calls = result["draw_calls"]
+        print(f"{name:<16} {calls['batched']:>17.1f} {calls['unbatched']:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--allocation-frames", type=int, default=60,
+                        help="untimed frames traced with tracemalloc after the timed ones (0 skips it)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--render-mode", choices=("full", "dirty"), default="full")
+    parser.add_argument("--output", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p95 regression (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    screen = space_shooter.init_display()
+    space_shooter.warm_up_debris()
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "frames": args.frames,
+            "seed": args.seed,
+            "render_mode": args.render_mode,
+            "allocation_frames": args.allocation_frames,
+        },
+        "scenarios": {},
+    }
+    for name in args.scenarios or SCENARIOS:
+        scenario = SCENARIOS[name](args.seed)
+        results["scenarios"][name] = run_scenario(scenario, screen, args.frames, args.warmup, args.render_mode,
+                                                    args.allocation_frames)
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
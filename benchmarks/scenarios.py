@@ -0,0 +1,92 @@
+import math
+import random
+
+import space_shooter
+from background import Background
+from space_shooter import FrameInput, GameWorld
+
+
+# A benchmark workload: a world plus the background, HUD and inputs that
+# drive it. before_tick() lets a scenario inject extra load each tick.
+class Scenario:
+    def __init__(self, name, world, num_stars=space_shooter.NUM_STARS, policy=None, before_tick=None):
+        self.name = name
+        self.world = world
+        world.invulnerable = True  # Keep the load running for every frame
+        self.background = Background(
+            space_shooter.WINDOW_WIDTH, space_shooter.WINDOW_HEIGHT,
+            space_shooter.DEEP_SPACE, space_shooter.NEBULA_COLOR, num_stars, seed=world.seed,
+        )
+        self.hud = space_shooter.create_hud()
+        self.policy = policy or sweep_and_fire(every=10)
+        self.before_tick = before_tick
+
+    def inputs(self):
+        return self.policy(self.world)
+
+
+def sweep_and_fire(every):
+    # Move back and forth across the screen, firing every `every` ticks
+    def policy(world):
+        phase = world.game_time // 120 % 2
+        return FrameInput(phase == 0, phase == 1, world.game_time % every == 0)
+    return policy
+
+
+def baseline(seed):
+    return Scenario("baseline", GameWorld(seed=seed))
+
+
+def debris_1000(seed):
+    return Scenario("debris_1000", GameWorld(max_debris=1000, seed=seed))
+
+
+def debris_5000(seed):
+    return Scenario("debris_5000", GameWorld(max_debris=5000, seed=seed))
+
+
+def debris_300_mask(seed):
+    return Scenario("debris_300_mask", GameWorld(max_debris=300, seed=seed, collision_mode="mask"))
+
+
+def debris_1000_mask(seed):
+    return Scenario("debris_1000_mask", GameWorld(max_debris=1000, seed=seed, collision_mode="mask"))
+
+
+def particles_10000(seed):
+    world = GameWorld(seed=seed)
+    rng = random.Random(seed)
+
+    # 150 new particles a tick holds about 10k alive at a 67-tick lifetime.
+    # Start from that steady state, with every age present, rather than
+    # one 10k burst that would all die on the same tick.
+    def before_tick(world):
+        world.particles.emit(150, rng.uniform(0, 800), rng.uniform(0, 600), world.particle_color)
+
+    for _ in range(math.ceil(1 / world.particles.fade_rate)):
+        before_tick(world)
+        world.particles.update()
+    return Scenario("particles_10000", world, before_tick=before_tick)
+
+
+def launchers_20(seed):
+    world = GameWorld(max_debris=100, seed=seed)
+    for _ in range(19):
+        world.rocket.upgrade()
+    return Scenario("launchers_20", world, policy=sweep_and_fire(every=1))
+
+
+def stars_5000(seed):
+    return Scenario("stars_5000", GameWorld(seed=seed), num_stars=5000)
+
+
+SCENARIOS = {
+    "baseline": baseline,
+    "debris_1000": debris_1000,
+    "debris_5000": debris_5000,
+    "debris_300_mask": debris_300_mask,
+    "debris_1000_mask": debris_1000_mask,
+    "particles_10000": particles_10000,
+    "launchers_20": launchers_20,
+    "stars_5000": stars_5000,
+}
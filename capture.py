@@ -0,0 +1,203 @@
+import os
+import queue
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pygame
+
+FORMATS = ("raw", "png", "pipe")
+POLICIES = ("drop", "block")
+
+
+def guess_format(target):
+    return "png" if target.lower().endswith(".png") else "raw"
+
+
+# Frame sinks, called on the writer thread with (h, w, 3) RGB frames. frame
+# is the capture's frame number; dropped frames leave gaps in it.
+class RawSink:
+    # Frames back to back as 8-bit RGB, no header (e.g. ffmpeg -f rawvideo)
+    def __init__(self, path):
+        self.file = open(path, "wb")
+
+    def write(self, rgb, frame):
+        self.file.write(rgb.data)
+
+    def close(self):
+        self.file.close()
+
+
+class PngSink:
+    # One PNG per frame: target is a pattern such as "shots/{frame:06d}.png",
+    # or a directory to put frame_000000.png, ... in
+    def __init__(self, target):
+        if "{" not in target:
+            target = os.path.join(target, "frame_{frame:06d}.png")
+        directory = os.path.dirname(target)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.pattern = target
+
+    def write(self, rgb, frame):
+        height, width = rgb.shape[:2]
+        surface = pygame.image.frombuffer(rgb, (width, height), "RGB")
+        pygame.image.save(surface, self.pattern.format(frame=frame))
+
+    def close(self):
+        pass
+
+
+class PipeSink:
+    # Raw RGB frames into a local encoder's stdin. {width}, {height} and
+    # {fps} in the command are filled in, e.g.
+    # "ffmpeg -y -f rawvideo -pix_fmt rgb24 -s {width}x{height} -r {fps} -i - out.mp4"
+    def __init__(self, command, size, fps):
+        width, height = size
+        args = [arg.format(width=width, height=height, fps=fps) for arg in shlex.split(command)]
+        self.process = subprocess.Popen(args, stdin=subprocess.PIPE)
+
+    def write(self, rgb, frame):
+        self.process.stdin.write(rgb.data)
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait():
+            raise RuntimeError(f"capture encoder exited with status {self.process.returncode}")
+
+
+def open_sink(kind, target, size, fps):
+    if kind == "raw":
+        return RawSink(target)
+    if kind == "png":
+        return PngSink(target)
+    if kind == "pipe":
+        return PipeSink(target, size, fps)
+    raise ValueError(f"unknown capture format {kind!r}")
+
+
+# Captures rendered frames in the background. grab(surface) copies the
+# surface's pixel rows as they are (one memcpy-speed copy) into the next
+# free slot of a preallocated ring and queues it; a writer thread turns
+# slots into RGB and hands them to the sink. When every slot is still
+# queued, the "drop" policy skips the frame (counted in dropped) and
+# "block" waits for the writer, so nothing is lost but the game slows to
+# the writer's pace. The ring and the sink are set up by the first grab().
+class FrameCapture:
+    def __init__(self, target, kind=None, fps=60, slots=8, policy="drop"):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown capture policy {policy!r}")
+        self.target = target
+        self.kind = kind or guess_format(target)
+        if self.kind not in FORMATS:
+            raise ValueError(f"unknown capture format {self.kind!r}")
+        self.fps = fps  # Only used for the pipe command; set before the first frame
+        self.policy = policy
+        self.size = None
+        self.frames = 0  # Offered to grab()
+        self.written = 0
+        self.dropped = 0
+        self.blocked_ms = 0.0
+        self.error = None  # First sink error; raised by the next grab() or close()
+        self._slots = [None] * slots
+        self._free = queue.SimpleQueue()
+        self._ready = queue.SimpleQueue()
+        self._thread = None
+        self._sink = None
+
+    def _start(self, surface):
+        bytesize = surface.get_bytesize()
+        if bytesize not in (3, 4):
+            raise ValueError("frame capture needs a 24 or 32-bit surface")
+        self.size = surface.get_size()
+        height = self.size[1]
+        for index in range(len(self._slots)):
+            self._slots[index] = np.empty((height, surface.get_pitch()), dtype=np.uint8)
+            self._free.put(index)
+        # Byte offsets of R, G and B within a pixel
+        offsets = [shift // 8 for shift in surface.get_shifts()[:3]]
+        if sys.byteorder == "big":
+            offsets = [bytesize - 1 - offset for offset in offsets]
+        self._sink = open_sink(self.kind, self.target, self.size, self.fps)
+        self._thread = threading.Thread(target=self._run, args=(bytesize, offsets), name="capture", daemon=True)
+        self._thread.start()
+
+    def grab(self, surface):
+        # Call right after presenting a frame; returns False if it was dropped
+        if self.error is not None:
+            raise self.error
+        if self._thread is None:
+            self._start(surface)
+        elif surface.get_size() != self.size:
+            raise ValueError(f"captured surface changed size from {self.size} to {surface.get_size()}")
+        frame = self.frames
+        self.frames += 1
+        if self.policy == "block":
+            start = time.perf_counter()
+            index = self._free.get()
+            self.blocked_ms += (time.perf_counter() - start) * 1000
+        else:
+            try:
+                index = self._free.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+                return False
+        slot = self._slots[index]
+        view = surface.get_view("1")  # Locks the surface until released
+        try:
+            np.copyto(slot, np.frombuffer(view, dtype=np.uint8).reshape(slot.shape))
+        finally:
+            del view
+        self._ready.put((index, frame))
+        return True
+
+    def _run(self, bytesize, offsets):
+        width, height = self.size
+        rgb = np.empty((height, width, 3), dtype=np.uint8)
+        while True:
+            item = self._ready.get()
+            if item is None:
+                break
+            index, frame = item
+            pixels = self._slots[index][:, :width * bytesize].reshape(height, width, bytesize)
+            for channel, offset in enumerate(offsets):
+                rgb[..., channel] = pixels[..., offset]
+            self._free.put(index)  # The slot is free again once converted
+            if self.error is not None:
+                continue  # Keep freeing slots so grab() never waits forever
+            try:
+                self._sink.write(rgb, frame)
+                self.written += 1
+            except Exception as error:
+                self.error = error
+
+    def close(self):
+        # Writes out everything queued, then closes the sink
+        if self._thread is not None:
+            self._ready.put(None)
+            self._thread.join()
+            self._thread = None
+            try:
+                self._sink.close()
+            except Exception as error:
+                self.error = self.error or error
+        if self.error is not None:
+            raise self.error
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "written": self.written,
+            "dropped": self.dropped,
+            "queued": self._ready.qsize(),
+            "slots": len(self._slots),
+            "blocked_ms": self.blocked_ms,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"{stats['written']} written, {stats['dropped']} dropped of {stats['frames']}, "
+                f"{stats['queued']}/{stats['slots']} queued, {stats['blocked_ms']:.0f} ms blocked")
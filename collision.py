@@ -0,0 +1,168 @@
+from collections import defaultdict
+
+import numpy as np
+
+# "box": bounding boxes and circles (the original approximations)
+# "mask": pixel-exact sprite masks, with bounding boxes as the broad phase
+COLLISION_MODES = ("box", "mask")
+VECTORIZED_MAX_PAIRS = 1 << 16
+
+
+# Uniform grid broad phase for points (bullets), rebuilt every frame
+class SpatialHash:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+
+    def clear(self):
+        self.cells.clear()
+
+    def build(self, points):
+        self.cells.clear()
+        cell_size = self.cell_size
+        cells = self.cells
+        for index, (x, y) in enumerate(points):
+            cells[(int(x // cell_size), int(y // cell_size))].append(index)
+
+    def query(self, x, y, radius):
+        # Indices of every point in the cells overlapping the circle's bounding box
+        cell_size = self.cell_size
+        cells = self.cells
+        found = []
+        for cx in range(int((x - radius) // cell_size), int((x + radius) // cell_size) + 1):
+            for cy in range(int((y - radius) // cell_size), int((y + radius) // cell_size) + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.extend(cell)
+        return found
+
+
+def find_hits(points, circles, grid=None):
+    # Match circles (cx, cy, radius) against points (x, y). Circles are
+    # resolved in order and each takes the earliest live point strictly
+    # inside it; every point hits at most one circle.
+    # Returns (circle_index, point_index) pairs.
+    if not points or not circles:
+        return []
+    if grid is None:
+        grid = SpatialHash()
+    grid.build(points)
+
+    used = set()
+    hits = []
+    for circle_index, (cx, cy, radius) in enumerate(circles):
+        radius_sq = radius * radius
+        best = None
+        for point_index in grid.query(cx, cy, radius):
+            if point_index in used or (best is not None and point_index > best):
+                continue
+            x, y = points[point_index]
+            if (x - cx) ** 2 + (y - cy) ** 2 < radius_sq:
+                best = point_index
+        if best is not None:
+            used.add(best)
+            hits.append((circle_index, best))
+    return hits
+
+
+def masks_overlap(mask_a, left_a, top_a, mask_b, left_b, top_b):
+    # Cheap bounding box rejection first; Mask.overlap only runs on real candidates
+    width_a, height_a = mask_a.get_size()
+    width_b, height_b = mask_b.get_size()
+    if (left_b >= left_a + width_a or left_a >= left_b + width_b or
+            top_b >= top_a + height_a or top_a >= top_b + height_b):
+        return False
+    return mask_a.overlap(mask_b, (left_b - left_a, top_b - top_a)) is not None
+
+
+def circle_point_pairs(points_x, points_y, centers_x, centers_y, radii, chunk_cells=1 << 18):
+    # Every (circle_index, point_index) with the point strictly inside the
+    # circle, from NumPy arrays, in (circle, point) order. Circles are tested
+    # in chunks so the distance matrix stays at most chunk_cells entries.
+    if not len(points_x) or not len(centers_x):
+        return [], []
+    chunk = max(1, chunk_cells // len(points_x))
+    circle_indices = []
+    point_indices = []
+    for start in range(0, len(centers_x), chunk):
+        dx = points_x - centers_x[start:start + chunk, None]
+        dy = points_y - centers_y[start:start + chunk, None]
+        radius = radii[start:start + chunk, None]
+        rows, cols = np.nonzero(dx * dx + dy * dy < radius * radius)
+        circle_indices.extend((rows + start).tolist())
+        point_indices.extend(cols.tolist())
+    return circle_indices, point_indices
+
+
+def find_hits_arrays(points_x, points_y, centers_x, centers_y, radii, grid=None):
+    # find_hits for NumPy arrays: one vectorized distance test, then the
+    # greedy pass only walks the pairs that actually overlap. Past
+    # VECTORIZED_MAX_PAIRS point/circle combinations the spatial hash wins.
+    if len(points_x) * len(centers_x) > VECTORIZED_MAX_PAIRS:
+        return find_hits(list(zip(points_x.tolist(), points_y.tolist())),
+                         list(zip(centers_x.tolist(), centers_y.tolist(), radii.tolist())), grid)
+    used = set()
+    hits = []
+    last = -1
+    for circle_index, point_index in zip(*circle_point_pairs(points_x, points_y, centers_x, centers_y, radii)):
+        if circle_index == last or point_index in used:
+            continue
+        used.add(point_index)
+        hits.append((circle_index, point_index))
+        last = circle_index
+    return hits
+
+
+def find_mask_hits(points_x, points_y, point_mask, centers_x, centers_y, reach, target_mask):
+    # Pixel-exact find_hits_arrays. Circles (center, reach) bound each target
+    # for the broad phase; target_mask(index) -> (mask, left, top) is only
+    # called for targets with a point nearby. Every point is stamped with
+    # point_mask centered on it.
+    point_width, point_height = point_mask.get_size()
+    half_width = point_width // 2
+    half_height = point_height // 2
+    circle_indices, point_indices = circle_point_pairs(
+        points_x, points_y, centers_x, centers_y, reach + max(half_width, half_height))
+    points_x = points_x.tolist()
+    points_y = points_y.tolist()
+    used = set()
+    hits = []
+    last = -1
+    mask = None
+    for target_index, point_index in zip(circle_indices, point_indices):
+        if target_index == last or point_index in used:
+            continue
+        if mask is None or target_index != mask_index:
+            mask, left, top = target_mask(target_index)
+            mask_index = target_index
+            width, height = mask.get_size()
+        dx = int(points_x[point_index]) - half_width - left
+        dy = int(points_y[point_index]) - half_height - top
+        if (-point_width < dx < width and -point_height < dy < height and
+                mask.overlap(point_mask, (dx, dy)) is not None):
+            used.add(point_index)
+            hits.append((target_index, point_index))
+            last = target_index
+    return hits
+
+
+def find_hits_brute_force(points, circles):
+    # Reference implementation matching the original nested loop in main()
+    used = set()
+    hits = []
+    for circle_index, (cx, cy, radius) in enumerate(circles):
+        for point_index, (x, y) in enumerate(points):
+            if point_index in used:
+                continue
+            if (x - cx) ** 2 + (y - cy) ** 2 < radius * radius:
+                used.add(point_index)
+                hits.append((circle_index, point_index))
+                break
+    return hits
+
+
+def remove_indices(items, indices):
+    # Deferred removal: one O(n) compaction instead of repeated list.remove
+    if not indices:
+        return items
+    return [item for index, item in enumerate(items) if index not in indices]
@@ -0,0 +1,152 @@
+import numpy as np
+
+# Columns of DebrisField (struct-of-arrays storage)
+INT_COLUMNS = ("shape_index", "size", "x", "base_speed", "serial")
+FLOAT_COLUMNS = ("y", "prev_y", "speed", "rotation", "prev_rotation", "rotation_speed")
+# Order of the values in a spawned row (see DebrisField.extend)
+ROW = ("shape_index", "size", "x", "y", "base_speed", "speed", "rotation", "rotation_speed")
+
+
+# Every asteroid in the world, one array per column. Rows [0, count) are
+# live and stay in spawn order (collision resolution depends on it);
+# removal compacts the arrays in place. field[i] wraps a row in `view`.
+class DebrisField:
+    def __init__(self, capacity=32, view=None):
+        self.view = view
+        self.count = 0
+        self.high_water = 0
+        self.spawned = 0
+        self.grown = 0
+        self.next_serial = 0  # Spawn serial of the next row; rows keep theirs while live
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        for name in INT_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.int64))
+        for name in FLOAT_COLUMNS:
+            setattr(self, name, np.zeros(capacity))
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old = {name: getattr(self, name) for name in INT_COLUMNS + FLOAT_COLUMNS}
+        self._allocate(capacity)
+        for name, column in old.items():
+            getattr(self, name)[:self.count] = column[:self.count]
+        self.grown += 1
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("debris index out of range")
+        return self.view(self, index)
+
+    def __iter__(self):
+        view = self.view
+        return (view(self, index) for index in range(self.count))
+
+    def extend(self, rows):
+        # rows are tuples in ROW order; new debris starts with prev == current
+        if not rows:
+            return
+        start = self.count
+        end = start + len(rows)
+        if end > self.capacity:
+            self._grow(end)
+        for name, values in zip(ROW, zip(*rows)):
+            getattr(self, name)[start:end] = values
+        self.serial[start:end] = np.arange(self.next_serial, self.next_serial + len(rows))
+        self.next_serial += len(rows)
+        self.prev_y[start:end] = self.y[start:end]
+        self.prev_rotation[start:end] = self.rotation[start:end]
+        self.count = end
+        self.spawned += len(rows)
+        self.high_water = max(self.high_water, end)
+
+    def move(self):
+        n = self.count
+        self.prev_y[:n] = self.y[:n]
+        self.prev_rotation[:n] = self.rotation[:n]
+        self.y[:n] += self.speed[:n]
+        self.rotation[:n] += self.rotation_speed[:n]
+
+    def cull_below(self, limit):
+        # Drop everything with y > limit; returns how many were dropped
+        keep = self.y[:self.count] <= limit
+        dropped = self.count - int(np.count_nonzero(keep))
+        if dropped:
+            self._compact(keep)
+        return dropped
+
+    def remove(self, indices):
+        if not indices:
+            return
+        keep = np.ones(self.count, dtype=bool)
+        keep[list(indices)] = False
+        self._compact(keep)
+
+    def _compact(self, keep):
+        n = self.count
+        kept = int(np.count_nonzero(keep))
+        for name in INT_COLUMNS + FLOAT_COLUMNS:
+            column = getattr(self, name)
+            column[:kept] = column[:n][keep]
+        self.count = kept
+
+    def clear(self):
+        self.count = 0
+
+    def copy_from(self, other):
+        # Become a copy of other's live rows, reusing this field's arrays
+        n = other.count
+        if n > self.capacity:
+            self.count = 0
+            self._grow(n)
+        for name in INT_COLUMNS + FLOAT_COLUMNS:
+            getattr(self, name)[:n] = getattr(other, name)[:n]
+        self.count = n
+
+    def load(self, columns, count):
+        # Set the first count rows from {column name: values}, e.g. a saved state
+        if count > self.capacity:
+            self.count = 0
+            self._grow(count)
+        for name in INT_COLUMNS + FLOAT_COLUMNS:
+            getattr(self, name)[:count] = columns[name][:count]
+        self.count = count
+        self.high_water = max(self.high_water, count)
+        if count:
+            self.next_serial = max(self.next_serial, int(self.serial[count - 1]) + 1)
+
+    def box_overlaps(self, left, top, right, bottom):
+        # Indices of the debris whose size x size box overlaps the rectangle
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        size = self.size[:n]
+        return np.flatnonzero((left < x + size) & (right > x) & (top < y + size) & (bottom > y))
+
+    def stats(self):
+        # Same keys as Pool.stats(); rows are reused, so only growth allocates
+        return {
+            "type": "Debris",
+            "capacity": self.capacity,
+            "active": self.count,
+            "free": self.capacity - self.count,
+            "high_water": self.high_water,
+            "allocations_avoided": self.spawned - self.grown,
+        }
+
+
+def column_property(name, cast):
+    # Row view attribute backed by one DebrisField column
+    def get(self):
+        return cast(getattr(self.field, name)[self.index])
+
+    def set(self, value):
+        getattr(self.field, name)[self.index] = value
+    return property(get, set)
@@ -0,0 +1,148 @@
+import numpy as np
+import pygame
+
+from render_queue import HUD, LAYERS
+
+# Above this share of the screen, or this many rects, one full flip is
+# cheaper than a partial update
+FULL_FLIP_AREA = 0.4
+MAX_RECTS = 4000
+TILE = 32  # Dirty areas are tracked in TILE x TILE pixel blocks
+
+
+def merge_rects(rects, size, tile=TILE):
+    # Snap rects to a tile grid and return one rect per horizontal run of
+    # dirty tiles, clipped to the screen. Coverage is built with a 2D
+    # difference array, so there is no per-pair overlap test.
+    width, height = size
+    columns = -(-width // tile)
+    rows = -(-height // tile)
+    if not rects:
+        return []
+    bounds = np.array([tuple(rect) for rect in rects]).reshape(-1, 4)
+    left = np.clip(bounds[:, 0] // tile, 0, columns)
+    top = np.clip(bounds[:, 1] // tile, 0, rows)
+    right = np.clip(-(-(bounds[:, 0] + bounds[:, 2]) // tile), 0, columns)
+    bottom = np.clip(-(-(bounds[:, 1] + bounds[:, 3]) // tile), 0, rows)
+    keep = (right > left) & (bottom > top)
+    left, top, right, bottom = left[keep], top[keep], right[keep], bottom[keep]
+
+    coverage = np.zeros((rows + 1, columns + 1), dtype=np.int32)
+    np.add.at(coverage, (top, left), 1)
+    np.add.at(coverage, (top, right), -1)
+    np.add.at(coverage, (bottom, left), -1)
+    np.add.at(coverage, (bottom, right), 1)
+    dirty = coverage.cumsum(axis=0).cumsum(axis=1)[:rows, :columns] > 0
+
+    # Run starts and ends per tile row
+    padded = np.zeros((rows, columns + 2), dtype=np.int8)
+    padded[:, 1:-1] = dirty
+    edges = np.diff(padded, axis=1)
+    start_rows, start_columns = np.nonzero(edges == 1)
+    _, end_columns = np.nonzero(edges == -1)
+    merged = []
+    for row, start, end in zip(start_rows.tolist(), start_columns.tolist(), end_columns.tolist()):
+        x = start * tile
+        y = row * tile
+        merged.append(pygame.Rect(x, y, min(end * tile, width) - x, min(y + tile, height) - y))
+    return merged
+
+
+# Partial-update renderer for software and remote displays. Instead of
+# redrawing and flipping the whole window it restores last frame's sprite
+# rects from the background's static layer, redraws the sprites and pushes
+# only the changed areas with pygame.display.update. Twinkling stars and
+# HUD labels are only pushed when they actually changed. While the dirty
+# area is too large it redraws and flips the whole frame instead, until
+# the load drops again; invalidate() forces one full frame (the screen was
+# drawn over, e.g. by a menu, or the background changed).
+class DirtyRenderer:
+    def __init__(self, full_flip_area=FULL_FLIP_AREA, max_rects=MAX_RECTS):
+        self.full_flip_area = full_flip_area
+        self.max_rects = max_rects
+        self.full_flips = 0
+        self.partial_updates = 0
+        self.dirty_fraction = 1.0
+        self._full = True  # Redraw everything this frame
+        self._invalid = True  # Screen contents unknown; must flip
+        self._previous = []  # Every sprite rect drawn last frame
+        self._previous_sprites = []  # The same without the HUD labels
+        self._previous_hud = []
+        self._dirty = []
+        self._stars = []
+        self._hud_surfaces = []
+
+    def invalidate(self):
+        self._full = self._invalid = True
+
+    def restore(self, surface, background):
+        # Called instead of background.draw
+        star_rects = background.star_rects
+        if self._full:
+            background.draw(surface)
+            self._stars = star_rects
+        else:
+            base = background.base
+            surface.blits([(base, rect, rect) for rect in self._previous], doreturn=False)
+            self._stars = [star_rects[index] for index in background.draw_stars(surface)]
+        # Labels are restored under themselves like any sprite, but only
+        # pushed again when they change (see flush)
+        self._dirty = list(self._previous_sprites)
+
+    def flush(self, surface, queue, hud, profiler=None):
+        # Called instead of queue.flush
+        rects = [[] for _ in LAYERS]
+        queue.flush(surface, rects, profiler)
+        sprites = [rect for index, layer in enumerate(rects) if index != HUD for rect in layer]
+        self._dirty.extend(sprites)
+        # Labels are redrawn every frame but only pushed when their text
+        # changed, along with where the old text was
+        hud_rects = rects[HUD]
+        hud_surfaces = [label.surface for label in hud]
+        changed_layout = len(hud_surfaces) != len(self._hud_surfaces) or len(hud_rects) != len(self._previous_hud)
+        if self._invalid or changed_layout:
+            self._dirty.extend(hud_rects)
+            self._dirty.extend(self._previous_hud)
+        else:
+            for rect, old_rect, label_surface, old_surface in zip(hud_rects, self._previous_hud,
+                                                                  hud_surfaces, self._hud_surfaces):
+                if label_surface is not old_surface:
+                    self._dirty.append(rect)
+                    self._dirty.append(old_rect)
+        self._previous = sprites + hud_rects
+        self._previous_sprites = sprites
+        self._previous_hud = hud_rects
+        self._hud_surfaces = hud_surfaces
+
+    def present(self, viewport=None):
+        # Called instead of pygame.display.flip, or viewport.present() when
+        # drawing to a viewport.Viewport canvas
+        if viewport is not None:
+            size = viewport.size
+            tile = max(8, round(TILE * viewport.render_scale))  # Same share of the play field
+        else:
+            size = pygame.display.get_surface().get_size()
+            tile = TILE
+        merged = None
+        if len(self._dirty) + len(self._stars) <= self.max_rects:
+            # Sprites snap to tiles; stars are tiny and scattered, so they go as they are
+            merged = merge_rects(self._dirty, size, tile) + self._stars
+            area = sum(rect.width * rect.height for rect in merged)
+            self.dirty_fraction = min(1.0, area / (size[0] * size[1]))
+        else:
+            self.dirty_fraction = 1.0
+        heavy = self.dirty_fraction > self.full_flip_area
+        if self._invalid or heavy:
+            merged = None
+            self.full_flips += 1
+        else:
+            self.partial_updates += 1
+        if viewport is not None:
+            viewport.present(merged)
+        elif merged is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(merged)
+        # Restoring thousands of rects costs more than one background blit
+        self._full = heavy
+        self._invalid = False
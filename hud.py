@@ -0,0 +1,83 @@
+from collections import OrderedDict
+
+import pygame
+
+
+# Loads each (face, size) font once
+class FontManager:
+    def __init__(self):
+        self._fonts = {}
+        self.loads = 0
+
+    def get(self, face=None, size=36):
+        font = self._fonts.get((face, size))
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self._fonts[(face, size)] = pygame.font.Font(face, size)
+            self.loads += 1
+        return font
+
+
+# LRU cache of rendered text surfaces keyed by (text, face, size, color)
+class TextCache:
+    def __init__(self, fonts, max_entries=256):
+        self.fonts = fonts
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, text, size=36, color=(255, 255, 255), face=None):
+        key = (text, face, size, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        surface = self.fonts.get(face, size).render(text, True, color)
+        self.misses += 1
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def stats(self):
+        return {
+            "entries": len(self._surfaces),
+            "fonts_loaded": self.fonts.loads,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# A HUD line that only re-renders when its value changes
+class HudLabel:
+    def __init__(self, fonts, template, position, size=36, color=(255, 255, 255), face=None):
+        self.font = fonts.get(face, size)
+        self.template = template
+        self.position = position
+        self.color = color
+        self.value = None
+        self.surface = None
+        self.hits = 0
+        self.renders = 0
+
+    def set(self, value):
+        if self.surface is None or value != self.value:
+            self.value = value
+            self.surface = self.font.render(self.template.format(value), True, self.color)
+            self.renders += 1
+        else:
+            self.hits += 1
+        return self.surface
+
+    def blit_pair(self, value):
+        return self.set(value), self.position
+
+    def draw(self, surface, value):
+        surface.blit(*self.blit_pair(value))
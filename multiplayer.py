@@ -0,0 +1,736 @@
+import argparse
+import asyncio
+import bisect
+import struct
+import sys
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+import space_shooter as game
+from background import Background
+from collision import COLLISION_MODES
+from debris_field import FLOAT_COLUMNS, INT_COLUMNS, DebrisField
+from particles import ParticleSystem
+from render_queue import BULLETS, DEBRIS, HUD, PARTICLES, ROCKET
+from space_shooter import (DEEP_SPACE, NEBULA_COLOR, NO_INPUT, NUM_STARS, TICK_RATE, WHITE,
+                           WINDOW_HEIGHT, WINDOW_WIDTH, Debris, FrameInput, GameWorld, Rocket, bullet_sprite,
+                           create_hud, debris_blits, init_display, render_queue, text_cache, warm_up_debris)
+from timestep import FixedTimestep
+
+MAX_PLAYERS = 8
+DEFAULT_PORT = 5005
+
+# Co-op game: up to MAX_PLAYERS rockets share one debris field and the
+# score. Debris that hits a rocket takes that player out of the round; the
+# round is over once every rocket is out. step() takes {player id: FrameInput}.
+class CoopWorld(GameWorld):
+    def __init__(self, max_debris=15, seed=None, collision_mode="box"):
+        self.rockets = {}  # player id -> Rocket
+        self.kills = {}  # player id -> debris shot this round
+        self.out = set()
+        super().__init__(max_debris, seed, collision_mode)
+
+    def reset(self, seed=None):
+        # New round; everyone who joined plays again
+        super().reset(seed)
+        for player_id in self.rockets:
+            self.join(player_id)
+        self.out.clear()
+
+    def join(self, player_id):
+        if player_id in self.rockets:
+            self.bullet_pool.release_all(self.rockets[player_id].bullets)
+        rocket = Rocket(self.bullet_pool)
+        # Players start in lanes spread over the play field
+        rocket.x = rocket.prev_x = (player_id + 1) * WINDOW_WIDTH // (MAX_PLAYERS + 1) - rocket.width // 2
+        self.rockets[player_id] = rocket
+        self.kills[player_id] = 0
+        self.out.discard(player_id)
+
+    def leave(self, player_id):
+        rocket = self.rockets.pop(player_id, None)
+        if rocket is not None:
+            self.bullet_pool.release_all(rocket.bullets)
+        self.kills.pop(player_id, None)
+        self.out.discard(player_id)
+
+    def playing(self):
+        # Player ids still in the round, in a fixed order so a tick is deterministic
+        return sorted(player_id for player_id in self.rockets if player_id not in self.out)
+
+    def step(self, inputs=None):
+        super().step(inputs or {})
+
+    def update_entities(self, inputs):
+        playing = self.playing()
+        rockets = [self.rockets[player_id] for player_id in playing]
+        for player_id, rocket in zip(playing, rockets):
+            self.control_rocket(rocket, inputs.get(player_id, NO_INPUT))
+        self.advance_time(rockets)
+        for rocket in rockets:
+            self.move_bullets(rocket)
+
+        # Update debris; anything that fell off the bottom is replaced
+        self.debris.move()
+        self.pending_respawns = self.debris.cull_below(WINDOW_HEIGHT)
+
+    def resolve_collisions(self):
+        debris = self.debris
+        respawns = self.pending_respawns
+        self.pending_respawns = 0
+
+        # A rocket touching debris is out; the debris carries on
+        for player_id in self.playing():
+            rocket = self.rockets[player_id]
+            if self.find_rocket_hit(rocket) is not None and not self.invulnerable:
+                self.out.add(player_id)
+                self.bullet_pool.release_all(rocket.bullets)
+                rocket.bullets = []
+        if self.rockets and len(self.out) == len(self.rockets):
+            self.game_over = True
+            return
+
+        # Everyone's bullets against the field in one pass
+        owners = []
+        bullets = []
+        for player_id in self.playing():
+            owners.extend([player_id] * len(self.rockets[player_id].bullets))
+            bullets.extend(self.rockets[player_id].bullets)
+        hits = self.find_bullet_hits(len(debris), bullets)
+        if hits:
+            spent = set()
+            for debris_index, bullet_index in hits:
+                spent.add(bullets[bullet_index])
+                self.bullet_pool.release(bullets[bullet_index])
+                self.explode(debris_index)
+                self.score += 10
+                self.kills[owners[bullet_index]] += 1
+            for player_id in set(owners[bullet_index] for _, bullet_index in hits):
+                rocket = self.rockets[player_id]
+                rocket.bullets = [bullet for bullet in rocket.bullets if bullet not in spent]
+            debris.remove([debris_index for debris_index, _ in hits])
+            respawns += len(hits)
+
+        # Spawn new debris to maintain count
+        self.spawn_debris(respawns)
+
+
+# Snapshot quantization: positions in 1/4 px, rotations in 1/65536 turns
+POSITION_SCALE = 4
+ANGLE_SCALE = 65536 / 360
+BULLET_SPEED = 7  # Pixels per tick, for placing bullets between snapshots
+
+PLAYER_ROW = np.dtype([("id", "u1"), ("out", "u1"), ("x", "<i2"), ("launchers", "u1"), ("kills", "<u2"),
+                   ("bullets", "<u2")])
+BULLET_ROW = np.dtype([("x", "<i2"), ("y", "<i2")])
+DEBRIS_ROW = np.dtype([("serial", "<u4"), ("shape", "<u2"), ("size", "u1"), ("x", "<i2"), ("y", "<i2"),
+                   ("rotation", "<u2")])
+
+# Datagrams: client -> server JOIN, INPUT (held buttons, a running count of
+# shots so a lost packet loses no presses, and the newest snapshot tick
+# the client has) and LEAVE; server -> client WELCOME, FULL and SNAPSHOT.
+JOIN, LEAVE, FULL = b"J", b"L", b"F"
+INPUT = struct.Struct("<cIIBH")  # b"I", sequence, acked tick, buttons, shots
+WELCOME = struct.Struct("<cBHH")  # b"W", player id, tick rate, ticks per snapshot
+SNAPSHOT = struct.Struct("<cIIIHHBHHH")  # b"S", tick, baseline tick, score, level, round, players, bullets,
+#                                          debris, new debris; then the zlib-compressed body
+LEFT, RIGHT = 1, 2
+NO_BASELINE = 0xFFFFFFFF
+MAX_DATAGRAM = 65507
+
+
+# A quantized world state: what the server sends and the client decodes.
+# players, bullets and debris are structured arrays (PLAYER_ROW,
+# BULLET_ROW, DEBRIS_ROW); bullets are grouped by player in players order.
+class NetState:
+    def __init__(self, tick, score, level, round_number, players, bullets, debris):
+        self.tick = tick
+        self.score = score
+        self.level = level
+        self.round = round_number
+        self.players = players
+        self.bullets = bullets
+        self.debris = debris
+
+
+def quantize(world, tick, round_number=0):
+    ids = sorted(world.rockets)
+    rockets = [world.rockets[player_id] for player_id in ids]
+    players = np.array([(player_id, player_id in world.out, rocket.x, rocket.num_launchers,
+                         min(world.kills[player_id], 0xFFFF), len(rocket.bullets))
+                        for player_id, rocket in zip(ids, rockets)], dtype=PLAYER_ROW)
+    bullets = np.array([(round(bullet.x * POSITION_SCALE), round(bullet.y * POSITION_SCALE))
+                        for rocket in rockets for bullet in rocket.bullets], dtype=BULLET_ROW)
+    field = world.debris
+    n = len(field)
+    debris = np.empty(n, dtype=DEBRIS_ROW)
+    debris["serial"] = field.serial[:n]
+    debris["shape"] = field.shape_index[:n]
+    debris["size"] = field.size[:n]
+    debris["x"] = field.x[:n]
+    debris["y"] = np.round(field.y[:n] * POSITION_SCALE)
+    debris["rotation"] = np.round(field.rotation[:n] * ANGLE_SCALE).astype(np.int64) & 0xFFFF
+    return NetState(tick, world.score, world.difficulty_level, round_number, players, bullets, debris)
+
+
+def match_serials(serials, wanted):
+    # Boolean mask over wanted: which serials are also in serials (both ascending)
+    if not len(serials):
+        return np.zeros(len(wanted), dtype=bool)
+    found = np.minimum(np.searchsorted(serials, wanted), len(serials) - 1)
+    return serials[found] == wanted
+
+
+def encode_snapshot(state, baseline=None):
+    # Players and bullets are sent whole. Debris is sent against baseline
+    # (the newest state the client confirmed): a bit per baseline row for
+    # whether it is still there, the y / rotation change of those rows, then
+    # the rows spawned since in full. Rows stay in spawn order, so the
+    # survivors come first. Without a baseline every row counts as new.
+    debris = state.debris
+    parts = [state.players.tobytes(), state.bullets.tobytes()]
+    kept = 0
+    if baseline is not None:
+        base = baseline.debris
+        keep = match_serials(debris["serial"], base["serial"])
+        kept = int(np.count_nonzero(keep))
+        current = debris[:kept]
+        previous = base[keep]
+        parts.append(np.packbits(keep).tobytes())
+        # Columns one after another compress far better than interleaved rows
+        parts.append((current["y"] - previous["y"]).astype("<i2").tobytes())
+        parts.append((current["rotation"] - previous["rotation"]).astype("<u2").tobytes())
+    parts.append(debris[kept:].tobytes())
+    header = SNAPSHOT.pack(b"S", state.tick, NO_BASELINE if baseline is None else baseline.tick, state.score,
+                           state.level, state.round, len(state.players), len(state.bullets), len(debris),
+                           len(debris) - kept)
+    return header + zlib.compress(b"".join(parts), 1)
+
+
+def decode_snapshot(data, baselines):
+    # The NetState in a SNAPSHOT datagram, or None when its baseline (looked
+    # up in the {tick: NetState} baselines) is no longer known
+    (_, tick, base_tick, score, level, round_number, num_players, num_bullets, num_debris,
+     num_new) = SNAPSHOT.unpack_from(data)
+    baseline = None
+    if base_tick != NO_BASELINE:
+        baseline = baselines.get(base_tick)
+        if baseline is None:
+            return None
+    body = zlib.decompress(data[SNAPSHOT.size:])
+    offset = 0
+
+    def take(dtype, count):
+        nonlocal offset
+        array = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+        offset += array.nbytes
+        return array
+
+    players = take(PLAYER_ROW, num_players)
+    bullets = take(BULLET_ROW, num_bullets)
+    kept = num_debris - num_new
+    debris = np.empty(num_debris, dtype=DEBRIS_ROW)
+    if baseline is not None:
+        base = baseline.debris
+        keep = np.unpackbits(take(np.uint8, (len(base) + 7) // 8), count=len(base)).astype(bool)
+        debris[:kept] = base[keep]
+        debris["y"][:kept] += take("<i2", kept)
+        debris["rotation"][:kept] += take("<u2", kept)
+    debris[kept:] = take(DEBRIS_ROW, num_new)
+    return NetState(tick, score, level, round_number, players, bullets, debris)
+
+
+# Interpolated state for drawing, in play-field pixels and degrees
+class View:
+    def __init__(self, tick, state, players_x, bullets_y, debris_y, rotation):
+        self.tick = tick
+        self.score = state.score
+        self.level = state.level
+        self.round = state.round
+        self.players = state.players
+        self.players_x = players_x
+        self.bullets_x = state.bullets["x"] / POSITION_SCALE
+        self.bullets_y = bullets_y
+        self.debris = state.debris
+        self.debris_y = debris_y
+        self.rotation = rotation
+
+
+def interpolate(a, b, t):
+    # View of the way from state a to state b (t = 0 .. 1); debris and
+    # rockets are matched by serial and player id, new ones show up as in b
+    debris = b.debris
+    y = debris["y"].astype(np.float64)
+    rotation = debris["rotation"].astype(np.float64)
+    players_x = b.players["x"].astype(np.float64)
+    if a is not b:
+        match = match_serials(a.debris["serial"], debris["serial"])
+        if match.any():
+            old = a.debris[np.searchsorted(a.debris["serial"], debris["serial"][match])]
+            y[match] = old["y"] + (debris["y"][match] - old["y"].astype(np.float64)) * t
+            turn = (debris["rotation"][match].astype(np.int64) - old["rotation"] + 32768) % 65536 - 32768
+            rotation[match] = old["rotation"] + turn * t
+        for row, player_id in enumerate(b.players["id"]):
+            old = np.flatnonzero(a.players["id"] == player_id)
+            if len(old):
+                start = float(a.players["x"][old[0]])
+                players_x[row] = start + (players_x[row] - start) * t
+    # Bullets fly straight up at a fixed speed, so step them back from b
+    tick = a.tick + (b.tick - a.tick) * t
+    bullets_y = b.bullets["y"] / POSITION_SCALE + BULLET_SPEED * (b.tick - tick)
+    return View(tick, b, players_x, bullets_y, y / POSITION_SCALE, rotation / ANGLE_SCALE)
+
+
+# Server-side record of a connected client
+class RemotePlayer:
+    def __init__(self, player_id, address):
+        self.player_id = player_id
+        self.address = address
+        self.sequence = 0
+        self.buttons = 0
+        self.shots = None  # Client's running shot count; None until the first input
+        self.pending_shots = 0
+        self.acked = NO_BASELINE
+        self.sent = OrderedDict()  # tick -> NetState sent, usable as a baseline once acked
+        self.last_heard = time.perf_counter()
+        self.joined = self.last_heard
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.snapshots = 0
+        self.full_snapshots = 0
+
+    def receive_input(self, sequence, acked, buttons, shots):
+        self.last_heard = time.perf_counter()
+        if sequence <= self.sequence:
+            return  # Late or duplicate
+        self.sequence = sequence
+        self.buttons = buttons
+        if acked != NO_BASELINE and (self.acked == NO_BASELINE or acked > self.acked):
+            self.acked = acked
+        if self.shots is not None:
+            self.pending_shots += (shots - self.shots) & 0xFFFF
+        self.shots = shots
+
+    def take_input(self):
+        # One shot per tick, like a key press in the single-player game
+        fire = self.pending_shots > 0
+        if fire:
+            self.pending_shots -= 1
+        return FrameInput(bool(self.buttons & LEFT), bool(self.buttons & RIGHT), fire)
+
+
+# Authoritative co-op server. Runs the CoopWorld at TICK_RATE on an asyncio
+# loop, takes client inputs over UDP and every snapshot_interval ticks
+# sends each client a quantized snapshot delta-encoded against the newest
+# one that client acknowledged (in full when there is none). A round that
+# ends restarts right away with everyone still connected.
+class CoopServer(asyncio.DatagramProtocol):
+    def __init__(self, snapshot_interval=2, max_players=MAX_PLAYERS, max_debris=15,
+                 seed=None, collision_mode="box", history=64, timeout=5.0):
+        self.tick_rate = TICK_RATE  # Sent to clients, which pace their clocks by it
+        self.snapshot_interval = snapshot_interval
+        self.max_players = min(max_players, MAX_PLAYERS)
+        self.history = history  # Snapshots kept per client as possible baselines
+        self.timeout = timeout  # Seconds of silence before a client is dropped
+        self.world = CoopWorld(max_debris, seed, collision_mode)
+        self.world.particles_per_kill = 0  # Clients draw their own explosions
+        self.players = {}  # address -> RemotePlayer
+        self.tick = 0
+        self.round = 0
+        self.tick_times = []
+        self.oversize = 0  # Snapshots too big for one datagram (not sent)
+        self.transport = None
+        self.closed = False
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        # Returns the bound (host, port); port 0 picks a free one
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: self, local_addr=(host, port))
+        return self.transport.get_extra_info("sockname")[:2]
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        kind = data[:1]
+        player = self.players.get(address)
+        if player is not None:
+            player.bytes_received += len(data)
+        if kind == b"I" and player is not None and len(data) == INPUT.size:
+            player.receive_input(*INPUT.unpack(data)[1:])
+        elif kind == JOIN:
+            if player is None:
+                taken = {other.player_id for other in self.players.values()}
+                free = [player_id for player_id in range(self.max_players) if player_id not in taken]
+                if not free:
+                    self.transport.sendto(FULL, address)
+                    return
+                player = self.players[address] = RemotePlayer(free[0], address)
+                self.world.join(player.player_id)
+            self.transport.sendto(WELCOME.pack(b"W", player.player_id, self.tick_rate, self.snapshot_interval),
+                                  address)
+        elif kind == LEAVE and player is not None:
+            self.drop(address)
+
+    def drop(self, address):
+        player = self.players.pop(address)
+        self.world.leave(player.player_id)
+
+    def step(self):
+        start = time.perf_counter()
+        for address, player in list(self.players.items()):
+            if start - player.last_heard > self.timeout:
+                self.drop(address)
+        world = self.world
+        world.step({player.player_id: player.take_input() for player in self.players.values()})
+        self.tick += 1
+        if world.game_over:
+            self.round += 1
+            world.reset()
+        if self.tick % self.snapshot_interval == 0 and self.players:
+            state = quantize(world, self.tick, self.round)
+            for address, player in self.players.items():
+                baseline = player.sent.get(player.acked)
+                data = encode_snapshot(state, baseline)
+                if len(data) > MAX_DATAGRAM:
+                    self.oversize += 1
+                    continue
+                self.transport.sendto(data, address)
+                player.sent[self.tick] = state
+                while len(player.sent) > self.history:
+                    player.sent.popitem(last=False)
+                player.bytes_sent += len(data)
+                player.snapshots += 1
+                player.full_snapshots += baseline is None
+        self.tick_times.append(time.perf_counter() - start)
+
+    async def serve(self, duration=None):
+        # Runs the fixed tick until close(), or for duration seconds
+        timestep = FixedTimestep(self.tick_rate)
+        timestep.advance()
+        end = None if duration is None else time.perf_counter() + duration
+        while not self.closed and (end is None or time.perf_counter() < end):
+            for _ in range(timestep.advance()):
+                self.step()
+            await asyncio.sleep(max(0.0, timestep.dt - timestep.accumulator))
+
+    def close(self):
+        self.closed = True
+        if self.transport is not None:
+            self.transport.close()
+
+    def stats(self):
+        # Per-client payload bytes (IP/UDP headers not included) and tick cost
+        now = time.perf_counter()
+        clients = []
+        for player in self.players.values():
+            seconds = max(now - player.joined, 1e-9)
+            clients.append({
+                "player": player.player_id,
+                "down_bps": player.bytes_sent / seconds,
+                "up_bps": player.bytes_received / seconds,
+                "snapshots": player.snapshots,
+                "full_snapshots": player.full_snapshots,
+            })
+        times = np.array(self.tick_times or [0.0]) * 1000
+        return {
+            "ticks": self.tick,
+            "rounds": self.round,
+            "debris": len(self.world.debris),
+            "tick_ms": float(times.mean()),
+            "tick_ms_p99": float(np.percentile(times, 99)),
+            "oversize": self.oversize,
+            "clients": clients,
+        }
+
+    def report(self):
+        stats = self.stats()
+        lines = [f"{stats['ticks']} ticks, round {stats['rounds'] + 1}, {stats['debris']} debris, "
+                 f"tick {stats['tick_ms']:.3f} ms (p99 {stats['tick_ms_p99']:.3f} ms)"]
+        for client in stats["clients"]:
+            lines.append(f"  player {client['player'] + 1}: {client['down_bps'] / 1024:.1f} KB/s down, "
+                         f"{client['up_bps'] / 1024:.1f} KB/s up, "
+                         f"{client['full_snapshots']}/{client['snapshots']} full snapshots")
+        return "\n".join(lines)
+
+
+# Client end: joins a CoopServer, sends inputs, decodes snapshots and
+# interpolates between them. view() draws interpolation_ticks behind the
+# newest snapshot (by default two snapshot intervals), so a late or lost
+# snapshot rarely leaves nothing to interpolate towards.
+class CoopClient(asyncio.DatagramProtocol):
+    def __init__(self, interpolation_ticks=None, history=64):
+        self.interpolation_ticks = interpolation_ticks
+        self.history = history
+        self.player_id = None
+        self.tick_rate = TICK_RATE
+        self.snapshot_interval = 1
+        self.states = OrderedDict()  # tick -> NetState, oldest first
+        self.latest = None
+        self.clock_offset = None  # Local time of server tick 0, estimated from arrivals
+        self.sequence = 0
+        self.shots = 0
+        self.bytes_received = 0
+        self.snapshots = 0
+        self.missing_baseline = 0
+        self.transport = None
+        self._welcome = None
+
+    async def connect(self, host="127.0.0.1", port=DEFAULT_PORT, timeout=2.0, attempts=4):
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: self, remote_addr=(host, port))
+        self._welcome = loop.create_future()
+        for _ in range(attempts):
+            self.transport.sendto(JOIN)
+            try:
+                await asyncio.wait_for(asyncio.shield(self._welcome), timeout / attempts)
+                break
+            except asyncio.TimeoutError:
+                continue
+        else:
+            self.transport.close()
+            raise TimeoutError(f"no answer from {host}:{port}")
+        if self.interpolation_ticks is None:
+            self.interpolation_ticks = 2 * self.snapshot_interval
+        return self.player_id
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def error_received(self, error):
+        pass  # E.g. the server is not up yet; JOIN is retried
+
+    def datagram_received(self, data, address):
+        kind = data[:1]
+        self.bytes_received += len(data)
+        if kind == b"S" and len(data) >= SNAPSHOT.size:
+            self.receive_snapshot(data)
+        elif kind == b"W" and not self._welcome.done():
+            _, self.player_id, self.tick_rate, self.snapshot_interval = WELCOME.unpack(data)
+            self._welcome.set_result(self.player_id)
+        elif kind == FULL and not self._welcome.done():
+            self._welcome.set_exception(ConnectionRefusedError("server is full"))
+
+    def receive_snapshot(self, data):
+        state = decode_snapshot(data, self.states)
+        if state is None:
+            self.missing_baseline += 1
+            return
+        if self.latest is not None and state.tick <= self.latest.tick:
+            return  # Arrived out of order; newer ones are already here
+        self.snapshots += 1
+        self.latest = state
+        self.states[state.tick] = state
+        while len(self.states) > self.history:
+            self.states.popitem(last=False)
+        # The least delayed arrival gives the best clock estimate; creep
+        # towards later ones so a drifting clock is followed
+        offset = time.perf_counter() - state.tick / self.tick_rate
+        if self.clock_offset is None or offset < self.clock_offset:
+            self.clock_offset = offset
+        else:
+            self.clock_offset += (offset - self.clock_offset) * 0.01
+
+    def send_input(self, left=False, right=False, fire=False):
+        if fire:
+            self.shots = (self.shots + 1) & 0xFFFF
+        self.sequence += 1
+        acked = NO_BASELINE if self.latest is None else self.latest.tick
+        self.transport.sendto(INPUT.pack(b"I", self.sequence, acked, left | right << 1, self.shots))
+
+    def view(self, now=None):
+        # Interpolated View for local time now, or None before the first snapshot
+        if self.latest is None:
+            return None
+        now = time.perf_counter() if now is None else now
+        tick = (now - self.clock_offset) * self.tick_rate - self.interpolation_ticks
+        ticks = list(self.states)
+        index = bisect.bisect_right(ticks, tick)
+        if index == 0:
+            a = b = self.states[ticks[0]]
+        elif index == len(ticks):
+            a = b = self.latest  # Nothing newer yet; hold the last state
+        else:
+            a = self.states[ticks[index - 1]]
+            b = self.states[ticks[index]]
+        t = 0.0 if a is b else (tick - a.tick) / (b.tick - a.tick)
+        return interpolate(a, b, t)
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.sendto(LEAVE)
+            self.transport.close()
+            self.transport = None
+
+
+# Draws Views with the single-player sprites. Debris gone from one view
+# to the next while still on screen was shot, and explodes locally.
+class CoopRenderer:
+    def __init__(self):
+        self.field = DebrisField(view=Debris)
+        self.rockets = {}  # player id -> Rocket, only used for drawing
+        self.particles = ParticleSystem()
+        self.hud = create_hud()
+        self.last_debris = None
+        self.round = None
+
+    def sync_rockets(self, view):
+        for player, x in zip(view.players, view.players_x):
+            player_id = int(player["id"])
+            rocket = self.rockets.get(player_id)
+            if rocket is None or rocket.num_launchers > player["launchers"]:
+                rocket = self.rockets[player_id] = Rocket()
+            while rocket.num_launchers < player["launchers"]:
+                rocket.upgrade()
+            rocket.x = rocket.prev_x = x
+            rocket.animate_flame()
+
+    def explode_missing(self, view):
+        last = self.last_debris
+        debris = view.debris
+        self.last_debris = (debris["serial"], view.debris_y, debris["x"], debris["size"].astype(np.int64))
+        if view.round != self.round:
+            self.round = view.round  # A new round replaced the whole field
+            self.particles.clear()
+            return
+        serials, y, x, size = last
+        gone = ~match_serials(view.debris["serial"], serials) & (y < WINDOW_HEIGHT - size)
+        for index in np.flatnonzero(gone):
+            half_size = int(size[index]) // 2
+            self.particles.emit(40, int(x[index]) + half_size, float(y[index]) + half_size, (200, 200, 200))
+
+    def draw(self, surface, view, background, player_id):
+        background.draw(surface)
+        self.sync_rockets(view)
+        self.explode_missing(view)
+        self.particles.update()
+
+        n = len(view.debris)
+        columns = {name: np.zeros(n) for name in INT_COLUMNS + FLOAT_COLUMNS}
+        columns.update(shape_index=view.debris["shape"], size=view.debris["size"], x=view.debris["x"],
+                       serial=view.debris["serial"], y=view.debris_y, prev_y=view.debris_y,
+                       rotation=view.rotation, prev_rotation=view.rotation)
+        self.field.load(columns, n)
+
+        queue = render_queue
+        for player in view.players:
+            if not player["out"]:
+                rocket = self.rockets[int(player["id"])]
+                queue.extend(ROCKET, rocket.blit_pairs())
+                label = text_cache.render("YOU" if player["id"] == player_id else f"P{player['id'] + 1}", 20, WHITE)
+                queue.add(HUD, label, (rocket.x + (rocket.width - label.get_width()) / 2, rocket.y + rocket.height))
+        sprite = bullet_sprite(3)
+        queue.extend(BULLETS, ((sprite, (x - 3, y - 3)) for x, y in zip(view.bullets_x.tolist(),
+                                                                         view.bullets_y.tolist())),
+                     len(view.bullets_x))
+        queue.extend(DEBRIS, debris_blits(self.field), n)
+        queue.extend(PARTICLES, self.particles.blit_pairs(), len(self.particles))
+
+        score_label, level_label, debris_label = self.hud
+        queue.add(HUD, *score_label.blit_pair(view.score))
+        queue.add(HUD, *level_label.blit_pair(view.level))
+        queue.add(HUD, *debris_label.blit_pair(n))
+        me = view.players[view.players["id"] == player_id]
+        if len(me) and me["out"][0]:
+            label = text_cache.render("You're out - waiting for the next round", 36, WHITE)
+            queue.add(HUD, label, ((WINDOW_WIDTH - label.get_width()) / 2, WINDOW_HEIGHT / 2))
+        queue.flush(surface)
+
+
+async def play(host="127.0.0.1", port=DEFAULT_PORT, fps=60, render_scale=1.0, fullscreen=False):
+    # Joins a server and plays in a window: LEFT / RIGHT move, SPACE fires,
+    # ESC leaves, F11 toggles fullscreen
+    init_display(False, render_scale, fullscreen)
+    client = CoopClient()
+    player_id = await client.connect(host, port)
+    pygame.display.set_caption(f"Space Shooter - player {player_id + 1}")
+    warm_up_debris()
+    background = Background(WINDOW_WIDTH, WINDOW_HEIGHT, DEEP_SPACE, NEBULA_COLOR, NUM_STARS,
+                            scale=game.viewport.render_scale)
+    renderer = CoopRenderer()
+    try:
+        while True:
+            start = time.perf_counter()
+            fire = False
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        return
+                    elif event.key == pygame.K_SPACE:
+                        fire = True
+                    elif event.key == pygame.K_F11:
+                        game.viewport.toggle_fullscreen()
+            keys = pygame.key.get_pressed()
+            client.send_input(keys[pygame.K_LEFT], keys[pygame.K_RIGHT], fire)
+
+            view = client.view()
+            background.update()
+            game.viewport.sync()
+            canvas = game.viewport.canvas
+            if view is None:
+                background.draw(canvas)
+            else:
+                renderer.draw(canvas, view, background, player_id)
+            game.viewport.present()
+            await asyncio.sleep(max(0.0, 1 / fps - (time.perf_counter() - start)))
+    finally:
+        client.close()
+
+
+async def serve(host, port, duration=None, report_every=5.0, **server_kwargs):
+    server = CoopServer(**server_kwargs)
+    host, port = await server.start(host, port)
+    print(f"Serving co-op on {host}:{port}")
+
+    async def report():
+        while True:
+            await asyncio.sleep(report_every)
+            print(server.report())
+
+    reporter = asyncio.create_task(report())
+    try:
+        await server.serve(duration)
+    finally:
+        reporter.cancel()
+        server.close()
+        print(server.report())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Space Shooter co-op over UDP")
+    commands = parser.add_subparsers(dest="command", required=True)
+    server_parser = commands.add_parser("server", help="run an authoritative server")
+    server_parser.add_argument("--host", default="127.0.0.1")
+    server_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    server_parser.add_argument("--snapshot-interval", type=int, default=2, help="ticks between snapshots")
+    server_parser.add_argument("--max-players", type=int, default=MAX_PLAYERS)
+    server_parser.add_argument("--max-debris", type=int, default=15)
+    server_parser.add_argument("--seed", type=int, help="seed for the first round")
+    server_parser.add_argument("--collision", choices=COLLISION_MODES, default="box")
+    server_parser.add_argument("--seconds", type=float, help="stop after this long")
+    client_parser = commands.add_parser("client", help="join a server and play")
+    client_parser.add_argument("--host", default="127.0.0.1")
+    client_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    client_parser.add_argument("--fps", type=int, default=60)
+    client_parser.add_argument("--render-scale", type=float, default=1.0)
+    client_parser.add_argument("--fullscreen", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "server":
+            asyncio.run(serve(args.host, args.port, args.seconds, snapshot_interval=args.snapshot_interval,
+                              max_players=args.max_players, max_debris=args.max_debris, seed=args.seed,
+                              collision_mode=args.collision))
+        else:
+            asyncio.run(play(args.host, args.port, args.fps, args.render_scale, args.fullscreen))
+    except KeyboardInterrupt:
+        pass
+    except (TimeoutError, ConnectionRefusedError) as error:
+        sys.exit(f"Could not join: {error}")
+    pygame.quit()
@@ -0,0 +1,168 @@
+import math
+
+import numpy as np
+import pygame
+
+# Rows of ParticleSystem.state (struct-of-arrays storage)
+X, Y, VX, VY, ROTATION, ROTATION_SPEED, LIFE, SIZE = range(8)
+NUM_FIELDS = 8
+
+MAX_SIZE = 8  # Largest particle radius at spawn
+SIZE_STEP = 0.5  # Sprite radius quantization in pixels
+SIZE_BINS = int(MAX_SIZE / SIZE_STEP) + 1
+ROTATION_STEPS = 8  # Hexagons repeat every 60 degrees
+ALPHA_STEPS = 16
+FADE_RATE = 0.015  # Life lost per tick; particles live 1 / FADE_RATE ticks
+
+
+class ParticleSystem:
+    def __init__(self, capacity=1024, max_particles=None, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.max_particles = max_particles  # None means unbounded
+        self.fade_rate = FADE_RATE
+        self.count = 0
+        self.state = np.zeros((NUM_FIELDS, capacity))
+        self.color_ids = np.zeros(capacity, dtype=np.intp)
+        self.colors = []
+        self._sprites = {}
+        # Offset from particle center to sprite top-left, per size bin
+        self._half = np.array([self._sprite_dim(b) // 2 for b in range(SIZE_BINS)])
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, needed):
+        capacity = self.state.shape[1]
+        while capacity < needed:
+            capacity *= 2
+        state = np.zeros((NUM_FIELDS, capacity))
+        state[:, :self.count] = self.state[:, :self.count]
+        color_ids = np.zeros(capacity, dtype=np.intp)
+        color_ids[:self.count] = self.color_ids[:self.count]
+        self.state = state
+        self.color_ids = color_ids
+
+    def _color_id(self, color):
+        color = tuple(color)
+        if color not in self.colors:
+            self.colors.append(color)
+        return self.colors.index(color)
+
+    def emit(self, n, x, y, color):
+        if self.max_particles is not None:
+            n = min(n, self.max_particles - self.count)
+        if n <= 0:
+            return 0
+        if self.count + n > self.state.shape[1]:
+            self._grow(self.count + n)
+
+        rng = self.rng
+        angle = rng.uniform(0, 2 * math.pi, n)  # Random angle
+        speed = rng.uniform(2, 6, n)
+        new = self.state[:, self.count:self.count + n]
+        new[X] = x
+        new[Y] = y
+        new[VX] = np.cos(angle) * speed
+        new[VY] = np.sin(angle) * speed
+        new[ROTATION] = rng.uniform(0, 360, n)
+        new[ROTATION_SPEED] = rng.uniform(-10, 10, n)
+        new[LIFE] = 1.0
+        new[SIZE] = rng.uniform(4, MAX_SIZE, n)
+        self.color_ids[self.count:self.count + n] = self._color_id(color)
+        self.count += n
+        return n
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        x, y, vx, vy, rotation, rotation_speed, life, size = self.state[:, :n]
+        x += vx
+        y += vy
+        rotation += rotation_speed
+        life -= self.fade_rate
+        size *= 0.99  # Slower shrink
+        vy += 0.1  # Gravity
+
+        # Drop dead particles in one compaction pass
+        alive = life > 0
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            self.count = len(keep)
+            self.state[:, :self.count] = self.state[:, keep]
+            self.color_ids[:self.count] = self.color_ids[keep]
+
+    def clear(self):
+        self.count = 0
+
+    def copy_from(self, other):
+        # Become a copy of other's live particles, reusing this system's
+        # arrays and sprite cache
+        n = other.count
+        if n > self.state.shape[1]:
+            self.count = 0
+            self._grow(n)
+        self.state[:, :n] = other.state[:, :n]
+        self.color_ids[:n] = other.color_ids[:n]
+        if len(self.colors) != len(other.colors):
+            self.colors = list(other.colors)
+        self.fade_rate = other.fade_rate
+        self.count = n
+
+    @staticmethod
+    def _sprite_dim(size_bin):
+        return 2 * math.ceil(size_bin * SIZE_STEP) + 4
+
+    def _render_sprite(self, key):
+        rest, alpha_bin = divmod(key, ALPHA_STEPS + 1)
+        rest, rotation_bin = divmod(rest, ROTATION_STEPS)
+        color_id, size_bin = divmod(rest, SIZE_BINS)
+
+        dim = self._sprite_dim(size_bin)
+        sprite = pygame.Surface((dim, dim), pygame.SRCALPHA)
+        radius = size_bin * SIZE_STEP
+        rotation = math.radians((rotation_bin + 0.5) * 60 / ROTATION_STEPS)
+        center = dim / 2
+        points = []
+        for i in range(6):
+            angle = (2 * math.pi * i) / 6 + rotation
+            points.append((center + radius * math.cos(angle), center + radius * math.sin(angle)))
+
+        alpha = int(255 * alpha_bin / ALPHA_STEPS)
+        color = self.colors[color_id]
+        inner_color = tuple(min(255, c + 50) for c in color)
+        pygame.draw.polygon(sprite, (*color, alpha), points)
+        # Inner glow
+        pygame.draw.polygon(sprite, (*inner_color, alpha), points, 1)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        self._sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface, alpha=1.0):
+        surface.blits(self.blit_pairs(alpha), doreturn=False)
+        return self.count
+
+    def blit_pairs(self, alpha=1.0):
+        # Iterator of (sprite, position) for every live particle, for Surface.blits
+        n = self.count
+        if not n:
+            return iter(())
+        x, y, vx, vy, rotation, _, life, size = self.state[:, :n]
+        if alpha != 1.0:
+            # Step back towards the previous tick's position
+            x = x + (alpha - 1.0) * vx
+            y = y + (alpha - 1.0) * vy
+        size_bin = np.minimum(np.rint(size / SIZE_STEP).astype(np.intp), SIZE_BINS - 1)
+        rotation_bin = ((rotation % 60) * (ROTATION_STEPS / 60)).astype(np.intp) % ROTATION_STEPS
+        alpha_bin = np.clip(np.ceil(life * ALPHA_STEPS).astype(np.intp), 1, ALPHA_STEPS)
+        keys = ((self.color_ids[:n] * SIZE_BINS + size_bin) * ROTATION_STEPS + rotation_bin) * (ALPHA_STEPS + 1) + alpha_bin
+        half = self._half[size_bin]
+        left = (x - half).astype(np.intp).tolist()
+        top = (y - half).astype(np.intp).tolist()
+
+        sprites = self._sprites
+        for key in np.unique(keys).tolist():
+            if key not in sprites:
+                self._render_sprite(key)
+        return zip(map(sprites.__getitem__, keys.tolist()), zip(left, top))
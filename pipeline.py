@@ -0,0 +1,219 @@
+import sys
+import threading
+import time
+from collections import deque
+
+from timestep import FixedTimestep
+
+# Free-threaded CPython builds (3.13t+) can run both threads' Python code
+# at once; with the GIL only NumPy and pygame calls that release it overlap
+GIL_ENABLED = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+SIMULATION, RENDER = range(2)
+
+
+# Hands snapshots from the simulation thread to the renderer. Three
+# buffers: the simulation fills `back`, publish() swaps it with `ready`,
+# and latest() swaps `ready` into `front` for the renderer. Neither side
+# ever waits for the other or sees a buffer that is being written, and
+# buffers are reused, so snapshots cost copies but no allocations.
+class SnapshotBuffers:
+    def __init__(self, factory):
+        self._back, self._ready, self._front = factory(), factory(), factory()
+        self._fresh = False
+        self._lock = threading.Lock()
+        self.published = 0
+        self.skipped = 0  # Published but replaced before the renderer took them
+
+    @property
+    def back(self):
+        return self._back
+
+    def publish(self):
+        with self._lock:
+            self._back, self._ready = self._ready, self._back
+            if self._fresh:
+                self.skipped += 1
+            self._fresh = True
+            self.published += 1
+
+    def latest(self):
+        # The newest published snapshot; stays valid until the next call
+        with self._lock:
+            if self._fresh:
+                self._front, self._ready = self._ready, self._front
+                self._fresh = False
+            return self._front
+
+
+# Keyboard state shared with the simulation thread. Held keys are sampled
+# every tick; a fire press is latched until one tick consumes it.
+class InputLatch:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.left = False
+        self.right = False
+        self._fire = False
+
+    def hold(self, left, right):
+        self.left = left
+        self.right = right
+
+    def fire(self):
+        with self._lock:
+            self._fire = True
+
+    def take(self):
+        # (left, right, fire) for one tick
+        with self._lock:
+            fire = self._fire
+            self._fire = False
+        return self.left, self.right, fire
+
+
+# Busy intervals of the simulation and render threads, with the CPU time
+# each thread spent in them. Wall intervals overlapping only means both
+# were in flight; under the GIL they mostly take turns. The CPU time beyond
+# the wall time they span is what really ran in parallel.
+class OverlapMeter:
+    def __init__(self, window=2000):
+        self._intervals = (deque(maxlen=window), deque(maxlen=window))
+
+    def record(self, side, start, end, cpu):
+        # start and end from time.perf_counter, cpu from time.thread_time
+        self._intervals[side].append((start, end, cpu))
+
+    def reset(self):
+        for intervals in self._intervals:
+            intervals.clear()
+
+    def summary(self):
+        simulation = sorted(self._intervals[SIMULATION])
+        render = sorted(self._intervals[RENDER])
+        in_flight = 0.0
+        i = j = 0
+        while i < len(simulation) and j < len(render):
+            start = max(simulation[i][0], render[j][0])
+            end = min(simulation[i][1], render[j][1])
+            if end > start:
+                in_flight += end - start
+            if simulation[i][1] < render[j][1]:
+                i += 1
+            else:
+                j += 1
+        # Wall time covered by either side
+        span = 0.0
+        covered_until = None
+        for start, end, _ in sorted(simulation + render):
+            if covered_until is None or start > covered_until:
+                span += end - start
+                covered_until = end
+            elif end > covered_until:
+                span += end - covered_until
+                covered_until = end
+        simulation_cpu = sum(cpu for _, _, cpu in simulation)
+        render_cpu = sum(cpu for _, _, cpu in render)
+        parallel = max(0.0, simulation_cpu + render_cpu - span)
+        shorter = min(simulation_cpu, render_cpu)
+        return {
+            "simulation_ms": sum(end - start for start, end, _ in simulation) * 1000,
+            "render_ms": sum(end - start for start, end, _ in render) * 1000,
+            "simulation_cpu_ms": simulation_cpu * 1000,
+            "render_cpu_ms": render_cpu * 1000,
+            "in_flight_ms": in_flight * 1000,
+            "span_ms": span * 1000,
+            "parallel_ms": parallel * 1000,
+            # 1.0 means the shorter side's work ran entirely in parallel with the other
+            "parallel_share": min(1.0, parallel / shorter) if shorter else 0.0,
+        }
+
+    def report(self):
+        stats = self.summary()
+        return (f"sim {stats['simulation_cpu_ms']:.0f} ms CPU, render {stats['render_cpu_ms']:.0f} ms CPU, "
+                f"{stats['parallel_ms']:.0f} ms in parallel ({stats['parallel_share']:.0%})")
+
+
+# Runs the simulation on its own thread at a fixed tick rate. tick() is
+# called once per simulation tick and returns False to stop (game over);
+# capture(snapshot) copies the state into a snapshot after each batch of
+# ticks. Snapshots carry tick_time, the wall time of their last tick, so
+# the renderer can interpolate (see alpha()).
+class SimulationThread:
+    def __init__(self, tick, capture, buffers, tick_rate=60, meter=None, max_ticks_per_frame=5):
+        self.tick = tick
+        self.capture = capture
+        self.buffers = buffers
+        self.meter = meter
+        self.timestep = FixedTimestep(tick_rate, max_ticks_per_frame)
+        self.ticks = 0
+        self.finished = False  # tick() asked to stop
+        self._ticks_reported = 0
+        self._running = threading.Event()
+        self._running.set()
+        self._stop = threading.Event()
+        self._step_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        timestep = self.timestep
+        clock = time.perf_counter
+        cpu_clock = time.thread_time
+        while not self._stop.is_set():
+            self._running.wait()
+            with self._step_lock:
+                if self._stop.is_set() or not self._running.is_set():
+                    continue
+                ticks = timestep.advance()
+                if ticks:
+                    start = clock()
+                    start_cpu = cpu_clock()
+                    for _ in range(ticks):
+                        self.ticks += 1
+                        if not self.tick():
+                            self.finished = True
+                            self._stop.set()
+                            break
+                    snapshot = self.buffers.back
+                    self.capture(snapshot)
+                    snapshot.tick_time = timestep.last - timestep.accumulator
+                    snapshot.dt = timestep.dt
+                    self.buffers.publish()
+                    if self.meter:
+                        self.meter.record(SIMULATION, start, clock(), cpu_clock() - start_cpu)
+            if not ticks:
+                # Sleep (without the GIL) until the next tick is due
+                time.sleep(max(0.0, timestep.dt - timestep.accumulator - (clock() - timestep.last)))
+
+    def take_ticks(self):
+        # Ticks simulated since the last call, for rate counters
+        ticks = self.ticks
+        count = ticks - self._ticks_reported
+        self._ticks_reported = ticks
+        return count
+
+    def pause(self):
+        # Returns once no tick is running; the world can then be read safely
+        self._running.clear()
+        with self._step_lock:
+            pass
+
+    def resume(self):
+        self.timestep.reset()  # Don't replay the time spent paused
+        self._running.set()
+
+    def stop(self):
+        self._stop.set()
+        self._running.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    @staticmethod
+    def alpha(snapshot, now=None):
+        # How far the renderer is past the snapshot's tick, as FixedTimestep.alpha
+        if snapshot.tick_time is None:
+            return 1.0
+        now = time.perf_counter() if now is None else now
+        return max(0.0, min(1.0, (now - snapshot.tick_time) / snapshot.dt))
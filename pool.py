@@ -0,0 +1,42 @@
+# Free-list object pool. Pooled types implement reset(*args), which
+# re-initializes a recycled instance exactly like __init__ would.
+class Pool:
+    def __init__(self, cls, capacity=0):
+        self.cls = cls
+        # Pre-allocated instances are only initialized by their first reset()
+        self._free = [cls.__new__(cls) for _ in range(capacity)]
+        self.capacity = capacity  # Instances created so far
+        self.active = 0
+        self.high_water = 0
+        self.allocations_avoided = 0
+
+    def acquire(self, *args):
+        if self._free:
+            obj = self._free.pop()
+            obj.reset(*args)
+            self.allocations_avoided += 1
+        else:
+            obj = self.cls(*args)
+            self.capacity += 1
+        self.active += 1
+        if self.active > self.high_water:
+            self.high_water = self.active
+        return obj
+
+    def release(self, obj):
+        self.active -= 1
+        self._free.append(obj)
+
+    def release_all(self, objs):
+        self.active -= len(objs)
+        self._free.extend(objs)
+
+    def stats(self):
+        return {
+            "type": self.cls.__name__,
+            "capacity": self.capacity,
+            "active": self.active,
+            "free": len(self._free),
+            "high_water": self.high_water,
+            "allocations_avoided": self.allocations_avoided,
+        }
@@ -0,0 +1,249 @@
+import csv
+import heapq
+import io
+import json
+import os
+import queue
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+
+import pygame
+
+
+# Per-phase frame timer. Call begin_frame(), then mark(name) after each
+# phase; the time since the previous mark is charged to that phase (marks
+# with the same name add up, e.g. over several simulation ticks). When
+# disabled every call returns immediately.
+class FrameProfiler:
+    def __init__(self, enabled=False, window=120, worst=5, writer=None, capture=None):
+        self.enabled = enabled
+        self.window = window
+        self.writer = writer
+        self.capture = capture
+        self.frame = 0
+        self.phases = {}
+        self.counts = {}
+        self.gauges = {}
+        self._history = defaultdict(lambda: deque(maxlen=window))
+        self._frame_times = deque(maxlen=window)
+        self.worst_frames = []  # min-heap of (frame_ms, frame, phases)
+        self.worst = worst
+        self._frame_start = 0
+        self._last = 0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.phases = {}
+        self.counts = {}
+        self._frame_start = self._last = time.perf_counter_ns()
+        if self.capture:
+            self.capture.begin()
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.phases[name] = self.phases.get(name, 0) + now - self._last
+        self._last = now
+
+    def count(self, name, value):
+        if self.enabled:
+            self.counts[name] = value
+
+    def gauge(self, name, value):
+        if self.enabled:
+            self.gauges[name] = value
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        total = now - self._frame_start
+        frame_ms = total / 1e6
+        self._frame_times.append(frame_ms)
+        for name, duration in self.phases.items():
+            self._history[name].append(duration / 1e6)
+
+        entry = (frame_ms, self.frame, dict(self.phases))
+        if len(self.worst_frames) < self.worst:
+            heapq.heappush(self.worst_frames, entry)
+        elif frame_ms > self.worst_frames[0][0]:
+            heapq.heapreplace(self.worst_frames, entry)
+
+        if self.capture:
+            self.capture.end(self.frame, frame_ms)
+        if self.writer:
+            self.writer.submit(self.frame, self._frame_start, total, self.phases, self.counts)
+        self.frame += 1
+
+    def averages(self):
+        return {name: sum(samples) / len(samples) for name, samples in self._history.items() if samples}
+
+    def summary_lines(self):
+        frames = self._frame_times
+        if not frames:
+            return ["profiler: no frames yet"]
+        avg = sum(frames) / len(frames)
+        lines = [f"frame {avg:6.2f} ms avg  {max(frames):6.2f} ms worst (last {len(frames)})"]
+        for name, value in sorted(self.averages().items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<12} {value:6.2f} ms")
+        if self.counts:
+            lines.append("  draws: " + "  ".join(f"{name} {value}" for name, value in self.counts.items()))
+        for name, value in self.gauges.items():
+            lines.append(f"  {name}: {value}")
+        return lines
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        if self.capture:
+            self.capture.close()
+
+
+# Semi-transparent text panel, re-rendered a few times a second at most
+class ProfilerOverlay:
+    def __init__(self, profiler, fonts, position=(10, 130), refresh_ms=250):
+        self.profiler = profiler
+        self.font = fonts.get(None, 22)
+        self.position = position
+        self.refresh_ms = refresh_ms
+        self.visible = False
+        self._panel = None
+        self._next_refresh = 0
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.profiler.enabled = self.profiler.enabled or self.visible
+
+    def draw(self, surface):
+        if not self.visible:
+            return
+        now = pygame.time.get_ticks()
+        if self._panel is None or now >= self._next_refresh:
+            lines = [self.font.render(line, True, (0, 255, 0)) for line in self.profiler.summary_lines()]
+            width = max(line.get_width() for line in lines) + 10
+            height = sum(line.get_height() for line in lines) + 10
+            panel = pygame.Surface((width, height), pygame.SRCALPHA)
+            panel.fill((0, 0, 0, 160))
+            y = 5
+            for line in lines:
+                panel.blit(line, (5, y))
+                y += line.get_height()
+            self._panel = panel
+            self._next_refresh = now + self.refresh_ms
+        surface.blit(self._panel, self.position)
+
+
+# Streams per-frame timings to disk from a background thread. Frames are
+# dropped rather than stalling the game when the queue is full.
+class TraceWriter:
+    def __init__(self, path, max_pending=1024):
+        self.path = path
+        self.format = "csv" if path.endswith(".csv") else "chrome"
+        self.dropped = 0
+        self._queue = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, frame, start_ns, total_ns, phases, counts):
+        try:
+            self._queue.put_nowait((frame, start_ns, total_ns, phases, counts))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        with open(self.path, "w", newline="") as f:
+            if self.format == "csv":
+                self._write_csv(f)
+            else:
+                self._write_chrome(f)
+
+    def _frames(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            yield item
+
+    def _write_csv(self, f):
+        writer = None
+        for frame, _, total_ns, phases, counts in self._frames():
+            row = {"frame": frame, "frame_ms": total_ns / 1e6}
+            row.update({f"{name}_ms": duration / 1e6 for name, duration in phases.items()})
+            row.update(counts)
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row), extrasaction="ignore", restval="")
+                writer.writeheader()
+            writer.writerow(row)
+
+    def _write_chrome(self, f):
+        # Chrome trace event format (chrome://tracing, Perfetto); timestamps in microseconds
+        pid = os.getpid()
+        f.write("[\n")
+        first = True
+        for frame, start_ns, total_ns, phases, counts in self._frames():
+            ts = start_ns / 1e3
+            events = [{"name": "frame", "ph": "X", "ts": ts, "dur": total_ns / 1e3,
+                       "pid": pid, "tid": 0, "args": {"frame": frame, **counts}}]
+            offset = ts
+            for name, duration in phases.items():
+                events.append({"name": name, "ph": "X", "ts": offset, "dur": duration / 1e3, "pid": pid, "tid": 0})
+                offset += duration / 1e3
+            for event in events:
+                f.write(("" if first else ",\n") + json.dumps(event))
+                first = False
+        f.write("\n]\n")
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+
+# Opt-in cProfile or tracemalloc capture; only the N slowest frames are kept
+class SlowFrameCapture:
+    def __init__(self, keep=5, mode="cprofile", path="slow_frames.txt"):
+        self.keep = keep
+        self.mode = mode
+        self.path = path
+        self.frames = []  # min-heap of (frame_ms, frame, report)
+        self._profile = None
+        if mode == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def begin(self):
+        if self.mode == "cprofile":
+            import cProfile  # Only when asked for; keeps it out of the game's import time
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._snapshot = tracemalloc.take_snapshot()
+
+    def end(self, frame, frame_ms):
+        if self.mode == "cprofile":
+            self._profile.disable()
+        if len(self.frames) >= self.keep and frame_ms <= self.frames[0][0]:
+            return
+        report = self._report()
+        entry = (frame_ms, frame, report)
+        if len(self.frames) < self.keep:
+            heapq.heappush(self.frames, entry)
+        else:
+            heapq.heapreplace(self.frames, entry)
+
+    def _report(self):
+        out = io.StringIO()
+        if self.mode == "cprofile":
+            import pstats
+            pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(25)
+        else:
+            for stat in tracemalloc.take_snapshot().compare_to(self._snapshot, "lineno")[:25]:
+                print(stat, file=out)
+        return out.getvalue()
+
+    def close(self):
+        with open(self.path, "w") as f:
+            for frame_ms, frame, report in sorted(self.frames, reverse=True):
+                f.write(f"=== frame {frame}: {frame_ms:.2f} ms ===\n{report}\n")
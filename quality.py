@@ -0,0 +1,99 @@
+from collections import deque, namedtuple
+
+from particles import FADE_RATE
+
+# One step of visual detail. Scales are relative to the game's defaults;
+# rotation_step draws every n-th debris rotation frame.
+QualityLevel = namedtuple("QualityLevel", [
+    "name", "particles_per_kill", "particle_lifetime", "star_scale", "nebula_points", "rotation_step",
+])
+
+LEVELS = (
+    QualityLevel("high", 40, 1.0, 1.0, 100, 1),
+    QualityLevel("medium", 25, 0.8, 0.75, 60, 1),
+    QualityLevel("low", 15, 0.6, 0.5, 40, 2),
+    QualityLevel("lower", 8, 0.5, 0.25, 24, 4),
+    QualityLevel("minimal", 3, 0.35, 0.0, 12, 8),
+)
+
+# (frame, old level name, new level name, average frame ms)
+Decision = namedtuple("Decision", ["frame", "old", "new", "frame_ms"])
+
+
+# Watches frame work time (everything but the frame-cap wait) against a
+# budget and steps the visual detail down when over it, back up when there
+# is clear headroom. The gap between the two thresholds plus a cooldown
+# after every change keeps it from oscillating. Only cosmetic settings are
+# touched; nothing the simulation or replays depend on.
+class QualityGovernor:
+    def __init__(self, budget_ms=1000 / 60, window=30, downgrade_at=1.0, upgrade_below=0.6,
+                 cooldown=90, levels=LEVELS, adaptive=True, log=None):
+        self.budget_ms = budget_ms
+        self.adaptive = adaptive  # False pins the current level
+        self.downgrade_at = downgrade_at
+        self.upgrade_below = upgrade_below
+        self.cooldown = cooldown  # Frames to wait after a change before judging again
+        self.levels = levels
+        self.level_index = 0
+        self.log = log  # Optional callable(Decision)
+        self.decisions = deque(maxlen=100)
+        self.frame = 0
+        self._samples = deque(maxlen=window)
+        self._hold = 0
+
+    @property
+    def level(self):
+        return self.levels[self.level_index]
+
+    def level_named(self, name):
+        return [level.name for level in self.levels].index(name)
+
+    def set_level(self, index):
+        index = max(0, min(index, len(self.levels) - 1))
+        if index == self.level_index:
+            return False
+        average = sum(self._samples) / len(self._samples) if self._samples else 0.0
+        decision = Decision(self.frame, self.level.name, self.levels[index].name, average)
+        self.level_index = index
+        self.decisions.append(decision)
+        if self.log:
+            self.log(decision)
+        self._samples.clear()
+        self._hold = self.cooldown
+        return True
+
+    def record(self, frame_ms):
+        # Feed one frame's work time; returns True when the level changed
+        self.frame += 1
+        if not self.adaptive:
+            return False
+        self._samples.append(frame_ms)
+        if self._hold:
+            self._hold -= 1
+            return False
+        if len(self._samples) < self._samples.maxlen:
+            return False
+        average = sum(self._samples) / len(self._samples)
+        if average > self.budget_ms * self.downgrade_at:
+            return self.set_level(self.level_index + 1)
+        if average < self.budget_ms * self.upgrade_below:
+            return self.set_level(self.level_index - 1)
+        return False
+
+    def apply(self, world, background, num_stars):
+        # Push the current level into the cosmetic settings
+        level = self.level
+        world.particles_per_kill = level.particles_per_kill
+        world.particles.fade_rate = FADE_RATE / level.particle_lifetime
+        stars = int(num_stars * level.star_scale)
+        if background.num_stars != stars:
+            background.set_star_count(stars)
+        if background.nebula.num_points != level.nebula_points:
+            background.set_nebula_detail(level.nebula_points)
+
+    def summary(self):
+        last = self.decisions[-1] if self.decisions else None
+        text = f"{self.level.name} ({self.level_index + 1}/{len(self.levels)})"
+        if last:
+            text += f", last {last.old} -> {last.new} at frame {last.frame} ({last.frame_ms:.1f} ms)"
+        return text
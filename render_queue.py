@@ -0,0 +1,84 @@
+from itertools import chain
+from weakref import WeakKeyDictionary
+
+import pygame
+
+# Sprite layers, submitted back to front. The background is not queued: it
+# is a single blit plus a pixel-array write and always goes first.
+LAYERS = ("rocket", "bullets", "debris", "particles", "hud")
+ROCKET, BULLETS, DEBRIS, PARTICLES, HUD = range(len(LAYERS))
+
+# pygame-ce has Surface.fblits (no per-blit return rects); pygame 2.6 only has blits
+HAS_FBLITS = hasattr(pygame.Surface, "fblits")
+
+
+# Collects (sprite, position) pairs per layer during a frame, then submits
+# each non-empty layer with one fblits/blits call. Big batches are queued as
+# lazy iterables and only consumed by the flush, so no per-sprite tuples
+# pile up (they would trigger the cyclic GC every few frames). Positions
+# are logical coordinates; with a scale other than 1 the flush maps them,
+# and the sprites, onto a canvas of that scale (see viewport.Viewport).
+class RenderQueue:
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self._scaled = WeakKeyDictionary()  # Sprite -> copy at self.scale
+        self.layers = [[] for _ in LAYERS]  # Iterables of pairs per layer
+        self.counts = [0] * len(LAYERS)
+        self.submits = 0  # Batched calls in the last flush
+        self.sprites = 0  # Sprites they drew, i.e. the unbatched call count
+        self.layer_sprites = [0] * len(LAYERS)
+
+    def add(self, layer, sprite, position):
+        self.layers[layer].append(((sprite, position),))
+        self.counts[layer] += 1
+
+    def extend(self, layer, pairs, count=None):
+        # count is required when pairs is an iterator
+        self.layers[layer].append(pairs)
+        self.counts[layer] += len(pairs) if count is None else count
+
+    def set_scale(self, scale):
+        if scale != self.scale:
+            self.scale = scale
+            self._scaled.clear()
+
+    def _scale_pair(self, pair):
+        sprite, (x, y) = pair
+        scaled = self._scaled.get(sprite)
+        if scaled is None:
+            width, height = sprite.get_size()
+            size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            if sprite.get_bitsize() in (24, 32):
+                scaled = pygame.transform.smoothscale(sprite, size)
+            else:
+                scaled = pygame.transform.scale(sprite, size)
+            self._scaled[sprite] = scaled
+        return scaled, (x * self.scale, y * self.scale)
+
+    def flush(self, surface, rects=None, profiler=None):
+        # rects: optional list with one list per layer, which receives the
+        # canvas rect of every sprite drawn (needs blits; fblits returns none).
+        # With a profiler each layer is marked as "draw_<layer>", since its
+        # lazy pairs are only produced here.
+        self.submits = 0
+        self.sprites = 0
+        scaled = self.scale != 1.0
+        for index, batches in enumerate(self.layers):
+            count = self.counts[index]
+            self.layer_sprites[index] = count
+            if count:
+                pairs = batches[0] if len(batches) == 1 else chain.from_iterable(batches)
+                if scaled:
+                    pairs = map(self._scale_pair, pairs)
+                if rects is not None:
+                    rects[index].extend(surface.blits(pairs))
+                elif HAS_FBLITS:
+                    surface.fblits(pairs)
+                else:
+                    surface.blits(pairs, doreturn=False)
+                self.submits += 1
+                self.sprites += count
+            batches.clear()
+            self.counts[index] = 0
+            if profiler:
+                profiler.mark(f"draw_{LAYERS[index]}")
@@ -0,0 +1,121 @@
+import hashlib
+import struct
+
+import numpy as np
+
+from collision import COLLISION_MODES
+
+# Replay file layout (little endian):
+#   header  magic, version, tick rate, seed, max debris, tick count,
+#           final score, final state hash, collision mode (version 2+)
+#   body    3 bits per tick (left, right, fire), packed with np.packbits
+MAGIC = b"SSRP"
+VERSION = 2
+HEADER = struct.Struct("<4sHHQHII16sB")
+HEADER_V1 = struct.Struct("<4sHHQHII16s")  # Version 1 files are always "box" collision
+BITS_PER_TICK = 3
+
+
+def pack_input(inputs):
+    left, right, fire = inputs
+    return bool(left) | bool(right) << 1 | bool(fire) << 2
+
+
+def unpack_input(code):
+    return bool(code & 1), bool(code & 2), bool(code & 4)
+
+
+def state_hash(world):
+    # Digest of everything gameplay depends on; visual-only state is left out
+    rocket = world.rocket
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(struct.pack(
+        "<IIIdddI", world.game_time, world.score, world.difficulty_level,
+        world.speed_multiplier, rocket.x, rocket.width, rocket.num_launchers,
+    ))
+    for bullet in rocket.bullets:
+        digest.update(struct.pack("<dd", bullet.x, bullet.y))
+    for debris in world.debris:
+        digest.update(struct.pack(
+            "<Iddddd", debris.shape.shape_id, debris.x, debris.y,
+            debris.speed, debris.rotation, debris.rotation_speed,
+        ))
+    return digest.digest()
+
+
+class InputRecorder:
+    def __init__(self, seed, max_debris, tick_rate=60, collision_mode="box"):
+        self.seed = seed
+        self.max_debris = max_debris
+        self.tick_rate = tick_rate
+        self.collision_mode = collision_mode
+        self._codes = bytearray()
+
+    def __len__(self):
+        return len(self._codes)
+
+    def record(self, inputs):
+        self._codes.append(pack_input(inputs))
+
+    def save(self, path, world):
+        codes = np.frombuffer(bytes(self._codes), dtype=np.uint8)
+        bits = (codes[:, None] >> np.arange(BITS_PER_TICK, dtype=np.uint8)) & 1
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(
+                MAGIC, VERSION, self.tick_rate, self.seed, self.max_debris,
+                len(codes), world.score, state_hash(world),
+                COLLISION_MODES.index(self.collision_mode),
+            ))
+            f.write(np.packbits(bits.ravel()).tobytes())
+
+
+class Replay:
+    def __init__(self, tick_rate, seed, max_debris, codes, final_score, final_hash, collision_mode="box"):
+        self.tick_rate = tick_rate
+        self.seed = seed
+        self.max_debris = max_debris
+        self.collision_mode = collision_mode
+        self.codes = codes
+        self.final_score = final_score
+        self.final_hash = final_hash
+
+    def __len__(self):
+        return len(self.codes)
+
+    def inputs(self):
+        for code in self.codes:
+            yield unpack_input(code)
+
+    def verify(self, world):
+        return world.score == self.final_score and state_hash(world) == self.final_hash
+
+
+def load_replay(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER_V1.size:
+        raise ValueError(f"{path}: truncated replay header")
+    magic, version = struct.unpack_from("<4sH", data)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a replay file")
+    if version == 1:
+        header = HEADER_V1
+        fields = header.unpack_from(data) + (0,)
+    elif version == VERSION:
+        header = HEADER
+        if len(data) < header.size:
+            raise ValueError(f"{path}: truncated replay header")
+        fields = header.unpack_from(data)
+    else:
+        raise ValueError(f"{path}: unsupported replay version {version}")
+    _, _, tick_rate, seed, max_debris, num_ticks, score, final_hash, mode = fields
+    if mode >= len(COLLISION_MODES):
+        raise ValueError(f"{path}: unknown collision mode {mode}")
+
+    body = np.frombuffer(data, dtype=np.uint8, offset=header.size)
+    bits = np.unpackbits(body)[:num_ticks * BITS_PER_TICK]
+    if len(bits) < num_ticks * BITS_PER_TICK:
+        raise ValueError(f"{path}: truncated replay body")
+    weights = 1 << np.arange(BITS_PER_TICK)
+    codes = (bits.reshape(num_ticks, BITS_PER_TICK) * weights).sum(axis=1).tolist()
+    return Replay(tick_rate, seed, max_debris, codes, score, final_hash, COLLISION_MODES[mode])
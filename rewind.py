@@ -0,0 +1,381 @@
+import struct
+import time
+import zlib
+from collections import deque
+from operator import attrgetter
+
+import numpy as np
+
+from debris_field import FLOAT_COLUMNS, INT_COLUMNS
+
+# Snapshot layout: a STATE header, then the body, zlib-compressed when it is
+# at most COMPRESS_LIMIT bytes (bigger bodies are mostly keyframes at high
+# debris counts, where zlib would cost milliseconds for about 2x). In order:
+#
+# - bullet x, y and prev_y (float64);
+# - deltas only: a bit per debris row of the previous snapshot, set if the
+#   row is still live (only when some are gone), then the indices (uint32)
+#   and XOR values (uint64) of the words that differ from the prediction;
+# - the debris rows the prediction doesn't cover, column by column;
+# - the debris RNG's 624 Mersenne Twister words (uint32), in keyframes and
+#   whenever they changed (every 624 draws); its position is in the header.
+#
+# A delta predicts the debris from the previous snapshot: rows still live
+# (matched by spawn serial) are moved on by the ticks in between exactly as
+# DebrisField.move does, so their words usually all match and a delta costs
+# little more than the newly spawned rows. Particles are visual only and
+# are left out.
+STATE = struct.Struct("<IIIdIIIB iiIIdb IIIIBIdB")
+KEYFRAME, KEEP_MASK, TWISTER, COMPRESSED = 1, 2, 4, 8
+COMPRESS_LIMIT = 64 * 1024
+RNG_WORDS = 624
+COLUMNS = INT_COLUMNS + FLOAT_COLUMNS
+BULLET_FIELDS = attrgetter("x", "y", "prev_y")
+SERIAL, Y, PREV_Y, ROTATION, PREV_ROTATION, SPEED, ROTATION_SPEED = (
+    COLUMNS.index(name) for name in ("serial", "y", "prev_y", "rotation", "prev_rotation", "speed", "rotation_speed")
+)
+
+
+def _debris_matrix(debris):
+    # Live rows as one (column, row) array of raw 64-bit words
+    n = len(debris)
+    matrix = np.empty((len(COLUMNS), n), dtype=np.uint64)
+    for row, name in zip(matrix, COLUMNS):
+        row[:] = getattr(debris, name)[:n].view(np.uint64)
+    return matrix
+
+
+def _predict(previous, keep, ticks):
+    # previous's rows (those in keep, or all) moved on `ticks` ticks
+    rows = previous[:, keep] if keep is not None else previous.copy()
+    floats = rows.view(np.float64)
+    for _ in range(ticks):
+        floats[PREV_Y] = floats[Y]
+        floats[Y] += floats[SPEED]
+        floats[PREV_ROTATION] = floats[ROTATION]
+        floats[ROTATION] += floats[ROTATION_SPEED]
+    return rows
+
+
+# Decoded snapshot: the STATE fields, bullet x / y / prev_y rows, the
+# debris matrix (see _debris_matrix) and the RNG's twister words
+class RewindState:
+    def __init__(self, fields, bullets, debris, twister):
+        self.fields = fields
+        self.bullets = bullets
+        self.debris = debris
+        self.twister = twister
+
+    @property
+    def game_time(self):
+        return self.fields[0]
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.position = 0
+
+    def take(self, count, dtype):
+        dtype = np.dtype(dtype)
+        start = self.position
+        self.position += count * dtype.itemsize
+        return np.frombuffer(self.data, dtype=dtype, count=count, offset=start)
+
+
+# The last `seconds` of game state as compact binary snapshots in one
+# preallocated byte arena, used as a ring: new snapshots overwrite the
+# oldest, so memory never grows past max_bytes. Every keyframe_interval-th
+# snapshot is a keyframe and the rest are deltas on the snapshot before;
+# when a keyframe is overwritten its deltas are dropped with it. When
+# snapshots cost more than budget_us per tick on average, only every 2nd,
+# 4th, ... tick is kept (stride).
+class RewindBuffer:
+    def __init__(self, seconds=10, tick_rate=60, max_bytes=16 * 1024 * 1024, keyframe_interval=30,
+                 budget_us=300, max_stride=8):
+        self.seconds = seconds
+        self.tick_rate = tick_rate
+        self.capacity = max_bytes
+        self.keyframe_interval = keyframe_interval
+        self.budget_us = budget_us
+        self.max_stride = max_stride
+        self.stride = 1  # Ticks between snapshots
+        self._arena = bytearray(max_bytes)
+        self._head = 0
+        # (serial, tick, offset, size, keyframe serial), oldest first
+        self._entries = deque()
+        self._serial = 0
+        self._key_serial = None
+        self._previous = None  # (tick, debris matrix, twister words) of the newest snapshot
+        self._since_key = 0
+        self._twister = None  # Last packed RNG words, reused while unchanged
+        self._twister_words = None
+        self._decoded = None  # (serial, RewindState) of the last decoded snapshot
+        self._costs = deque(maxlen=60)
+        self._cost_total = 0.0
+        self.bytes_used = 0  # Sizes of the snapshots still kept
+        # (snapshots, seconds, bytes used, us per snapshot) as of the last
+        # record(); stats() reads only this, as the simulation thread may be
+        # recording while another thread reports
+        self._summary = (0, 0.0, 0, 0.0)
+        self.snapshots = 0
+        self.keyframes = 0
+        self.bytes_written = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self._head = 0
+        self._previous = None
+        self._decoded = None
+        self._costs.clear()
+        self._cost_total = 0.0
+        self.bytes_used = 0
+        self._summary = (0, 0.0, 0, 0.0)
+        self.stride = 1
+
+    def ticks(self):
+        return [entry[1] for entry in self._entries]
+
+    def record(self, world):
+        # Call after every simulation tick
+        if world.game_time % self.stride:
+            return
+        start = time.perf_counter()
+        entries = self._entries
+        keyframe = (self._previous is None or self._since_key >= self.keyframe_interval
+                    or not entries or entries[-1][0] != self._serial - 1)
+        header, body, state = self._encode(world, keyframe)
+        offset = self._reserve(STATE.size + len(body))
+        if offset is not None and not keyframe and not (entries and entries[-1][0] == self._serial - 1):
+            # Making room overwrote the snapshot this delta builds on
+            self._head = offset
+            header, body, state = self._encode(world, True)
+            keyframe = True
+            offset = self._reserve(STATE.size + len(body))
+        if offset is None:
+            return  # Larger than the whole arena
+        size = STATE.size + len(body)
+        self._arena[offset:offset + STATE.size] = header
+        self._arena[offset + STATE.size:offset + size] = body
+
+        serial = self._serial
+        self._serial += 1
+        if keyframe:
+            self._key_serial = serial
+            self._since_key = 0
+            self.keyframes += 1
+        self._since_key += 1
+        self._previous = state
+        entries.append((serial, world.game_time, offset, size, self._key_serial))
+        self.bytes_used += size
+        # Keep only the last `seconds` of history
+        horizon = world.game_time - self.seconds * self.tick_rate
+        while entries and entries[0][1] < horizon:
+            self._drop_oldest()
+
+        self.snapshots += 1
+        self.bytes_written += size
+        costs = self._costs
+        if len(costs) == costs.maxlen:
+            self._cost_total -= costs[0]
+        cost = (time.perf_counter() - start) * 1e6
+        costs.append(cost)
+        self._cost_total += cost
+        self._adapt()
+        span = (entries[-1][1] - entries[0][1] + self.stride) / self.tick_rate if entries else 0.0
+        self._summary = (len(entries), span, self.bytes_used,
+                         self._cost_total / len(costs) if costs else 0.0)
+
+    def _encode(self, world, keyframe):
+        # (header, body, (tick, debris matrix, twister words)) of world's state
+        rocket = world.rocket
+        bullets = rocket.bullets
+        _, words, gauss = world.rng.getstate()
+        twister = words[:RNG_WORDS]
+        if twister != self._twister:
+            self._twister = twister
+            self._twister_words = np.array(twister, dtype=np.uint32)
+        matrix = _debris_matrix(world.debris)
+        n = matrix.shape[1]
+
+        parts = [np.array(list(map(BULLET_FIELDS, bullets)), dtype=np.float64).reshape(-1, 3).T.copy()]
+        flags = 0
+        kept = residuals = 0
+        if keyframe:
+            flags |= KEYFRAME | TWISTER
+        else:
+            previous_tick, previous, previous_twister = self._previous
+            keep = None
+            if previous.shape[1] and n:
+                # Rows stay in spawn order, so the live ones are found by serial
+                serials = matrix[SERIAL]
+                previous_serials = previous[SERIAL]
+                found = np.minimum(np.searchsorted(serials, previous_serials), n - 1)
+                keep = serials[found] == previous_serials
+            elif previous.shape[1]:
+                keep = np.zeros(previous.shape[1], dtype=bool)
+            if keep is not None:
+                kept = int(np.count_nonzero(keep))
+                if kept < len(keep):
+                    flags |= KEEP_MASK
+                    parts.append(np.packbits(keep))
+                else:
+                    keep = None
+            predicted = _predict(previous, keep, world.game_time - previous_tick)
+            residual = (matrix[:, :kept] ^ predicted).ravel()
+            changed = np.flatnonzero(residual)
+            residuals = len(changed)
+            parts.append(changed.astype(np.uint32))
+            parts.append(residual[changed])
+            if self._twister_words is not previous_twister:
+                flags |= TWISTER
+        parts.append(np.ascontiguousarray(matrix[:, kept:]))
+        if flags & TWISTER:
+            parts.append(self._twister_words)
+        body = b"".join(parts)
+        if len(body) <= COMPRESS_LIMIT:
+            body = zlib.compress(body, 1)
+            flags |= COMPRESSED
+
+        header = STATE.pack(
+            world.game_time, world.score, world.difficulty_level, world.speed_multiplier,
+            world.spawn_timer, world.spawn_interval, world.pending_respawns, world.game_over,
+            rocket.x, rocket.prev_x, rocket.width, rocket.num_launchers,
+            rocket.engine_flame_height, rocket.engine_flame_direction,
+            len(bullets), n, kept, residuals, flags, words[RNG_WORDS], gauss or 0.0, gauss is not None,
+        )
+        return header, body, (world.game_time, matrix, self._twister_words)
+
+    def _adapt(self):
+        if len(self._costs) < self._costs.maxlen:
+            return
+        average = self._cost_total / len(self._costs)
+        if average > self.budget_us * self.stride and self.stride < self.max_stride:
+            self.stride *= 2
+        elif average < self.budget_us * self.stride / 4 and self.stride > 1:
+            self.stride //= 2
+        else:
+            return
+        self._costs.clear()
+        self._cost_total = 0.0
+
+    def _reserve(self, size):
+        # Arena offset for a new snapshot, evicting whatever it overlaps
+        if size > self.capacity:
+            return None
+        entries = self._entries
+        head = self._head
+        if head + size > self.capacity:
+            # Wrap; everything still past the old head is the oldest data
+            while entries and entries[0][2] >= head:
+                self._drop_oldest()
+            head = 0
+        while entries and entries[0][2] < head + size and entries[0][2] + entries[0][3] > head:
+            self._drop_oldest()
+        self._head = head + size
+        return head
+
+    def _drop_oldest(self):
+        entries = self._entries
+        self.bytes_used -= entries.popleft()[3]
+        # Deltas can't be decoded without the snapshots before them
+        while entries and entries[0][0] != entries[0][4]:
+            self.bytes_used -= entries.popleft()[3]
+
+    def _decode(self, entry, previous):
+        _, _, offset, size, _ = entry
+        fields = STATE.unpack_from(self._arena, offset)
+        num_bullets, n, kept, residuals, flags = fields[14:19]
+        data = memoryview(self._arena)[offset + STATE.size:offset + size]
+        reader = _Reader(zlib.decompress(data) if flags & COMPRESSED else bytes(data))
+        bullets = reader.take(3 * num_bullets, np.float64).reshape(3, num_bullets)
+        if flags & KEYFRAME:
+            debris = reader.take(len(COLUMNS) * n, np.uint64).reshape(len(COLUMNS), n)
+        else:
+            keep = None
+            previous_rows = previous.debris.shape[1]
+            if flags & KEEP_MASK:
+                mask = reader.take((previous_rows + 7) // 8, np.uint8)
+                keep = np.unpackbits(mask, count=previous_rows).astype(bool)
+            predicted = _predict(previous.debris, keep, fields[0] - previous.game_time)
+            changed = reader.take(residuals, np.uint32)
+            predicted.ravel()[changed] ^= reader.take(residuals, np.uint64)
+            spawned = reader.take(len(COLUMNS) * (n - kept), np.uint64).reshape(len(COLUMNS), n - kept)
+            debris = np.concatenate((predicted, spawned), axis=1)
+        twister = reader.take(RNG_WORDS, np.uint32) if flags & TWISTER else previous.twister
+        return RewindState(fields, bullets, debris, twister)
+
+    def snapshot(self, index):
+        # RewindState of the index-th snapshot, oldest first. Decodes forward
+        # from its keyframe, or from the last decoded snapshot when that is
+        # on the way, so stepping forward decodes a single snapshot.
+        entries = self._entries
+        entry = entries[index]
+        serial, key_serial = entry[0], entry[4]
+        state = None
+        start = key_serial
+        if self._decoded is not None and key_serial <= self._decoded[0] <= serial:
+            start, state = self._decoded
+            if start == serial:
+                return state
+            start += 1
+        first = entries[0][0]
+        for serial_index in range(start, serial + 1):
+            state = self._decode(entries[serial_index - first], state)
+        self._decoded = (serial, state)
+        return state
+
+    def restore(self, index, world):
+        # Put the index-th snapshot's state into world (particles are cleared)
+        state = self.snapshot(index)
+        (world.game_time, world.score, world.difficulty_level, world.speed_multiplier,
+         world.spawn_timer, world.spawn_interval, world.pending_respawns, game_over,
+         x, prev_x, width, num_launchers, flame_height, flame_direction,
+         _, num_debris, _, _, _, position, gauss, has_gauss) = state.fields
+        world.game_over = bool(game_over)
+        rocket = world.rocket
+        rocket.x = x
+        rocket.prev_x = prev_x
+        if (rocket.width, rocket.num_launchers) != (width, num_launchers):
+            rocket.width = width
+            rocket.num_launchers = num_launchers
+            rocket._hull = None
+        rocket.engine_flame_height = flame_height
+        rocket.engine_flame_direction = flame_direction
+
+        world.bullet_pool.release_all(rocket.bullets)
+        bullets = []
+        for bx, by, prev_y in zip(*state.bullets.tolist()):
+            bullet = world.bullet_pool.acquire(bx, by)
+            bullet.prev_y = prev_y
+            bullets.append(bullet)
+        rocket.bullets = bullets
+
+        columns = {}
+        for name, row in zip(COLUMNS, state.debris):
+            columns[name] = row.view(np.int64 if name in INT_COLUMNS else np.float64)
+        world.debris.load(columns, num_debris)
+
+        world.rng.setstate((3, tuple(state.twister.tolist()) + (position,), gauss if has_gauss else None))
+        world.particles.clear()
+
+    def stats(self):
+        snapshots, span, used, snapshot_us = self._summary
+        return {
+            "snapshots": snapshots,
+            "seconds": span,
+            "bytes_used": used,
+            "capacity": self.capacity,
+            "bytes_per_second": used / span if span else 0.0,
+            "snapshot_us": snapshot_us,
+            "stride": self.stride,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"{stats['seconds']:.1f}s in {stats['bytes_used'] / 1024:.0f} KB "
+                f"({stats['bytes_per_second'] / 1024:.1f} KB/s), {stats['snapshot_us']:.0f} us/snapshot, "
+                f"every {stats['stride']} tick(s)")
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+
+import pygame
+
+
+# Bounded LRU of pre-rendered rotation frames, one bank per shape id.
+# Frames are rendered on first use (or all at once by warm_up) through a
+# render(angle) callback and reused for every later draw of that shape.
+class RotationCache:
+    def __init__(self, frames=64, max_shapes=512, max_bytes=64 * 1024 * 1024):
+        self.frames = frames
+        self.max_shapes = max_shapes
+        self.max_bytes = max_bytes
+        self._banks = OrderedDict()  # shape_id -> [surface or None] * frames
+        self._bank_bytes = {}
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._banks)
+
+    def frame_index(self, rotation):
+        return round(rotation * self.frames / 360) % self.frames
+
+    def _bank(self, shape_id):
+        bank = self._banks.get(shape_id)
+        if bank is None:
+            bank = self._banks[shape_id] = [None] * self.frames
+            self._bank_bytes[shape_id] = 0
+            self._evict()
+        else:
+            self._banks.move_to_end(shape_id)
+        return bank
+
+    def _render(self, shape_id, bank, index, render):
+        sprite = render(index * 360 / self.frames)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        bank[index] = sprite
+        size = sprite.get_width() * sprite.get_height() * sprite.get_bytesize()
+        self._bank_bytes[shape_id] += size
+        self.bytes_used += size
+        self.misses += 1
+        return sprite
+
+    def _evict(self):
+        # Never evict the most recently used bank
+        while len(self._banks) > 1 and (len(self._banks) > self.max_shapes or self.bytes_used > self.max_bytes):
+            shape_id, _ = self._banks.popitem(last=False)
+            self.bytes_used -= self._bank_bytes.pop(shape_id)
+            self.evictions += 1
+
+    def get(self, shape_id, rotation, render):
+        return self.get_frame(shape_id, self.frame_index(rotation), render)
+
+    def get_frame(self, shape_id, index, render):
+        bank = self._bank(shape_id)
+        sprite = bank[index]
+        if sprite is None:
+            sprite = self._render(shape_id, bank, index, render)
+            self._evict()
+        else:
+            self.hits += 1
+        return sprite
+
+    def warm_up(self, shape_id, render):
+        bank = self._bank(shape_id)
+        for index, sprite in enumerate(bank):
+            if sprite is None:
+                self._render(shape_id, bank, index, render)
+        self._evict()
+
+    def discard(self, shape_id):
+        if self._banks.pop(shape_id, None) is not None:
+            self.bytes_used -= self._bank_bytes.pop(shape_id)
+
+    def clear(self):
+        self._banks.clear()
+        self._bank_bytes.clear()
+        self.bytes_used = 0
+
+    def stats(self):
+        return {
+            "shapes": len(self._banks),
+            "frames_cached": sum(len(bank) - bank.count(None) for bank in self._banks.values()),
+            "bytes_used": self.bytes_used,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,62 @@
+import time
+
+import pygame
+
+# Events that mean the window contents were lost (or resized) and must be shown again
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.VIDEORESIZE,
+                 pygame.WINDOWSIZECHANGED)
+
+
+# CPU time spent per second of wall time while a menu is waiting
+class IdleMeter:
+    def __init__(self):
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.wakeups = 0
+
+    def record(self, wall_time, cpu_time, wakeups):
+        self.wall_time += wall_time
+        self.cpu_time += cpu_time
+        self.wakeups += wakeups
+
+    def cpu_percent(self):
+        return 100.0 * self.cpu_time / self.wall_time if self.wall_time else 0.0
+
+    def report(self):
+        return (f"idle {self.wall_time:.1f}s, CPU {self.cpu_percent():.2f}%, "
+                f"{self.wakeups / self.wall_time if self.wall_time else 0:.1f} wakeups/s")
+
+
+idle_meter = IdleMeter()
+
+
+def wait_for_keys(keys, present, timeout_ms=1000, work=None):
+    # Sleep in pygame.event.wait until one of `keys` is pressed or the window
+    # is closed (returns pygame.QUIT). present() re-shows the cached frame and
+    # is only called when the window needs repainting. The timeout just lets
+    # the process wake up now and then (signals, Ctrl-C); it never redraws.
+    # work() (e.g. startup.WarmUp.step) is called whenever no events are
+    # pending until it returns False; only then does the wait sleep.
+    present()
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    wakeups = 0
+    try:
+        while True:
+            if work is not None:
+                event = pygame.event.poll()
+                if event.type == pygame.NOEVENT:
+                    if not work():
+                        work = None
+                    continue
+            else:
+                event = pygame.event.wait(timeout_ms)
+                wakeups += 1
+            if event.type == pygame.QUIT:
+                return pygame.QUIT
+            if event.type == pygame.KEYDOWN and event.key in keys:
+                return event.key
+            if event.type in EXPOSE_EVENTS:
+                present()
+    finally:
+        idle_meter.record(time.perf_counter() - start_wall, time.process_time() - start_cpu, wakeups)
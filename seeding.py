@@ -0,0 +1,21 @@
+import random
+
+import numpy as np
+
+
+# Every subsystem draws from its own generator derived from one session
+# seed, so adding randomness to one system never shifts another's sequence.
+def new_seed():
+    return random.SystemRandom().getrandbits(63)
+
+
+def derive_seed(seed, name):
+    return random.Random(f"{seed}/{name}").getrandbits(64)
+
+
+def subsystem_random(seed, name):
+    return random.Random(derive_seed(seed, name))
+
+
+def subsystem_numpy(seed, name):
+    return np.random.default_rng(derive_seed(seed, name))
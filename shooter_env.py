@@ -0,0 +1,361 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from seeding import derive_seed
+from space_shooter import WINDOW_WIDTH, FrameInput, GameWorld
+
+# Spaces come from Gymnasium when it is installed, so its wrappers and
+# checkers accept the envs; otherwise from the small stand-ins below
+try:
+    from gymnasium import spaces
+except ImportError:
+    spaces = None
+
+# Discrete actions, as the FrameInput applied for each simulation tick
+ACTIONS = (
+    FrameInput(False, False, False),  # 0: nothing
+    FrameInput(True, False, False),  # 1: left
+    FrameInput(False, True, False),  # 2: right
+    FrameInput(False, False, True),  # 3: fire
+    FrameInput(True, False, True),  # 4: left + fire
+    FrameInput(False, True, True),  # 5: right + fire
+)
+NUM_ACTIONS = len(ACTIONS)
+
+# Observation layout (float32): the header, then max_debris rows of
+# (center x, center y, size) and max_bullets rows of (x, y), zero padded.
+# Positions are logical play-field pixels.
+OBS_HEADER = ("rocket_x", "launchers", "debris", "bullets")
+SEED_MASK = (1 << 63) - 1
+
+
+def observation_size(max_debris, max_bullets):
+    return len(OBS_HEADER) + 3 * max_debris + 2 * max_bullets
+
+
+# Minimal Box / Discrete / MultiDiscrete with the attributes and methods
+# Gym-style code relies on (shape, dtype, bounds or n, sample, contains,
+# seed), for when Gymnasium is not installed
+class Box:
+    def __init__(self, low, high, shape=None, dtype=np.float32, seed=None):
+        shape = shape or np.shape(low)
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.low = np.broadcast_to(np.asarray(low, dtype=self.dtype), self.shape).copy()
+        self.high = np.broadcast_to(np.asarray(high, dtype=self.dtype), self.shape).copy()
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        self.np_random = np.random.default_rng(seed)
+        return [seed]
+
+    def sample(self):
+        # Uniform where both bounds are finite, exponential tails past a
+        # single bound and normal where there is none, like Gymnasium's Box
+        rng = self.np_random
+        low_bounded = np.isfinite(self.low)
+        high_bounded = np.isfinite(self.high)
+        out = rng.normal(size=self.shape)
+        both = low_bounded & high_bounded
+        out[both] = rng.uniform(self.low[both], self.high[both])
+        only_low = low_bounded & ~high_bounded
+        out[only_low] = self.low[only_low] + rng.exponential(size=only_low.sum())
+        only_high = high_bounded & ~low_bounded
+        out[only_high] = self.high[only_high] - rng.exponential(size=only_high.sum())
+        return out.astype(self.dtype)
+
+    def contains(self, x):
+        x = np.asarray(x)
+        return x.shape == self.shape and bool(np.all((x >= self.low) & (x <= self.high)))
+
+
+class Discrete:
+    def __init__(self, n, seed=None):
+        self.n = n
+        self.shape = ()
+        self.dtype = np.dtype(np.int64)
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        self.np_random = np.random.default_rng(seed)
+        return [seed]
+
+    def sample(self):
+        return int(self.np_random.integers(self.n))
+
+    def contains(self, x):
+        return np.ndim(x) == 0 and int(x) == x and 0 <= x < self.n
+
+
+class MultiDiscrete:
+    def __init__(self, nvec, seed=None):
+        self.nvec = np.asarray(nvec, dtype=np.int64)
+        self.shape = self.nvec.shape
+        self.dtype = np.dtype(np.int64)
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        self.np_random = np.random.default_rng(seed)
+        return [seed]
+
+    def sample(self):
+        return self.np_random.integers(self.nvec)
+
+    def contains(self, x):
+        x = np.asarray(x)
+        return x.shape == self.shape and bool(np.all((x >= 0) & (x < self.nvec)))
+
+
+def observation_space(max_debris, max_bullets):
+    # Header bounds are exact; positions are unbounded, since debris
+    # spawns above the play field and bullets leave it before culling
+    low = np.full(observation_size(max_debris, max_bullets), -np.inf, dtype=np.float32)
+    high = np.full_like(low, np.inf)
+    low[:len(OBS_HEADER)] = 0, 1, 0, 0
+    high[:len(OBS_HEADER)] = WINDOW_WIDTH, np.inf, max_debris, max_bullets
+    sizes = slice(len(OBS_HEADER) + 2, len(OBS_HEADER) + 3 * max_debris, 3)
+    low[sizes] = 0  # Debris size; zero for unused rows
+    box = spaces.Box if spaces is not None else Box
+    return box(low, high, dtype=np.float32)
+
+
+def action_space():
+    return spaces.Discrete(NUM_ACTIONS) if spaces is not None else Discrete(NUM_ACTIONS)
+
+
+def batch_spaces(observation, num_envs):
+    # (observation space, action space) of num_envs stacked envs
+    box = spaces.Box if spaces is not None else Box
+    multi_discrete = spaces.MultiDiscrete if spaces is not None else MultiDiscrete
+    low = np.broadcast_to(observation.low, (num_envs,) + observation.shape)
+    high = np.broadcast_to(observation.high, (num_envs,) + observation.shape)
+    return box(low, high, dtype=np.float32), multi_discrete(np.full(num_envs, NUM_ACTIONS))
+
+
+def next_episode_seed(seed):
+    # Auto-reset seed chain, so a vector run is reproducible from its first seeds
+    return derive_seed(seed, "next episode") & SEED_MASK
+
+
+# Gym-style wrapper around a headless GameWorld: reset(seed) returns
+# (observation, info) and step(action) returns (observation, reward,
+# terminated, truncated, info). One step is frame_skip simulation ticks
+# with the same action; the reward is the score gained (+10 per kill) and
+# the episode terminates when debris hits the rocket.
+class ShooterEnv:
+    def __init__(self, max_debris=15, max_bullets=64, collision_mode="box", max_steps=None, frame_skip=1):
+        self.max_debris = max_debris
+        self.max_bullets = max_bullets  # Extra bullets are left out of the observation
+        self.max_steps = max_steps  # Truncate episodes after this many steps
+        self.frame_skip = frame_skip
+        self.observation_size = observation_size(max_debris, max_bullets)
+        self.num_actions = NUM_ACTIONS
+        self.observation_space = observation_space(max_debris, max_bullets)
+        self.action_space = action_space()
+        self.world = GameWorld(max_debris, seed=0, collision_mode=collision_mode)
+        self.steps = 0
+
+    def reset(self, seed=None, options=None):
+        self.world.reset(seed)
+        self.steps = 0
+        return self.observe(), {"seed": self.world.seed}
+
+    def step(self, action):
+        reward, terminated, truncated = self.advance(action)
+        return self.observe(), reward, terminated, truncated, {"score": self.world.score}
+
+    def advance(self, action):
+        # step() without building an observation: (reward, terminated, truncated)
+        world = self.world
+        inputs = ACTIONS[action]
+        score = world.score
+        for _ in range(self.frame_skip):
+            world.step(inputs)
+            if world.game_over:
+                break
+        self.steps += 1
+        terminated = world.game_over
+        truncated = not terminated and self.max_steps is not None and self.steps >= self.max_steps
+        return float(world.score - score), terminated, truncated
+
+    def observe(self, out=None):
+        # Writes into `out` when given (e.g. a shared-memory row)
+        if out is None:
+            out = np.empty(self.observation_size, dtype=np.float32)
+        world = self.world
+        rocket = world.rocket
+        debris = world.debris
+        n = len(debris)
+        bullets = rocket.bullets[:self.max_bullets]
+        out[:len(OBS_HEADER)] = rocket.x, rocket.num_launchers, n, len(bullets)
+
+        start = len(OBS_HEADER)
+        rows = out[start:start + 3 * self.max_debris].reshape(-1, 3)
+        half_size = debris.size[:n] / 2
+        rows[:n, 0] = debris.x[:n] + half_size
+        rows[:n, 1] = debris.y[:n] + half_size
+        rows[:n, 2] = debris.size[:n]
+        rows[n:] = 0
+
+        start += 3 * self.max_debris
+        rows = out[start:].reshape(-1, 2)
+        if bullets:
+            rows[:len(bullets)] = [(bullet.x, bullet.y) for bullet in bullets]
+        rows[len(bullets):] = 0
+        return out
+
+
+# Worker commands, sent as single bytes (raw bytes, nothing is pickled)
+STEP, RESET, CLOSE = b"s", b"r", b"c"
+DONE = b"d"
+
+
+def _worker(first, count, env_kwargs, names, shape, conn):
+    # Runs envs [first, first + count) of a VectorEnv until CLOSE
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    arrays = None
+    try:
+        arrays = _views(blocks, *shape)
+        obs, rewards, terminated, truncated, scores, actions, seeds = arrays
+        envs = [ShooterEnv(**env_kwargs) for _ in range(count)]
+        episode_seeds = [0] * count
+        rows = range(first, first + count)
+        while True:
+            command = conn.recv_bytes()
+            if command == CLOSE:
+                break
+            for env_index, (env, row) in enumerate(zip(envs, rows)):
+                if command == RESET:
+                    seed = int(seeds[row])
+                    episode_seeds[env_index] = seed
+                    env.reset(seed)
+                    rewards[row] = 0
+                    terminated[row] = truncated[row] = False
+                else:
+                    rewards[row], terminated[row], truncated[row] = env.advance(actions[row])
+                    if terminated[row] or truncated[row]:
+                        # Auto-reset; the finished episode's score stays readable
+                        scores[row] = env.world.score
+                        seed = episode_seeds[env_index] = next_episode_seed(episode_seeds[env_index])
+                        env.reset(seed)
+                env.observe(obs[row])
+            conn.send_bytes(DONE)
+    finally:
+        # On an error the closed pipe wakes the parent (EOFError)
+        del arrays
+        for block in blocks:
+            block.close()
+        conn.close()
+
+
+def _views(blocks, num_envs, obs_size):
+    # NumPy views of a VectorEnv's shared-memory blocks, in _layout() order
+    return [np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            for block, (shape, dtype) in zip(blocks, _layout(num_envs, obs_size))]
+
+
+def _layout(num_envs, obs_size):
+    return (
+        ((num_envs, obs_size), np.float32),  # observations
+        ((num_envs,), np.float32),  # rewards
+        ((num_envs,), np.bool_),  # terminated
+        ((num_envs,), np.bool_),  # truncated
+        ((num_envs,), np.int64),  # final score of the last finished episode
+        ((num_envs,), np.int64),  # actions
+        ((num_envs,), np.uint64),  # reset seeds
+    )
+
+
+# Runs num_envs ShooterEnvs across a pool of worker processes. Actions,
+# observations, rewards and flags live in shared memory; per step each
+# worker only gets a one-byte command and answers with one byte, so
+# nothing is pickled. Envs
+# reset automatically when an episode ends: that step reports the
+# terminal flags and reward, the first observation of the next episode,
+# and the finished episode's score in final_scores. Returned arrays are
+# the shared buffers themselves and are overwritten by the next call.
+class VectorEnv:
+    def __init__(self, num_envs, num_workers=None, context=None, **env_kwargs):
+        num_workers = min(num_envs, num_workers or os.cpu_count() or 1)
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+        probe = ShooterEnv(**env_kwargs)
+        self.observation_size = probe.observation_size
+        self.num_actions = probe.num_actions
+        # Per-env spaces plus batched ones, as Gymnasium vector envs have
+        self.single_observation_space = probe.observation_space
+        self.single_action_space = probe.action_space
+        self.observation_space, self.action_space = batch_spaces(probe.observation_space, num_envs)
+        self.closed = False
+
+        layout = _layout(num_envs, self.observation_size)
+        self._blocks = [shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) *
+                                                                        np.dtype(dtype).itemsize))
+                        for shape, dtype in layout]
+        arrays = _views(self._blocks, num_envs, self.observation_size)
+        (self.observations, self.rewards, self.terminated, self.truncated,
+         self.final_scores, self._actions, self._seeds) = arrays
+
+        ctx = context or multiprocessing.get_context()
+        names = [block.name for block in self._blocks]
+        self._workers = []
+        self._conns = []
+        for chunk in np.array_split(np.arange(num_envs), num_workers):
+            conn, worker_conn = ctx.Pipe()
+            worker = ctx.Process(
+                target=_worker,
+                args=(int(chunk[0]), len(chunk), env_kwargs, names, (num_envs, self.observation_size), worker_conn),
+                daemon=True,
+            )
+            worker.start()
+            worker_conn.close()
+            self._workers.append(worker)
+            self._conns.append(conn)
+
+    def _run(self, command):
+        for conn in self._conns:
+            conn.send_bytes(command)
+        if command != CLOSE:
+            for conn in self._conns:
+                conn.recv_bytes()  # EOFError if the worker died
+
+    def reset(self, seed=None):
+        # Env i gets seed + i; a fresh random base seed when none is given
+        base = seed if seed is not None else np.random.SeedSequence().entropy
+        self._seeds[:] = [(base + i) & SEED_MASK for i in range(self.num_envs)]
+        self._run(RESET)
+        return self.observations, {"seeds": self._seeds}
+
+    def step(self, actions):
+        self._actions[:] = actions
+        self._run(STEP)
+        return self.observations, self.rewards, self.terminated, self.truncated, {"final_scores": self.final_scores}
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._run(CLOSE)
+        except Exception:
+            pass  # A worker already failed; just clean up
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        del self.observations, self.rewards, self.terminated, self.truncated
+        del self.final_scores, self._actions, self._seeds
+        for conn in self._conns:
+            conn.close()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,17 +1,45 @@
+# First, so the startup report times every other import
+from startup import STARTUP, WarmUp  # isort: skip
+
+import bisect
+import itertools
 import math
 import random
 import sys
+import time
+from collections import namedtuple
 
+import numpy as np
 import pygame
 
-# Initialize Pygame
-pygame.init()
-
-# Set up the display
+from background import Background
+from capture import FORMATS, POLICIES, FrameCapture
+from collision import COLLISION_MODES, SpatialHash, find_hits_arrays, find_mask_hits, masks_overlap, remove_indices
+from debris_field import DebrisField, column_property
+from dirty_rects import DirtyRenderer
+from hud import FontManager, HudLabel, TextCache
+from particles import ParticleSystem
+from pipeline import GIL_ENABLED, RENDER, InputLatch, OverlapMeter, SimulationThread, SnapshotBuffers
+from pool import Pool
+from profiler import FrameProfiler, ProfilerOverlay, SlowFrameCapture, TraceWriter
+from quality import LEVELS, QualityGovernor
+from render_queue import BULLETS, DEBRIS, HUD, PARTICLES, ROCKET, RenderQueue
+from replay import InputRecorder, load_replay
+from rewind import RewindBuffer
+from rotation_cache import RotationCache
+from scenes import idle_meter, wait_for_keys
+from seeding import new_seed, subsystem_numpy, subsystem_random
+from timestep import FixedTimestep, RateCounter
+from viewport import Viewport
+
+# Display settings (the window itself is only opened by init_display()).
+# The play field is WINDOW_WIDTH x WINDOW_HEIGHT logical pixels whatever the
+# window size or render scale; the viewport maps it onto the window.
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Space Shooter")
+NUM_STARS = 200
+TICK_RATE = 60  # Simulation ticks per second; speeds are in pixels per tick
+viewport = None
 
 # Colors
 WHITE = (255, 255, 255)
@@ -25,73 +53,28 @@ SILVER = (192, 192, 192)
 BLUE = (0, 100, 255)
 
 
-# Background
-class Star:
-    def __init__(self):
-        self.x = random.randint(0, WINDOW_WIDTH)
-        self.y = random.randint(0, WINDOW_HEIGHT)
-        self.size = random.uniform(1, 3)
-        self.brightness = random.uniform(0.3, 1.0)
-        self.twinkle_speed = random.uniform(0.02, 0.05)
-        self.twinkle_direction = 1
-
-    def update(self):
-        self.brightness += self.twinkle_speed * self.twinkle_direction
-        if self.brightness >= 1.0:
-            self.brightness = 1.0
-            self.twinkle_direction = -1
-        elif self.brightness <= 0.3:
-            self.brightness = 0.3
-            self.twinkle_direction = 1
-
-    def draw(self, surface):
-        color = (
-            int(255 * self.brightness),
-            int(255 * self.brightness),
-            int(255 * self.brightness),
-        )
-        pygame.draw.circle(surface, color, (int(self.x), int(self.y)), self.size)
-
-
-class Nebula:
-    def __init__(self):
-        self.points = []
-        self.num_points = 100
-        self.generate_points()
-
-    def generate_points(self):
-        center_x = WINDOW_WIDTH // 2
-        center_y = WINDOW_HEIGHT // 2
-        for i in range(self.num_points):
-            angle = (2 * math.pi * i) / self.num_points
-            radius = random.uniform(100, 300)
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-            self.points.append((x, y))
-
-    def draw(self, surface):
-        for i in range(len(self.points)):
-            p1 = self.points[i]
-            p2 = self.points[(i + 1) % len(self.points)]
-            alpha = int(50 + 20 * math.sin(pygame.time.get_ticks() * 0.001 + i))
-            color = (*NEBULA_COLOR, alpha)
-            pygame.draw.line(surface, color, p1, p2, 2)
+# Player Rocket
+# Pre-rendered hulls keyed by launcher count, flames by width and height
+_hull_sprites = {}
+_flame_sprites = {}
 
 
-# Player Rocket
 class Rocket:
-    def __init__(self):
+    def __init__(self, bullet_pool=None):
         self.width = 40  # Made narrower for better rocket proportions
         self.height = 100  # Made taller for better rocket proportions
         self.x = WINDOW_WIDTH // 2 - self.width // 2
+        self.prev_x = self.x
         self.y = WINDOW_HEIGHT - self.height - 20
         self.speed = 5
         self.bullets = []
+        self.bullet_pool = bullet_pool
         self.num_launchers = 1
         self.launcher_width = 8
         self.launcher_height = 12
         self.engine_flame_height = 0
         self.engine_flame_direction = 1
+        self._hull = None
 
     def move(self, direction):
         if direction == "left" and self.x > 0:
@@ -104,254 +87,438 @@ class Rocket:
         launcher_spacing = self.width / (self.num_launchers + 1)
         for i in range(self.num_launchers):
             launcher_x = self.x + launcher_spacing * (i + 1)
-            bullet = Bullet(launcher_x, self.y + self.height * 0.7)  # Adjusted bullet spawn position
+            bullet_y = self.y + self.height * 0.7  # Adjusted bullet spawn position
+            if self.bullet_pool is not None:
+                bullet = self.bullet_pool.acquire(launcher_x, bullet_y)
+            else:
+                bullet = Bullet(launcher_x, bullet_y)
             self.bullets.append(bullet)
 
     def upgrade(self):
         self.num_launchers += 1
         self.width += 20  # Increase width for new launcher
+        self._hull = None  # Shape changed; pick up the matching sprite
 
-    def draw(self, screen):
-        # Draw engine flame
+    def animate_flame(self):
         self.engine_flame_height += 0.5 * self.engine_flame_direction
         if self.engine_flame_height >= 20 or self.engine_flame_height <= 10:
             self.engine_flame_direction *= -1
 
+    def render_hull(self):
+        # Hull in local coordinates: (margin, 0) is the rocket's (x, y)
+        fin_height = self.height * 0.15
+        fin_width = self.width * 0.4
+        margin = int(fin_width//2) + 1
+        hull = pygame.Surface((self.width + 2 * margin, self.height), pygame.SRCALPHA)
+        x = margin
+        y = 0
+
         # Draw main body
-        body_rect = pygame.Rect(self.x, self.y + self.height * 0.2, self.width, self.height * 0.6)
-        pygame.draw.rect(screen, SILVER, body_rect)
+        body_rect = pygame.Rect(x, y + self.height * 0.2, self.width, self.height * 0.6)
+        pygame.draw.rect(hull, SILVER, body_rect)
         
         # Draw nose cone
         nose_points = [
-            (self.x + self.width//2, self.y),  # Top point
-            (self.x, self.y + self.height * 0.2),  # Bottom left
-            (self.x + self.width, self.y + self.height * 0.2)  # Bottom right
+            (x + self.width//2, y),  # Top point
+            (x, y + self.height * 0.2),  # Bottom left
+            (x + self.width, y + self.height * 0.2)  # Bottom right
         ]
-        pygame.draw.polygon(screen, SILVER, nose_points)
+        pygame.draw.polygon(hull, SILVER, nose_points)
         
         # Draw fins
-        fin_height = self.height * 0.15
-        fin_width = self.width * 0.4
-        fin_y = self.y + self.height * 0.7
+        fin_y = y + self.height * 0.7
         
         # Left fin
         left_fin_points = [
-            (self.x - fin_width//2, fin_y),
-            (self.x, fin_y + fin_height),
-            (self.x, fin_y)
+            (x - fin_width//2, fin_y),
+            (x, fin_y + fin_height),
+            (x, fin_y)
         ]
-        pygame.draw.polygon(screen, DARK_RED, left_fin_points)
+        pygame.draw.polygon(hull, DARK_RED, left_fin_points)
         
         # Right fin
         right_fin_points = [
-            (self.x + self.width, fin_y),
-            (self.x + self.width + fin_width//2, fin_y),
-            (self.x + self.width, fin_y + fin_height)
+            (x + self.width, fin_y),
+            (x + self.width + fin_width//2, fin_y),
+            (x + self.width, fin_y + fin_height)
         ]
-        pygame.draw.polygon(screen, DARK_RED, right_fin_points)
+        pygame.draw.polygon(hull, DARK_RED, right_fin_points)
 
         # Draw cockpit
         cockpit_width = self.width * 0.4
         cockpit_height = self.height * 0.15
-        cockpit_x = self.x + (self.width - cockpit_width) / 2
-        cockpit_y = self.y + self.height * 0.3
-        pygame.draw.ellipse(screen, BLUE, (cockpit_x, cockpit_y, cockpit_width, cockpit_height))
+        cockpit_x = x + (self.width - cockpit_width) / 2
+        cockpit_y = y + self.height * 0.3
+        pygame.draw.ellipse(hull, BLUE, (cockpit_x, cockpit_y, cockpit_width, cockpit_height))
 
         # Draw launchers
         launcher_spacing = self.width / (self.num_launchers + 1)
         for i in range(self.num_launchers):
-            launcher_x = self.x + launcher_spacing * (i + 1) - self.launcher_width/2
-            pygame.draw.rect(screen, DARK_RED, 
-                           (launcher_x, self.y + self.height * 0.5,
+            launcher_x = x + launcher_spacing * (i + 1) - self.launcher_width/2
+            pygame.draw.rect(hull, DARK_RED, 
+                           (launcher_x, y + self.height * 0.5,
                             self.launcher_width, self.launcher_height))
+        return hull, pygame.mask.from_surface(hull), -margin
 
-        # Draw engine flame
+    def render_flame(self, flame_height):
+        # Flame in local coordinates: (margin, 0) is the hull's bottom-left corner
+        margin = 5
+        flame = pygame.Surface((self.width + 2 * margin, int(flame_height) + 7), pygame.SRCALPHA)
         flame_width = self.width * 0.4
-        flame_x = self.x + (self.width - flame_width) / 2
+        flame_x = margin + (self.width - flame_width) / 2
         flame_points = [
-            (flame_x, self.y + self.height),
-            (flame_x + flame_width/2, self.y + self.height + self.engine_flame_height),
-            (flame_x + flame_width, self.y + self.height)
+            (flame_x, 0),
+            (flame_x + flame_width/2, flame_height),
+            (flame_x + flame_width, 0)
         ]
         # Draw multiple flame layers for better effect
-        pygame.draw.polygon(screen, (255, 100, 0), flame_points)  # Orange inner flame
+        pygame.draw.polygon(flame, (255, 100, 0), flame_points)  # Orange inner flame
         outer_flame_points = [
-            (flame_x - 5, self.y + self.height),
-            (flame_x + flame_width/2, self.y + self.height + self.engine_flame_height + 5),
-            (flame_x + flame_width + 5, self.y + self.height)
+            (flame_x - 5, 0),
+            (flame_x + flame_width/2, flame_height + 5),
+            (flame_x + flame_width + 5, 0)
         ]
-        pygame.draw.polygon(screen, RED, outer_flame_points)  # Red outer flame
+        pygame.draw.polygon(flame, RED, outer_flame_points)  # Red outer flame
+        return flame, -margin
+
+    def hull(self):
+        # (sprite, mask, x offset) for the current launcher count
+        if self._hull is None:
+            key = (self.num_launchers, self.width, self.height)
+            if key not in _hull_sprites:
+                _hull_sprites[key] = self.render_hull()
+            self._hull = _hull_sprites[key]
+        return self._hull
+
+    def flame(self):
+        # Flame heights move in 0.5 px steps, so there are only a few frames
+        key = (self.width, round(self.engine_flame_height * 2))
+        cached = _flame_sprites.get(key)
+        if cached is None:
+            cached = _flame_sprites[key] = self.render_flame(key[1] / 2)
+        return cached
+
+    def blit_pairs(self, alpha=1.0):
+        # Interpolate between the last two simulation ticks
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        hull, _, hull_offset = self.hull()
+        flame, flame_offset = self.flame()
+        return [(hull, (x + hull_offset, self.y)), (flame, (x + flame_offset, self.y + self.height))]
+
+    def draw(self, screen, alpha=1.0):
+        screen.blits(self.blit_pairs(alpha), doreturn=False)
 
 
 # Bullet
+_bullet_sprites = {}
+_bullet_masks = {}
+
+
+def bullet_sprite(radius):
+    # The bullet circle, drawn once and blitted for every bullet
+    sprite = _bullet_sprites.get(radius)
+    if sprite is None:
+        sprite = pygame.Surface((2 * radius + 1, 2 * radius + 1), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, WHITE, (radius, radius), radius)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        _bullet_sprites[radius] = sprite
+    return sprite
+
+
+def bullet_mask(radius):
+    # Matches the circle Bullet.draw puts on screen, centered in the mask
+    mask = _bullet_masks.get(radius)
+    if mask is None:
+        stamp = pygame.Surface((2 * radius + 1, 2 * radius + 1), pygame.SRCALPHA)
+        pygame.draw.circle(stamp, WHITE, (radius, radius), radius)
+        mask = _bullet_masks[radius] = pygame.mask.from_surface(stamp)
+    return mask
+
+
 class Bullet:
+    __slots__ = ("x", "y", "prev_y", "speed", "radius")
+
     def __init__(self, x, y):
+        self.reset(x, y)
+
+    def reset(self, x, y):
         self.x = x
         self.y = y
-        self.speed = 7
+        self.prev_y = y
+        self.speed = 7  # Pixels per simulation tick
         self.radius = 3
 
     def move(self):
+        self.prev_y = self.y
         self.y -= self.speed
 
-    def draw(self, screen):
-        pygame.draw.circle(screen, WHITE, (self.x, self.y), self.radius)
+    def blit_pair(self, alpha=1.0):
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        radius = self.radius
+        return bullet_sprite(radius), (self.x - radius, y - radius)
+
+    def draw(self, screen, alpha=1.0):
+        screen.blit(*self.blit_pair(alpha))
 
 
 # Debris
-class Debris:
-    def __init__(self, speed_multiplier=1.0):
-        self.size = random.randint(25, 40)
-        self.x = random.randint(0, WINDOW_WIDTH - self.size)
-        self.y = -self.size
-        self.base_speed = random.randint(2, 5)
-        self.speed = self.base_speed * speed_multiplier
-        self.rotation = random.randint(0, 360)
-        self.rotation_speed = random.uniform(-2, 2)
-        self.points = self.generate_asteroid_shape()
-        self.holes = self.generate_holes()
-        self.width = self.size
-        self.height = self.size
-
-    def generate_asteroid_shape(self):
+NUM_DEBRIS_SHAPES = 64
+DEBRIS_SHAPE_SEED = 20240501
+_shape_ids = itertools.count()
+_shape_library = []
+# Rotation frames shared by every asteroid shape
+debris_sprites = RotationCache(frames=64)
+# Collision masks keyed by (shape id, rotation frame); at most
+# NUM_DEBRIS_SHAPES * 64 small masks, so they are never evicted
+debris_masks = {}
+
+
+# Immutable asteroid outline, shared by every Debris that uses it
+class DebrisShape:
+    __slots__ = ("shape_id", "size", "points", "holes")
+
+    def __init__(self, rng=random):
+        self.shape_id = next(_shape_ids)
+        self.size = rng.randint(25, 40)
+        self.points = self.generate_asteroid_shape(rng)
+        self.holes = self.generate_holes(rng)
+
+    def generate_asteroid_shape(self, rng):
         points = []
-        num_points = random.randint(8, 12)
+        num_points = rng.randint(8, 12)
         for i in range(num_points):
             angle = (2 * math.pi * i) / num_points
-            radius = self.size / 2 * random.uniform(0.8, 1.2)
+            radius = self.size / 2 * rng.uniform(0.8, 1.2)
             x = radius * math.cos(angle)
             y = radius * math.sin(angle)
             points.append((x, y))
         return points
 
-    def generate_holes(self):
+    def generate_holes(self, rng):
         holes = []
-        num_holes = random.randint(1, 3)
+        num_holes = rng.randint(1, 3)
         for _ in range(num_holes):
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(0, self.size / 3)
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(0, self.size / 3)
             x = distance * math.cos(angle)
             y = distance * math.sin(angle)
-            radius = random.uniform(3, 8)
+            radius = rng.uniform(3, 8)
             holes.append((x, y, radius))
         return holes
 
-    def move(self):
-        self.y += self.speed
-        self.rotation += self.rotation_speed
-
-    def draw(self, screen):
-        asteroid_surface = pygame.Surface(
-            (self.size * 2, self.size * 2), pygame.SRCALPHA
-        )
+    def render_rotation(self, rotation):
+        # Polygon radius is at most 0.6 * size, so this fits every rotation
+        half = int(self.size * 0.6) + 2
+        asteroid_surface = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
 
+        angle_rad = math.radians(rotation)
+        cos_a = math.cos(angle_rad)
+        sin_a = math.sin(angle_rad)
         rotated_points = []
         for x, y in self.points:
-            angle_rad = math.radians(self.rotation)
-            rotated_x = x * math.cos(angle_rad) - y * math.sin(angle_rad)
-            rotated_y = x * math.sin(angle_rad) + y * math.cos(angle_rad)
-            rotated_points.append((rotated_x + self.size, rotated_y + self.size))
+            rotated_x = x * cos_a - y * sin_a
+            rotated_y = x * sin_a + y * cos_a
+            rotated_points.append((rotated_x + half, rotated_y + half))
 
         pygame.draw.polygon(asteroid_surface, GRAY, rotated_points)
         pygame.draw.polygon(asteroid_surface, DARK_RED, rotated_points, 2)
 
         for hole_x, hole_y, radius in self.holes:
-            angle_rad = math.radians(self.rotation)
-            rotated_hole_x = hole_x * math.cos(angle_rad) - hole_y * math.sin(angle_rad)
-            rotated_hole_y = hole_x * math.sin(angle_rad) + hole_y * math.cos(angle_rad)
+            rotated_hole_x = hole_x * cos_a - hole_y * sin_a
+            rotated_hole_y = hole_x * sin_a + hole_y * cos_a
             pygame.draw.circle(
                 asteroid_surface,
                 BLACK,
-                (int(rotated_hole_x + self.size), int(rotated_hole_y + self.size)),
+                (int(rotated_hole_x + half), int(rotated_hole_y + half)),
                 int(radius),
             )
+        return asteroid_surface
 
-        screen.blit(
-            asteroid_surface, (self.x - self.size // 2, self.y - self.size // 2)
-        )
 
+def debris_shape_library():
+    # Generated once from a fixed seed, so every run sees the same shapes
+    if not _shape_library:
+        rng = random.Random(DEBRIS_SHAPE_SEED)
+        _shape_library.extend(DebrisShape(rng) for _ in range(NUM_DEBRIS_SHAPES))
+    return _shape_library
 
-class ScatterParticle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = random.uniform(4, 8)  # Increased size
-        self.life = 1.0  # Full life
-        angle = random.uniform(0, 2 * math.pi)  # Random angle
-        speed = random.uniform(2, 6)  # Increased speed
-        self.speed_x = math.cos(angle) * speed
-        self.speed_y = math.sin(angle) * speed
-        self.rotation = random.uniform(0, 360)
-        self.rotation_speed = random.uniform(-10, 10)  # Increased rotation speed
-        self.points = self.generate_shape()
-
-    def generate_shape(self):
-        points = []
-        num_points = 6  # More points for better shape
-        for i in range(num_points):
-            angle = (2 * math.pi * i) / num_points
-            radius = self.size
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            points.append((x, y))
-        return points
 
-    def update(self):
-        self.x += self.speed_x
-        self.y += self.speed_y
+def random_debris(speed_multiplier, rng):
+    # A new asteroid just above the screen, as a DebrisField row
+    library = debris_shape_library()
+    shape_index = rng.randrange(len(library))
+    size = library[shape_index].size
+    x = rng.randint(0, WINDOW_WIDTH - size)
+    base_speed = rng.randint(2, 5)
+    speed = base_speed * speed_multiplier
+    rotation = rng.randint(0, 360)
+    rotation_speed = rng.uniform(-2, 2)
+    return shape_index, size, x, -size, base_speed, speed, rotation, rotation_speed
+
+
+# View of one DebrisField row. Rows move when the field is compacted, so a
+# view is only valid until the next cull, hit or reset.
+class Debris:
+    __slots__ = ("field", "index")
+
+    def __init__(self, field, index):
+        self.field = field
+        self.index = index
+
+    size = width = height = column_property("size", int)
+    x = column_property("x", int)
+    base_speed = column_property("base_speed", int)
+    y = column_property("y", float)
+    prev_y = column_property("prev_y", float)
+    speed = column_property("speed", float)
+    rotation = column_property("rotation", float)
+    prev_rotation = column_property("prev_rotation", float)
+    rotation_speed = column_property("rotation_speed", float)
+
+    @property
+    def shape(self):
+        return debris_shape_library()[self.field.shape_index[self.index]]
+
+    def move(self):
+        self.prev_y = self.y
+        self.prev_rotation = self.rotation
+        self.y += self.speed
         self.rotation += self.rotation_speed
-        self.life -= 0.015  # Slower fade
-        self.size *= 0.99  # Slower shrink
-        # Add gravity effect
-        self.speed_y += 0.1
 
-    def draw(self, screen):
-        if self.life <= 0:
-            return False
+    def draw(self, screen, alpha=1.0):
+        shape = self.shape
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        rotation = self.prev_rotation + (self.rotation - self.prev_rotation) * alpha
+        sprite = debris_sprites.get(shape.shape_id, rotation, shape.render_rotation)
+        # Sprite is centered on the debris center used for collisions
+        half = sprite.get_width() // 2
+        screen.blit(sprite, (self.x + self.size // 2 - half, y + self.size // 2 - half))
+
+    def mask(self):
+        # (mask, left, top) at the current simulation position and rotation frame
+        shape = self.shape
+        frame = debris_sprites.frame_index(self.rotation)
+        key = (shape.shape_id, frame)
+        mask = debris_masks.get(key)
+        if mask is None:
+            # From a private copy of the frame: from_surface locks the surface,
+            # and the cached sprite may be mid-blit on a render thread
+            sprite = shape.render_rotation(frame * 360 / debris_sprites.frames)
+            mask = debris_masks[key] = pygame.mask.from_surface(sprite)
+        half = mask.get_size()[0] // 2
+        return mask, self.x + self.size // 2 - half, int(self.y + self.size // 2 - half)
+
+
+def debris_blits(field, alpha=1.0, frame_step=1):
+    # Debris.draw for the whole field, yielding (sprite, position) pairs:
+    # interpolation and rotation frames in one vectorized pass. frame_step
+    # > 1 only uses every n-th rotation frame (fewer sprites to render and keep).
+    n = len(field)
+    if not n:
+        return
+    y = field.prev_y[:n] + (field.y[:n] - field.prev_y[:n]) * alpha
+    rotation = field.prev_rotation[:n] + (field.rotation[:n] - field.prev_rotation[:n]) * alpha
+    frames = debris_sprites.frames // frame_step
+    frame_indices = np.round(rotation * frames / 360).astype(np.intp) % frames * frame_step
+    half_size = field.size[:n] // 2
+    centers_x = (field.x[:n] + half_size).tolist()
+    centers_y = (y + half_size).tolist()
+    library = debris_shape_library()
+    get_frame = debris_sprites.get_frame
+    for shape_index, frame_index, cx, cy in zip(field.shape_index[:n].tolist(), frame_indices.tolist(),
+                                                centers_x, centers_y):
+        shape = library[shape_index]
+        sprite = get_frame(shape.shape_id, frame_index, shape.render_rotation)
+        half = sprite.get_width() // 2
+        yield sprite, (cx - half, cy - half)
+
+
+def warm_up_debris(shapes=None):
+    # Pre-render every rotation frame of the given shape library indices
+    # (the whole library by default)
+    library = debris_shape_library()
+    for index in range(len(library)) if shapes is None else shapes:
+        shape = library[index]
+        debris_sprites.warm_up(shape.shape_id, shape.render_rotation)
+
+
+def warm_up_rocket():
+    # Hull and every flame frame a new rocket's animation goes through
+    rocket = Rocket()
+    rocket.hull()
+    seen = set()
+    while (rocket.engine_flame_height, rocket.engine_flame_direction) not in seen:
+        seen.add((rocket.engine_flame_height, rocket.engine_flame_direction))
+        rocket.flame()
+        rocket.animate_flame()
 
-        # Create surface for the particle
-        particle_surface = pygame.Surface((self.size * 4, self.size * 4), pygame.SRCALPHA)
-        
-        # Draw the particle
-        rotated_points = []
-        for x, y in self.points:
-            angle_rad = math.radians(self.rotation)
-            rotated_x = x * math.cos(angle_rad) - y * math.sin(angle_rad)
-            rotated_y = x * math.sin(angle_rad) + y * math.cos(angle_rad)
-            rotated_points.append((rotated_x + self.size * 2, rotated_y + self.size * 2))
-
-        # Calculate alpha based on life
-        alpha = int(255 * self.life)
-        color_with_alpha = (*self.color, alpha)
-        
-        # Draw multiple layers for better visibility
-        pygame.draw.polygon(particle_surface, color_with_alpha, rotated_points)
-        # Draw inner glow
-        inner_color = (min(255, self.color[0] + 50), 
-                      min(255, self.color[1] + 50), 
-                      min(255, self.color[2] + 50), 
-                      alpha)
-        pygame.draw.polygon(particle_surface, inner_color, rotated_points, 1)
-        
-        screen.blit(particle_surface, (self.x - self.size * 2, self.y - self.size * 2))
-        return True
 
+def plan_warm_up(world):
+    # What the next game needs ready, as small jobs for the start screen to
+    # run while it waits (see startup.WarmUp). Sprites already cached cost
+    # next to nothing the second time; the background is new every game.
+    warm_up = WarmUp()
+    for index in range(NUM_DEBRIS_SHAPES):
+        warm_up.add(f"debris:{index}", lambda index=index: warm_up_debris((index,)))
+    warm_up.add("rocket", warm_up_rocket)
+    warm_up.add("bullets", lambda: (bullet_sprite(3), bullet_mask(3)))
+    warm_up.add("hud", create_hud)
+    warm_up.add("background", lambda: Background(WINDOW_WIDTH, WINDOW_HEIGHT, DEEP_SPACE, NEBULA_COLOR, NUM_STARS,
+                                                 seed=world.seed, scale=viewport.render_scale))
+    return warm_up
 
-def show_pause_screen():
+
+# Fonts and rendered text are loaded once and shared by every screen
+fonts = FontManager()
+text_cache = TextCache(fonts)
+
+
+def create_hud():
+    return (
+        HudLabel(fonts, "Score: {}", (10, 10), color=WHITE),
+        HudLabel(fonts, "Level: {}", (10, 50), color=WHITE),
+        HudLabel(fonts, "Debris: {}", (10, 90), color=WHITE),
+    )
+
+
+def quit_game():
+    pygame.quit()
+    sys.exit()
+
+
+# Static screens are drawn once and then only re-shown (see scenes.wait_for_keys).
+# They are laid out at the logical size and scaled to the window when shown.
+_start_frame = None
+_dim_overlay = None
+
+
+def present_frame(frame):
+    def present():
+        viewport.show(frame)
+    return present
+
+
+def dim_screen(screen):
     # Create semi-transparent overlay
-    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-    overlay.set_alpha(128)
-    overlay.fill(BLACK)
-    screen.blit(overlay, (0, 0))
-    
+    global _dim_overlay
+    if _dim_overlay is None:
+        _dim_overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        _dim_overlay.set_alpha(128)
+        _dim_overlay.fill(BLACK)
+    screen.blit(_dim_overlay, (0, 0))
+
+
+def show_pause_screen():
+    # Returns the key that ended the pause: K_p, K_r, K_q or pygame.QUIT
+    screen = viewport.snapshot()
+    dim_screen(screen)
+
     # Draw pause text
-    font = pygame.font.Font(None, 74)
-    pause_text = font.render("PAUSED", True, WHITE)
+    pause_text = text_cache.render("PAUSED", 74, WHITE)
     screen.blit(pause_text, (WINDOW_WIDTH//2 - pause_text.get_width()//2, WINDOW_HEIGHT//2 - 50))
     
     # Draw instructions
-    instruction_font = pygame.font.Font(None, 36)
     instructions = [
         "Press P to resume",
         "Press R to restart",
@@ -359,23 +526,20 @@ def show_pause_screen():
     ]
     
     for i, instruction in enumerate(instructions):
-        text = instruction_font.render(instruction, True, WHITE)
+        text = text_cache.render(instruction, 36, WHITE)
         screen.blit(text, (WINDOW_WIDTH//2 - text.get_width()//2, 
                           WINDOW_HEIGHT//2 + 50 + i * 40))
-    
-    pygame.display.flip()
 
-def show_game_over(score, level):
-    # Create semi-transparent overlay
-    overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-    overlay.set_alpha(128)
-    overlay.fill(BLACK)
-    screen.blit(overlay, (0, 0))
+    return wait_for_keys((pygame.K_p, pygame.K_r, pygame.K_q), present_frame(screen))
+
+def show_game_over(score, level, killcam=None):
+    # killcam, when given, is called (K) to watch the end of the game again
+    screen = viewport.snapshot()
+    dim_screen(screen)
     
-    font = pygame.font.Font(None, 74)
-    game_over_text = font.render("Game Over!", True, WHITE)
-    score_text = font.render(f"Final Score: {score}", True, WHITE)
-    level_text = font.render(f"Level Reached: {level}", True, WHITE)
+    game_over_text = text_cache.render("Game Over!", 74, WHITE)
+    score_text = text_cache.render(f"Final Score: {score}", 74, WHITE)
+    level_text = text_cache.render(f"Level Reached: {level}", 74, WHITE)
     
     # Draw game over information
     screen.blit(game_over_text, 
@@ -389,44 +553,104 @@ def show_game_over(score, level):
                  WINDOW_HEIGHT//2 + 50))
     
     # Draw restart instructions
-    instruction_font = pygame.font.Font(None, 36)
     instructions = [
         "Press R to restart",
         "Press Q to quit"
     ]
+    keys = (pygame.K_r, pygame.K_q)
+    if killcam:
+        instructions.insert(0, "Press K for the killcam")
+        keys += (pygame.K_k,)
     
     for i, instruction in enumerate(instructions):
-        text = instruction_font.render(instruction, True, WHITE)
+        text = text_cache.render(instruction, 36, WHITE)
         screen.blit(text, (WINDOW_WIDTH//2 - text.get_width()//2, 
                           WINDOW_HEIGHT//2 + 150 + i * 40))
-    
-    pygame.display.flip()
-    
-    waiting = True
-    while waiting:
+
+    while True:
+        key = wait_for_keys(keys, present_frame(screen))
+        if key == pygame.K_k:
+            killcam()
+            continue
+        if key == pygame.K_r:
+            return True  # Restart game
+        quit_game()
+
+
+def play_killcam(rewind, background, hud, lead_seconds=3):
+    # Plays the rewind buffer in real time from lead_seconds before the end.
+    # LEFT / RIGHT scrub a snapshot per frame (hold SHIFT for 10x), SPACE
+    # plays or pauses, HOME / END jump to either end, ESC, K or ENTER return.
+    if not len(rewind):
+        return
+    world = GameWorld()  # Scratch world; the buffer fills in its state
+    clock = pygame.time.Clock()
+    ticks = rewind.ticks()
+    last = len(ticks) - 1
+    index = bisect.bisect_left(ticks, ticks[-1] - lead_seconds * rewind.tick_rate)
+    play_tick = ticks[index]
+    playing = True
+    while True:
+        keys = pygame.key.get_pressed()
+        step = 10 if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT] else 1
+        if keys[pygame.K_LEFT]:
+            index -= step
+            playing = False
+        elif keys[pygame.K_RIGHT]:
+            index += step
+            playing = False
+        elif playing:
+            play_tick += clock.get_time() * rewind.tick_rate / 1000
+            while index < last and ticks[index + 1] <= play_tick:
+                index += 1
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    return True  # Restart game
-                if event.key == pygame.K_q:
-                    pygame.quit()
-                    sys.exit()
-    return False
-
-
-def show_start_screen():
-    screen.fill(DEEP_SPACE)
+                quit_game()
+            elif event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_ESCAPE, pygame.K_k, pygame.K_RETURN):
+                    return
+                elif event.key == pygame.K_SPACE:
+                    playing = not playing
+                    if playing and index >= last:
+                        index = play_tick = 0  # Play again from the start
+                elif event.key == pygame.K_HOME:
+                    index = play_tick = 0
+                elif event.key == pygame.K_END:
+                    index = last
+                elif event.key == pygame.K_F11:
+                    viewport.toggle_fullscreen()
+        index = max(0, min(index, last))
+        if not playing or play_tick < ticks[index]:
+            play_tick = ticks[index]  # Carry on from wherever scrubbing left off
+        if index == last:
+            playing = False  # Hold on the final moment
+
+        rewind.restore(index, world)
+        background.tick = world.game_time
+        viewport.sync()
+        canvas = viewport.canvas
+        draw_world(canvas, world, background, hud)
+        seconds = (world.game_time - ticks[-1]) / rewind.tick_rate
+        label = text_cache.render(f"KILLCAM {seconds:+.1f}s", 36, WHITE)
+        canvas.blit(label, (canvas.get_width() - label.get_width() - 10, 10))
+        # Timeline: the kept history, with the current position
+        width = canvas.get_width() - 20
+        top = canvas.get_height() - 16
+        pygame.draw.rect(canvas, WHITE, (10, top, width, 6), 1)
+        pygame.draw.rect(canvas, WHITE, (10, top, width * (index + 1) // len(ticks), 6))
+        viewport.present()
+        clock.tick(60)
+
+
+def render_start_screen():
+    frame = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    frame.fill(DEEP_SPACE)
     
     # Draw title
-    title_font = pygame.font.Font(None, 74)
-    title_text = title_font.render("SPACE SHOOTER", True, WHITE)
-    screen.blit(title_text, (WINDOW_WIDTH//2 - title_text.get_width()//2, WINDOW_HEIGHT//4))
+    title_text = text_cache.render("SPACE SHOOTER", 74, WHITE)
+    frame.blit(title_text, (WINDOW_WIDTH//2 - title_text.get_width()//2, WINDOW_HEIGHT//4))
     
     # Draw instructions
-    instruction_font = pygame.font.Font(None, 36)
     instructions = [
         "Use LEFT and RIGHT arrows to move",
         "Press SPACEBAR to shoot",
@@ -436,207 +660,790 @@ def show_start_screen():
     ]
     
     for i, instruction in enumerate(instructions):
-        text = instruction_font.render(instruction, True, WHITE)
-        screen.blit(text, (WINDOW_WIDTH//2 - text.get_width()//2, 
+        text = text_cache.render(instruction, 36, WHITE)
+        frame.blit(text, (WINDOW_WIDTH//2 - text.get_width()//2, 
                           WINDOW_HEIGHT//2 + i * 40))
     
     # Draw a sample rocket
     sample_rocket = Rocket()
-    sample_rocket.x = WINDOW_WIDTH//2 - sample_rocket.width//2
+    sample_rocket.x = sample_rocket.prev_x = WINDOW_WIDTH//2 - sample_rocket.width//2
     sample_rocket.y = WINDOW_HEIGHT//2 - 100
-    sample_rocket.draw(screen)
-    
-    pygame.display.flip()
-    
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:
-                    waiting = False
+    sample_rocket.draw(frame)
+    return frame
+
+
+def show_start_screen(warm_up=None):
+    # Runs the warm_up jobs (a startup.WarmUp) while waiting for ENTER, and
+    # finishes any left over before returning
+    global _start_frame
+    if _start_frame is None:
+        _start_frame = render_start_screen()
+    present = present_frame(_start_frame)
+
+    def present_start():
+        present()
+        STARTUP.mark("start screen")  # The first interactive frame
+
+    work = warm_up.step if warm_up is not None else None
+    if wait_for_keys((pygame.K_RETURN,), present_start, work=work) == pygame.QUIT:
+        quit_game()
+    STARTUP.mark("ENTER")
+    if warm_up is not None:
+        warm_up.finish()
 
 
 # Game setup
-def initialize_game():
-    rocket = Rocket()
-    debris_list = []
-    # Create initial debris
-    for _ in range(15):  # Start with 15 debris
-        debris = Debris(speed_multiplier=1.0)
-        debris.y = random.randint(-WINDOW_HEIGHT, 0)  # Random starting position
-        debris_list.append(debris)
-    
-    score = 0
+def init_display(vsync=False, render_scale=1.0, fullscreen=False, smooth=True):
+    # Opens a resizable window (or fullscreen) and returns the canvas to draw
+    # frames on: WINDOW_WIDTH x WINDOW_HEIGHT times render_scale pixels
+    global viewport
+    # Only the video subsystem (events and keys come with it); fonts load
+    # on first use and there is no audio or joystick to set up
+    pygame.display.init()
+    viewport = Viewport((WINDOW_WIDTH, WINDOW_HEIGHT), render_scale, smooth)
+    canvas = viewport.open(fullscreen, vsync)
+    render_queue.set_scale(render_scale)
+    pygame.display.set_caption("Space Shooter")
+    return canvas
+
+
+# Player input for a single simulation step
+FrameInput = namedtuple("FrameInput", ["left", "right", "fire"])
+NO_INPUT = FrameInput(False, False, False)
+
+
+# Game simulation (no drawing, no display required)
+class GameWorld:
+    def __init__(self, max_debris=15, seed=None, collision_mode="box"):
+        if collision_mode not in COLLISION_MODES:
+            raise ValueError(f"unknown collision mode {collision_mode!r}")
+        self.max_debris = max_debris  # Maximum number of debris to maintain
+        self.collision_mode = collision_mode
+        self.seed = None
+        self.particles_per_kill = 40
+        self.collision_grid = SpatialHash()  # Broad phase for very large bullet/debris counts
+        self.particle_color = (200, 200, 200)
+        self.invulnerable = False  # Rocket hits are tested but ignored (soak tests and benchmarks)
+        self.profiler = None  # Optional FrameProfiler; phases are marked per tick
+        # Recycled entities, so long sessions don't churn the allocator
+        self.bullet_pool = Pool(Bullet, capacity=64)
+        # Asteroids live in NumPy columns; iterating yields Debris row views
+        self.debris = DebrisField(capacity=max_debris, view=Debris)
+        self.particles = ParticleSystem()
+        self.rocket = None
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        # A fresh seed is picked when none is given, so every run can be replayed
+        self.seed = seed if seed is not None else new_seed()
+        self.rng = subsystem_random(self.seed, "debris")
+        self.particles.rng = subsystem_numpy(self.seed, "particles")
+        if self.rocket is not None:
+            self.bullet_pool.release_all(self.rocket.bullets)
+        self.rocket = Rocket(self.bullet_pool)
+        self.debris.clear()
+        # Create initial debris
+        rows = []
+        for _ in range(self.max_debris):
+            row = random_debris(1.0, self.rng)
+            y = self.rng.randint(-WINDOW_HEIGHT, 0)  # Random starting position
+            rows.append(row[:3] + (y,) + row[4:])
+        self.debris.extend(rows)
+
+        self.particles.clear()
+        self.score = 0
+        self.spawn_timer = 0
+        self.game_time = 0
+        self.difficulty_level = 1
+        self.speed_multiplier = 1.0
+        self.spawn_interval = 60
+        self.pending_respawns = 0
+        self.game_over = False
+
+    def spawn_debris(self, count=1):
+        # Never beyond max_debris; returns how many were spawned
+        count = min(count, self.max_debris - len(self.debris))
+        if count > 0:
+            self.debris.extend([random_debris(self.speed_multiplier, self.rng) for _ in range(count)])
+        return max(count, 0)
+
+    def pool_stats(self):
+        return [self.bullet_pool.stats(), self.debris.stats()]
+
+    def step(self, inputs=NO_INPUT):
+        if self.game_over:
+            return
+        profiler = self.profiler
+        self.update_entities(inputs)
+        if profiler:
+            profiler.mark("update")
+        self.resolve_collisions()
+        if profiler:
+            profiler.mark("collision")
+        if not self.game_over:
+            self.update_effects()
+            if profiler:
+                profiler.mark("particles")
+
+    def update_entities(self, inputs=NO_INPUT):
+        self.control_rocket(self.rocket, inputs)
+        self.advance_time((self.rocket,))
+        self.move_bullets(self.rocket)
+
+        # Update debris; anything that fell off the bottom is replaced
+        self.debris.move()
+        self.pending_respawns = self.debris.cull_below(WINDOW_HEIGHT)
+
+    def control_rocket(self, rocket, inputs):
+        rocket.prev_x = rocket.x
+        if inputs.fire:
+            rocket.shoot()
+        if inputs.left:
+            rocket.move("left")
+        if inputs.right:
+            rocket.move("right")
+
+        rocket.animate_flame()
+
+    def advance_time(self, rockets):
+        # Update game time and difficulty
+        self.game_time += 1
+        if self.game_time % (20 * TICK_RATE) == 0:  # Every 20 seconds
+            self.difficulty_level += 1
+            self.speed_multiplier += 0.2  # Increase speed by 20%
+            self.spawn_interval = max(15, 60 - (self.difficulty_level * 8))  # Faster spawn rate decrease
+
+            # Add new launcher every 2 levels
+            if self.difficulty_level % 2 == 0:
+                for rocket in rockets:
+                    rocket.upgrade()
+
+        # Spawn debris
+        self.spawn_timer += 1
+        if self.spawn_timer >= self.spawn_interval:
+            # Only spawn new debris if we're below the maximum
+            self.spawn_debris()
+            self.spawn_timer = 0
+
+    def move_bullets(self, rocket):
+        live_bullets = []
+        for bullet in rocket.bullets:
+            bullet.move()
+            if bullet.y >= 0:
+                live_bullets.append(bullet)
+            else:
+                self.bullet_pool.release(bullet)
+        rocket.bullets = live_bullets
+
+    def resolve_collisions(self):
+        rocket = self.rocket
+        debris = self.debris
+        respawns = self.pending_respawns
+        self.pending_respawns = 0
+
+        # Check collision with rocket; debris after the fatal one is never resolved
+        resolved = len(debris)
+        fatal = self.find_rocket_hit()
+        if fatal is not None and not self.invulnerable:
+            self.game_over = True
+            resolved = fatal + 1
+
+        # Check collision with bullets
+        hits = self.find_bullet_hits(resolved)
+        if hits:
+            for debris_index, bullet_index in hits:
+                self.bullet_pool.release(rocket.bullets[bullet_index])
+                self.explode(debris_index)
+                self.score += 10
+            rocket.bullets = remove_indices(rocket.bullets, {bullet_index for _, bullet_index in hits})
+            debris.remove([debris_index for debris_index, _ in hits])
+            respawns += len(hits)
+
+        if self.game_over:
+            return
+
+        # Spawn new debris to maintain count
+        self.spawn_debris(respawns)
+
+    def explode(self, debris_index):
+        # Create scatter particles
+        debris = self.debris
+        half_size = int(debris.size[debris_index]) // 2
+        self.particles.emit(self.particles_per_kill,
+                            int(debris.x[debris_index]) + half_size,
+                            float(debris.y[debris_index]) + half_size,
+                            self.particle_color)
+
+    def find_rocket_hit(self, rocket=None):
+        # Index of the first debris touching the rocket (self.rocket by default), or None
+        rocket = rocket or self.rocket
+        debris = self.debris
+        if self.collision_mode == "mask":
+            _, hull_mask, hull_offset = rocket.hull()
+            hull_left = rocket.x + hull_offset
+            hull_right = hull_left + hull_mask.get_size()[0]
+            # Debris masks reach at most 0.6 * size + 2 px from the center
+            n = len(debris)
+            size = debris.size[:n]
+            reach = size * 0.6 + 2
+            center_x = debris.x[:n] + size / 2
+            candidates = np.flatnonzero((debris.y[:n] + size / 2 + reach >= rocket.y) &
+                                        (center_x + reach >= hull_left) & (center_x - reach <= hull_right))
+            for index in candidates.tolist():
+                if masks_overlap(hull_mask, hull_left, rocket.y, *debris[index].mask()):
+                    return index
+            return None
+        overlaps = debris.box_overlaps(rocket.x, rocket.y, rocket.x + rocket.width, rocket.y + rocket.height)
+        return int(overlaps[0]) if len(overlaps) else None
+
+    def find_bullet_hits(self, limit, bullets=None):
+        # (debris_index, bullet_index) pairs against the first `limit` debris;
+        # bullets defaults to the rocket's
+        bullets = self.rocket.bullets if bullets is None else bullets
+        if not bullets or not limit:
+            return []
+        points_x = np.array([bullet.x for bullet in bullets])
+        points_y = np.array([bullet.y for bullet in bullets])
+        debris = self.debris
+        x = debris.x[:limit]
+        y = debris.y[:limit]
+        size = debris.size[:limit]
+        if self.collision_mode == "mask":
+            # Broad phase circles cover the whole sprite (0.6 * size + 2 px)
+            return find_mask_hits(
+                points_x, points_y, bullet_mask(bullets[0].radius),
+                x + size / 2, y + size / 2, size * 0.6 + 2,
+                lambda index: debris[index].mask(),
+            )
+        half_size = size // 2
+        return find_hits_arrays(points_x, points_y, x + half_size, y + half_size, half_size, self.collision_grid)
+
+    def update_effects(self):
+        # Update scatter particles (expired ones are culled in the same pass)
+        self.particles.update()
+
+    def run(self, num_frames, policy=None):
+        # Step the simulation as fast as possible; policy(world) -> FrameInput
+        for _ in range(num_frames):
+            if self.game_over:
+                break
+            self.step(policy(self) if policy else NO_INPUT)
+        return self.game_time
+
+
+# Render-side copy of everything draw_world reads from a GameWorld, for
+# the threaded pipeline (see pipeline.SnapshotBuffers). Entities and arrays
+# are reused between captures, so a capture only copies.
+class WorldSnapshot:
+    def __init__(self):
+        self.rocket = Rocket()
+        self.debris = DebrisField(view=Debris)
+        self.particles = ParticleSystem()
+        self.bullet_pool = Pool(Bullet)
+        self.score = 0
+        self.difficulty_level = 1
+        self.game_time = 0
+        self.game_over = False
+        self.tick_time = None  # Set by pipeline.SimulationThread
+        self.dt = 1.0 / TICK_RATE
+
+    def capture(self, world):
+        rocket = self.rocket
+        source = world.rocket
+        if (rocket.num_launchers, rocket.width) != (source.num_launchers, source.width):
+            rocket.num_launchers = source.num_launchers
+            rocket.width = source.width
+            rocket._hull = None
+        rocket.x = source.x
+        rocket.prev_x = source.prev_x
+        rocket.y = source.y
+        rocket.engine_flame_height = source.engine_flame_height
+
+        pool = self.bullet_pool
+        pool.release_all(rocket.bullets)
+        bullets = []
+        for bullet in source.bullets:
+            copy = pool.acquire(bullet.x, bullet.y)
+            copy.prev_y = bullet.prev_y
+            bullets.append(copy)
+        rocket.bullets = bullets
+
+        self.debris.copy_from(world.debris)
+        self.particles.copy_from(world.particles)
+        self.score = world.score
+        self.difficulty_level = world.difficulty_level
+        self.game_time = world.game_time
+        self.game_over = world.game_over
+
+
+# Shared by every draw_world call; emptied again by each flush
+render_queue = RenderQueue()
+
+
+def draw_world(surface, world, background, hud, alpha=1.0, profiler=None, frame_step=1, queue=None, dirty=None):
+    # Entities are queued per layer and submitted with one batched call per
+    # layer at the end; see render_queue.LAYERS for the order. With a
+    # DirtyRenderer only the changed areas are redrawn (then present with
+    # dirty.present() instead of pygame.display.flip()).
+    queue = queue or render_queue
+    if dirty is not None:
+        dirty.restore(surface, background)
+    else:
+        background.draw(surface)
+    if profiler:
+        profiler.mark("background")
+
+    # The big layers are queued as lazy iterables, so their sprite lookups
+    # and blits are timed per layer by the flush ("draw_<layer>"); "queue"
+    # is only the up-front work, e.g. binning the particles
+    rocket = world.rocket
+    queue.extend(ROCKET, rocket.blit_pairs(alpha))
+    queue.extend(BULLETS, (bullet.blit_pair(alpha) for bullet in rocket.bullets), len(rocket.bullets))
+    queue.extend(DEBRIS, debris_blits(world.debris, alpha, frame_step), len(world.debris))
+    queue.extend(PARTICLES, world.particles.blit_pairs(alpha), len(world.particles))
+    if profiler:
+        profiler.mark("queue")
+
+    # Draw score and difficulty (re-rendered only when the values change)
+    score_label, level_label, debris_label = hud
+    queue.add(HUD, *score_label.blit_pair(world.score))
+    queue.add(HUD, *level_label.blit_pair(world.difficulty_level))
+    queue.add(HUD, *debris_label.blit_pair(len(world.debris)))
+    if profiler:
+        profiler.mark("hud_text")
+
+    if dirty is not None:
+        dirty.flush(surface, queue, hud, profiler)
+    else:
+        queue.flush(surface, profiler=profiler)
+    if profiler:
+        profiler.count("stars", background.num_stars)
+        profiler.count("bullets", len(rocket.bullets))
+        profiler.count("debris", len(world.debris))
+        profiler.count("particles", len(world.particles))
+        profiler.count("blit_calls", queue.submits)
+
+
+def render_run(world, inputs, background, hud, capture=None):
+    # Steps world through inputs (FrameInputs, e.g. from a bot policy) as fast
+    # as possible, drawing and presenting every tick and passing the frames to
+    # capture (a capture.FrameCapture). Stops at game over.
+    for frame_inputs in inputs:
+        world.step(frame_inputs)
+        background.update()
+        viewport.sync()
+        draw_world(viewport.canvas, world, background, hud)
+        viewport.present()
+        if capture is not None:
+            capture.grab(viewport.canvas)
+        if world.game_over:
+            break
+
+
+def play_replay(path, realtime=False, capture=None):
+    # Re-run a recorded session; returns (world, verified). Headless
+    # fast-forward by default, or rendered at the recorded tick rate. With
+    # capture every tick is rendered and captured, faster than real time
+    # unless realtime is set.
+    replay = load_replay(path)
+    world = GameWorld(replay.max_debris, seed=replay.seed, collision_mode=replay.collision_mode)
+    if not realtime and capture is None:
+        for inputs in replay.inputs():
+            world.step(FrameInput._make(inputs))
+        return world, replay.verify(world)
+
+    init_display()
+    background = Background(WINDOW_WIDTH, WINDOW_HEIGHT, DEEP_SPACE, NEBULA_COLOR, NUM_STARS, seed=replay.seed)
+    hud = create_hud()
+    if capture is not None:
+        capture.fps = replay.tick_rate  # One frame per tick
+        if not realtime:
+            render_run(world, (FrameInput._make(inputs) for inputs in replay.inputs()), background, hud, capture)
+            return world, replay.verify(world)
+    timestep = FixedTimestep(replay.tick_rate)
     clock = pygame.time.Clock()
-    spawn_timer = 0
-    game_time = 0
-    difficulty_level = 1
-    speed_multiplier = 1.0
-    spawn_interval = 60
-    max_debris = 15  # Maximum number of debris to maintain
-    
-    return rocket, debris_list, score, clock, spawn_timer, game_time, difficulty_level, speed_multiplier, spawn_interval, max_debris
+    inputs = replay.inputs()
+    remaining = len(replay)
+    while remaining:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit_game()
+        for _ in range(min(timestep.advance(), remaining)):
+            world.step(FrameInput._make(next(inputs)))
+            background.update()
+            remaining -= 1
+        viewport.sync()
+        draw_world(viewport.canvas, world, background, hud, timestep.alpha)
+        viewport.present()
+        if capture is not None:
+            capture.grab(viewport.canvas)
+        clock.tick(60)
+    return world, replay.verify(world)
 
 
 # Main game function
-def main():
+def main(frame_mode="capped", fps=60, seed=None, max_debris=15, record_path=None, profiler=None,
+         collision_mode="box", governor=None, render_mode="full", render_scale=1.0, fullscreen=False,
+         smooth=True, threaded=False, rewind_seconds=10, rewind_bytes=16 * 1024 * 1024, capture=None,
+         startup_report=False):
+    # frame_mode: "capped" limits rendering to fps, "uncapped" renders as
+    # fast as possible and "vsync" waits for the display refresh. The
+    # simulation always runs at TICK_RATE either way; speeds and timers
+    # are counted per tick, so it is a constant rather than an option.
+    # seed fixes the first game's randomness; max_debris caps how much
+    # debris is on screen at once (thousands work, see debris_field.py).
+    # record_path saves each game's inputs as a replay (the last game
+    # played wins).
+    # collision_mode is "box" (bounding shapes) or "mask" (pixel-exact).
+    # governor (a QualityGovernor) trades visual detail for frame time; by
+    # default it targets the frame cap, or 60 FPS when uncapped.
+    # render_mode "dirty" redraws and pushes only the changed parts of the
+    # window (see dirty_rects.DirtyRenderer); "full" flips every frame.
+    # render_scale sets the canvas resolution relative to the 800x600
+    # play field (0.5 for slow machines); the window can be resized freely
+    # and the canvas is scaled to fit it, smoothly unless smooth is False.
+    # threaded runs the simulation on its own thread, which publishes
+    # snapshots for this thread to draw (see pipeline.py); otherwise the
+    # ticks and the drawing take turns on this thread.
+    # rewind_seconds of game state (0 for none) are kept in a rewind_bytes
+    # ring buffer for the killcam on the game over screen (see rewind.py).
+    # capture (a capture.FrameCapture) gets every frame drawn during play.
+    # startup_report prints how long the cold start took (see startup.py)
+    # once the first game frame is on screen.
+    # F3 toggles the profiler overlay, F11 fullscreen.
+    STARTUP.mark("import")
+    init_display(frame_mode == "vsync", render_scale, fullscreen, smooth)
+    STARTUP.mark("display init")
+    frame_limit = fps if frame_mode == "capped" else 0
+    if profiler is None:
+        profiler = FrameProfiler()
+    if governor is None:
+        governor = QualityGovernor(budget_ms=1000 / (frame_limit or 60))
+    overlay = ProfilerOverlay(profiler, fonts)
+    overlay.visible = profiler.enabled
+    rewind = RewindBuffer(rewind_seconds, TICK_RATE, rewind_bytes) if rewind_seconds else None
     while True:  # Main game loop for restart functionality
-        # Show start screen
-        show_start_screen()
-        
-        # Initialize game
-        rocket, debris_list, score, clock, spawn_timer, game_time, difficulty_level, speed_multiplier, spawn_interval, max_debris = initialize_game()
-        
-        # Create background elements
-        stars = [Star() for _ in range(200)]
-        nebula = Nebula()
-        
-        # Initialize scatter particles list
-        scatter_particles = []
-        
+        # Initialize game; sprites and the background are prepared while
+        # the start screen waits
+        world = GameWorld(max_debris, seed=seed, collision_mode=collision_mode)
+        world.profiler = None if threaded else profiler  # The profiler only times this thread
+        seed = None  # Restarts get a fresh seed
+        warm_up = plan_warm_up(world)
+        show_start_screen(warm_up)
+
+        recorder = InputRecorder(world.seed, world.max_debris, TICK_RATE, collision_mode) if record_path else None
+        simulation = None
+        finished = False
+        if rewind is not None:
+            rewind.clear()
+
+        def finish_game():
+            # Stop the simulation thread before the world is read for the
+            # recording; only the first call per game does anything
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            if simulation:
+                simulation.stop()
+            if recorder is not None:
+                recorder.save(record_path, world)
+
+        clock = pygame.time.Clock()
+        timestep = FixedTimestep(TICK_RATE)
+        sim_rate = RateCounter()
+        render_rate = RateCounter()
+        next_report = 0
+
+        # Background elements, made during the warm-up
+        background = warm_up.results["background"]
+        hud = warm_up.results["hud"]
+        governor.apply(world, background, NUM_STARS)  # Quality carries over between games
+        dirty = DirtyRenderer() if render_mode == "dirty" else None
+
+        if threaded:
+            latch = InputLatch()
+            meter = OverlapMeter()
+            buffers = SnapshotBuffers(WorldSnapshot)
+
+            def tick():
+                inputs = FrameInput(*latch.take())
+                world.step(inputs)
+                if recorder is not None:
+                    recorder.record(inputs)
+                if rewind is not None:
+                    rewind.record(world)
+                return not world.game_over
+
+            buffers.back.capture(world)
+            buffers.publish()
+            simulation = SimulationThread(tick, lambda snapshot: snapshot.capture(world), buffers, TICK_RATE, meter)
+            simulation.start()
+        STARTUP.mark("game setup")
+
         # Game loop
         running = True
         paused = False
+        fire = False  # Held until the next simulation tick consumes it
         while running:
+            frame_start = time.perf_counter()
+            profiler.begin_frame()
             # Event handling
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    finish_game()
+                    quit_game()
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
-                        rocket.shoot()
+                        fire = True
                     elif event.key == pygame.K_p:
                         paused = not paused
+                    elif event.key == pygame.K_F3:
+                        overlay.toggle()
+                    elif event.key == pygame.K_F11:
+                        viewport.toggle_fullscreen()
                     elif event.key == pygame.K_r:
                         running = False  # Restart game
                     elif event.key == pygame.K_q:
-                        pygame.quit()
-                        sys.exit()
+                        finish_game()
+                        quit_game()
+
+            profiler.mark("events")
 
             if paused:
-                show_pause_screen()
+                # Blocks (near-zero CPU) until the player picks an option
+                if simulation:
+                    simulation.pause()
+                action = show_pause_screen()
+                paused = False
+                timestep.reset()
+                if simulation:
+                    simulation.resume()
+                if dirty:
+                    dirty.invalidate()  # The pause screen drew over everything
+                if action in (pygame.QUIT, pygame.K_q):
+                    finish_game()
+                    quit_game()
+                if action == pygame.K_r:
+                    running = False  # Restart game
                 continue
 
-            # Get keyboard state
             keys = pygame.key.get_pressed()
-            if keys[pygame.K_LEFT]:
-                rocket.move("left")
-            if keys[pygame.K_RIGHT]:
-                rocket.move("right")
-
-            # Update game time and difficulty
-            game_time += 1
-            if game_time % (20 * 60) == 0:  # Every 20 seconds
-                difficulty_level += 1
-                speed_multiplier += 0.2  # Increase speed by 20%
-                spawn_interval = max(15, 60 - (difficulty_level * 8))  # Faster spawn rate decrease
-                
-                # Add new launcher every 2 levels
-                if difficulty_level % 2 == 0:
-                    rocket.upgrade()
-
-            # Spawn debris
-            spawn_timer += 1
-            if spawn_timer >= spawn_interval:
-                # Only spawn new debris if we're below the maximum
-                if len(debris_list) < max_debris:
-                    debris_list.append(Debris(speed_multiplier))
-                spawn_timer = 0
-
-            # Update bullets
-            for bullet in rocket.bullets[:]:
-                bullet.move()
-                if bullet.y < 0:
-                    rocket.bullets.remove(bullet)
-
-            # Update debris
-            for debris in debris_list[:]:
-                debris.move()
-                if debris.y > WINDOW_HEIGHT:
-                    debris_list.remove(debris)
-                    # Immediately spawn a new debris to maintain count
-                    if len(debris_list) < max_debris:
-                        new_debris = Debris(speed_multiplier)
-                        new_debris.y = -new_debris.size
-                        debris_list.append(new_debris)
-                    continue
-
-                # Check collision with bullets
-                for bullet in rocket.bullets[:]:
-                    debris_center_x = debris.x + debris.size//2
-                    debris_center_y = debris.y + debris.size//2
-                    distance = math.sqrt((bullet.x - debris_center_x)**2 + 
-                                       (bullet.y - debris_center_y)**2)
-                    
-                    if distance < debris.size//2:
-                        if debris in debris_list:
-                            # Create scatter particles
-                            for _ in range(40):  # Increased number of particles
-                                particle = ScatterParticle(
-                                    debris_center_x,
-                                    debris_center_y,
-                                    (200, 200, 200)  # Brighter color
-                                )
-                                scatter_particles.append(particle)
-                            
-                            debris_list.remove(debris)
-                            # Spawn new debris to maintain count
-                            if len(debris_list) < max_debris:
-                                new_debris = Debris(speed_multiplier)
-                                new_debris.y = -new_debris.size
-                                debris_list.append(new_debris)
-                        if bullet in rocket.bullets:
-                            rocket.bullets.remove(bullet)
-                        score += 10
+            if simulation:
+                # Hand the input over and pick up the newest snapshot
+                latch.hold(keys[pygame.K_LEFT], keys[pygame.K_RIGHT])
+                if fire:
+                    latch.fire()
+                    fire = False
+                view = buffers.latest()
+                background.tick = view.game_time  # Stars twinkle at the simulation's pace
+                sim_rate.tick(simulation.take_ticks())
+                alpha = simulation.alpha(view)
+            else:
+                # Run as many fixed simulation ticks as the elapsed time calls for
+                ticks = timestep.advance()
+                for _ in range(ticks):
+                    inputs = FrameInput(keys[pygame.K_LEFT], keys[pygame.K_RIGHT], fire)
+                    world.step(inputs)
+                    if recorder is not None:
+                        recorder.record(inputs)
+                    if rewind is not None:
+                        rewind.record(world)
+                    fire = False
+                    # Update stars
+                    background.update()
+                    if world.game_over:
                         break
-
-                # Check collision with rocket
-                if (rocket.x < debris.x + debris.size and
-                    rocket.x + rocket.width > debris.x and
-                    rocket.y < debris.y + debris.size and
-                    rocket.y + rocket.height > debris.y):
-                    if not show_game_over(score, difficulty_level):
-                        return  # Exit game if not restarting
-                    running = False
-                    break
-
-            # Update scatter particles
-            scatter_particles = [particle for particle in scatter_particles if particle.update()]
-
-            # Update stars
-            for star in stars:
-                star.update()
-
-            # Draw everything
-            screen.fill(DEEP_SPACE)
-            nebula.draw(screen)
-            for star in stars:
-                star.draw(screen)
-
-            rocket.draw(screen)
-            for bullet in rocket.bullets:
-                bullet.draw(screen)
-            for debris in debris_list:
-                debris.draw(screen)
-            for particle in scatter_particles:
-                particle.draw(screen)
-
-            # Draw score and difficulty
-            font = pygame.font.Font(None, 36)
-            score_text = font.render(f"Score: {score}", True, WHITE)
-            difficulty_text = font.render(f"Level: {difficulty_level}", True, WHITE)
-            debris_count_text = font.render(f"Debris: {len(debris_list)}", True, WHITE)
-            screen.blit(score_text, (10, 10))
-            screen.blit(difficulty_text, (10, 50))
-            screen.blit(debris_count_text, (10, 90))
-
-            pygame.display.flip()
-            clock.tick(60)
+                sim_rate.tick(ticks)
+                view = world
+                alpha = timestep.alpha
+            profiler.mark("simulation")
+
+            if view.game_over:
+                finish_game()
+                killcam = (lambda: play_killcam(rewind, background, hud)) if rewind is not None else None
+                if not show_game_over(view.score, view.difficulty_level, killcam):
+                    return  # Exit game if not restarting
+                break
+
+            # Draw everything, interpolated between the last two ticks
+            if viewport.sync() and dirty:
+                dirty.invalidate()  # Resized or toggled fullscreen
+            if dirty and overlay.visible:
+                dirty.invalidate()  # The overlay panel isn't tracked; redraw in full
+            canvas = viewport.canvas
+            render_start = time.perf_counter()
+            render_cpu = time.thread_time()
+            draw_world(canvas, view, background, hud, alpha, profiler, governor.level.rotation_step, dirty=dirty)
+            overlay.draw(canvas)
+
+            present_start = time.perf_counter()
+            if dirty:
+                dirty.present(viewport)
+            else:
+                viewport.present()
+            present_ms = (time.perf_counter() - present_start) * 1000
+            if capture is not None:
+                capture.grab(canvas)
+            if "first game frame" not in STARTUP.marks:
+                STARTUP.mark("first game frame")
+                if startup_report:
+                    print(STARTUP.report())
+            if simulation:
+                meter.record(RENDER, render_start, time.perf_counter(), time.thread_time() - render_cpu)
+            profiler.mark("flip")
+            # Budget is judged on work time; the frame-cap wait below doesn't
+            # count, and neither does the flip under vsync, which blocks until
+            # the display refresh
+            work_ms = (time.perf_counter() - frame_start) * 1000
+            if frame_mode == "vsync":
+                work_ms -= present_ms
+            if governor.record(work_ms):
+                governor.apply(world, background, NUM_STARS)
+                if dirty:
+                    dirty.invalidate()
+            render_rate.tick()
+            clock.tick(frame_limit)
+            profiler.mark("wait")
+            profiler.end_frame()
+
+            # Report simulation and render rates separately
+            now = pygame.time.get_ticks()
+            if now >= next_report:
+                pygame.display.set_caption(
+                    f"Space Shooter - {render_rate.rate:.0f} FPS / {sim_rate.rate:.0f} ticks/s"
+                )
+                next_report = now + 1000
+                if profiler.enabled:
+                    profiler.gauge("menus", idle_meter.report())
+                    profiler.gauge("quality", governor.summary())
+                    if rewind is not None:
+                        profiler.gauge("rewind", rewind.report())
+                    if capture is not None:
+                        profiler.gauge("capture", capture.report())
+                    if simulation:
+                        profiler.gauge("pipeline", f"{meter.report()}, {buffers.skipped} snapshots skipped"
+                                                   f"{'' if GIL_ENABLED else ', free-threaded'}")
+                    if dirty:
+                        profiler.gauge("dirty rects", f"{dirty.partial_updates} partial / {dirty.full_flips} full, "
+                                                      f"last {dirty.dirty_fraction:.0%} of the screen")
+                    for stats in world.pool_stats():
+                        profiler.gauge(f"{stats['type']} pool",
+                                       f"{stats['active']} active / {stats['capacity']} created, "
+                                       f"high water {stats['high_water']}, "
+                                       f"{stats['allocations_avoided']} allocations avoided")
+                    stats = text_cache.stats()
+                    profiler.gauge("text cache", f"{stats['hits']} hits / {stats['misses']} misses, "
+                                                 f"{stats['entries']} entries, {stats['evictions']} evicted, "
+                                                 f"{stats['fonts_loaded']} fonts")
+                    profiler.gauge("hud labels", f"{sum(label.hits for label in hud)} reused / "
+                                                 f"{sum(label.renders for label in hud)} rendered")
+                    stats = debris_sprites.stats()
+                    profiler.gauge("debris sprites", f"{stats['hits']} hits / {stats['misses']} renders, "
+                                                     f"{stats['frames_cached']} frames of {stats['shapes']} shapes "
+                                                     f"({stats['bytes_used'] / 2**20:.1f} MB), "
+                                                     f"{stats['evictions']} evicted")
+
+        finish_game()  # Restarted mid-game, or already done at game over
 
 
 if __name__ == "__main__":
-    main()
+    import argparse  # Only the command line needs it; importing the module stays light
+
+    parser = argparse.ArgumentParser(description="Space Shooter")
+    parser.add_argument("--frame-mode", choices=("capped", "uncapped", "vsync"), default="capped")
+    parser.add_argument("--fps", type=int, default=60, help="render frame cap in capped mode")
+    parser.add_argument("--seed", type=int, help="seed for the first game")
+    parser.add_argument("--max-debris", type=int, default=15, help="most debris on screen at once (up to 65535)")
+    parser.add_argument("--collision", choices=COLLISION_MODES, default="box",
+                        help="box: bounding shapes, mask: pixel-exact sprite masks")
+    parser.add_argument("--render-mode", choices=("full", "dirty"), default="full",
+                        help="dirty: only redraw and push the changed parts of the window")
+    parser.add_argument("--render-scale", type=float, default=1.0,
+                        help="canvas resolution relative to the 800x600 play field, e.g. 0.5 on slow machines")
+    parser.add_argument("--scale-filter", choices=("smooth", "nearest"), default="smooth",
+                        help="filter for scaling the canvas to the window")
+    parser.add_argument("--fullscreen", action="store_true", help="start fullscreen (F11 toggles)")
+    parser.add_argument("--pipeline", choices=("serial", "threaded"), default="serial",
+                        help="threaded: simulate on a separate thread and draw its latest snapshot")
+    parser.add_argument("--rewind", type=float, default=10, metavar="SECONDS",
+                        help="game history kept for the killcam (0 turns it off)")
+    parser.add_argument("--rewind-mb", type=float, default=16, help="memory for the rewind history")
+    parser.add_argument("--capture", metavar="TARGET",
+                        help="save every frame: a raw RGB file, a PNG pattern like shots/{frame:06d}.png, "
+                             "or an encoder command reading raw frames on stdin (with --capture-format pipe)")
+    parser.add_argument("--capture-format", choices=FORMATS, help="default: png for .png targets, else raw")
+    parser.add_argument("--capture-policy", choices=POLICIES,
+                        help="when the writer falls behind: drop frames or block the game "
+                             "(default: block for replays, drop when playing)")
+    parser.add_argument("--capture-slots", type=int, default=8, help="frames the capture can hold in flight")
+    parser.add_argument("--quality", choices=("auto",) + tuple(level.name for level in LEVELS), default="auto",
+                        help="visual detail; auto adapts it to hold the frame budget")
+    parser.add_argument("--budget-ms", type=float, help="frame work-time budget for --quality auto")
+    parser.add_argument("--quality-log", action="store_true", help="print every quality change")
+    parser.add_argument("--record", metavar="PATH", help="save each game's inputs as a replay")
+    parser.add_argument("--replay", metavar="PATH", help="play back a recorded game and verify it")
+    parser.add_argument("--realtime", action="store_true", help="render the replay instead of fast-forwarding")
+    parser.add_argument("--profile", action="store_true", help="start with the profiler overlay shown (F3 toggles)")
+    parser.add_argument("--trace", metavar="PATH", help="stream per-frame timings to PATH (.json Chrome trace or .csv)")
+    parser.add_argument("--capture-slow", type=int, default=0, metavar="N", help="keep profiles of the N slowest frames")
+    parser.add_argument("--capture-mode", choices=("cprofile", "tracemalloc"), default="cprofile")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long startup took once the first game frame is shown")
+    args = parser.parse_args()
+    if not 0 <= args.max_debris <= 65535:
+        parser.error("--max-debris must be between 0 and 65535")  # Replay headers store it in 16 bits
+    capture = None
+    if args.capture:
+        capture = FrameCapture(args.capture, args.capture_format, args.fps, args.capture_slots,
+                               args.capture_policy or ("block" if args.replay else "drop"))
+    if args.replay:
+        start = time.perf_counter()
+        try:
+            world, verified = play_replay(args.replay, args.realtime, capture)
+        finally:
+            if capture is not None:
+                capture.close()
+        elapsed = time.perf_counter() - start
+        print(f"{world.game_time} ticks in {elapsed:.2f}s ({world.game_time / max(elapsed, 1e-9):.0f} ticks/s), "
+              f"score {world.score}, {'verified' if verified else 'MISMATCH'}")
+        if capture is not None:
+            print(f"capture: {capture.report()}")
+        sys.exit(0 if verified else 1)
+    profiler = FrameProfiler(
+        enabled=bool(args.profile or args.trace or args.capture_slow),
+        writer=TraceWriter(args.trace) if args.trace else None,
+        capture=SlowFrameCapture(args.capture_slow, args.capture_mode) if args.capture_slow else None,
+    )
+    governor = QualityGovernor(
+        budget_ms=args.budget_ms or 1000 / (args.fps if args.frame_mode == "capped" else 60),
+        adaptive=args.quality == "auto",
+        log=print if args.quality_log else None,
+    )
+    if args.quality != "auto":
+        governor.set_level(governor.level_named(args.quality))
+    try:
+        main(
+            frame_mode=args.frame_mode,
+            fps=args.fps,
+            seed=args.seed,
+            max_debris=args.max_debris,
+            record_path=args.record,
+            profiler=profiler,
+            collision_mode=args.collision,
+            governor=governor,
+            render_mode=args.render_mode,
+            render_scale=args.render_scale,
+            fullscreen=args.fullscreen,
+            smooth=args.scale_filter == "smooth",
+            threaded=args.pipeline == "threaded",
+            rewind_seconds=args.rewind,
+            rewind_bytes=int(args.rewind_mb * 1024 * 1024),
+            capture=capture,
+            startup_report=args.startup_report,
+        )
+    finally:
+        profiler.close()
+        if capture is not None:
+            capture.close()
+            print(f"capture: {capture.report()}")
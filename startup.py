@@ -0,0 +1,70 @@
+import time
+from collections import deque
+
+
+# Wall-clock phases of a cold start, measured from when this module is first
+# imported (space_shooter imports it before anything else). mark(name)
+# closes the phase called name; the first mark of each name counts.
+# Warm-up jobs (see WarmUp) are timed separately, since they overlap the
+# start screen rather than delay it.
+class StartupTimer:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = clock()
+        self.marks = {}  # name -> seconds since started, in marking order
+        self.jobs = {}  # warm-up job kind -> (count, seconds)
+        self.warm_up_done = None
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = self.clock() - self.started
+
+    def record_job(self, name, seconds):
+        kind = name.split(":")[0]
+        count, total = self.jobs.get(kind, (0, 0.0))
+        self.jobs[kind] = (count + 1, total + seconds)
+
+    def report(self):
+        lines = []
+        previous = 0.0
+        for name, at in self.marks.items():
+            lines.append(f"{name:<20} {(at - previous) * 1000:>7.1f} ms   (at {at * 1000:.0f} ms)")
+            previous = at
+        if self.jobs:
+            total = sum(seconds for _, seconds in self.jobs.values())
+            done = "" if self.warm_up_done is None else f", done at {self.warm_up_done * 1000:.0f} ms"
+            lines.append(f"{'warm-up':<20} {total * 1000:>7.1f} ms   (behind the start screen{done})")
+            for kind, (count, seconds) in sorted(self.jobs.items(), key=lambda item: -item[1][1]):
+                lines.append(f"  {kind:<18} {seconds * 1000:>7.1f} ms   ({count} job{'s' * (count != 1)})")
+        return "\n".join(lines)
+
+
+STARTUP = StartupTimer()
+
+
+# Queue of small setup jobs (cache warm-up, the next game's background) to
+# run one at a time, e.g. between events while a menu waits, so none of them
+# delays a frame for long. Results are kept by job name.
+class WarmUp:
+    def __init__(self, timer=STARTUP):
+        self.timer = timer
+        self.jobs = deque()  # (name, callable)
+        self.results = {}
+
+    def add(self, name, job):
+        self.jobs.append((name, job))
+
+    def step(self):
+        # Runs the next job; returns whether any are left
+        if self.jobs:
+            name, job = self.jobs.popleft()
+            start = self.timer.clock()
+            self.results[name] = job()
+            self.timer.record_job(name, self.timer.clock() - start)
+            if not self.jobs and self.timer.warm_up_done is None:
+                self.timer.warm_up_done = self.timer.clock() - self.timer.started
+        return bool(self.jobs)
+
+    def finish(self):
+        while self.step():
+            pass
@@ -0,0 +1,62 @@
+import random
+
+import numpy as np
+import pytest
+
+from collision import (VECTORIZED_MAX_PAIRS, SpatialHash, circle_point_pairs, find_hits, find_hits_arrays,
+                       find_hits_brute_force)
+
+WIDTH, HEIGHT = 800, 600
+
+
+def random_scene(rng, num_bullets, num_debris, width=WIDTH, height=HEIGHT):
+    # Bullets as (x, y) and debris as (center x, center y, radius), laid out like the game's
+    bullets = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(num_bullets)]
+    debris = []
+    for _ in range(num_debris):
+        size = rng.randint(25, 40)
+        debris.append((rng.randint(0, width - size) + size // 2, rng.uniform(-size, height) + size // 2, size // 2))
+    return bullets, debris
+
+
+def as_arrays(bullets, debris):
+    points_x, points_y = np.array(bullets, dtype=float).reshape(-1, 2).T
+    centers_x, centers_y, radii = np.array(debris, dtype=float).reshape(-1, 3).T
+    return points_x, points_y, centers_x, centers_y, radii
+
+
+def test_spatial_hash_and_vectorized_match_brute_force():
+    rng = random.Random(1)
+    grid = SpatialHash()
+    for _ in range(300):
+        bullets, debris = random_scene(rng, rng.randint(0, 200), rng.randint(0, 200))
+        expected = find_hits_brute_force(bullets, debris)
+        assert find_hits(bullets, debris, grid) == expected
+        assert find_hits_arrays(*as_arrays(bullets, debris)) == expected
+
+
+@pytest.mark.parametrize("width, height", [(WIDTH, HEIGHT), (200, 150)])
+def test_fallback_past_pair_limit_matches_brute_force(width, height):
+    # Over VECTORIZED_MAX_PAIRS combinations find_hits_arrays hands off to the
+    # spatial hash; the small field crowds many bullets into each circle
+    rng = random.Random(2)
+    for _ in range(5):
+        num_bullets = rng.randint(260, 400)
+        num_debris = rng.randint(260, 400)
+        assert num_bullets * num_debris > VECTORIZED_MAX_PAIRS
+        bullets, debris = random_scene(rng, num_bullets, num_debris, width, height)
+        expected = find_hits_brute_force(bullets, debris)
+        assert expected
+        assert find_hits_arrays(*as_arrays(bullets, debris)) == expected
+
+
+def test_chunked_pairs_match_one_chunk():
+    bullets, debris = random_scene(random.Random(3), 150, 120, 300, 200)
+    arrays = as_arrays(bullets, debris)
+    assert circle_point_pairs(*arrays, chunk_cells=7) == circle_point_pairs(*arrays)
+
+
+def test_empty_scenes():
+    bullets, debris = random_scene(random.Random(4), 5, 5)
+    assert find_hits([], debris) == find_hits(bullets, []) == []
+    assert find_hits_arrays(*as_arrays([], debris)) == find_hits_arrays(*as_arrays(bullets, [])) == []
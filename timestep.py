@@ -0,0 +1,65 @@
+import time
+from collections import deque
+
+
+# Accumulator loop: the simulation advances in fixed ticks no matter how
+# often frames are rendered. alpha is how far the renderer is between the
+# previous tick and the current one.
+class FixedTimestep:
+    def __init__(self, tick_rate=60, max_ticks_per_frame=5, clock=time.perf_counter):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last = None
+        self.dropped_time = 0.0
+
+    def reset(self):
+        # Forget elapsed time, e.g. after a pause, so nothing is replayed
+        self.accumulator = 0.0
+        self.last = None
+
+    def advance(self):
+        now = self.clock()
+        if self.last is None:
+            self.last = now
+            return 0
+        self.accumulator += now - self.last
+        self.last = now
+
+        ticks = int(self.accumulator / self.dt)
+        if ticks > self.max_ticks_per_frame:
+            # Too far behind to catch up; slow down instead of spiraling
+            self.dropped_time += (ticks - self.max_ticks_per_frame) * self.dt
+            ticks = self.max_ticks_per_frame
+            self.accumulator = ticks * self.dt + self.accumulator % self.dt
+        self.accumulator -= ticks * self.dt
+        return ticks
+
+    @property
+    def alpha(self):
+        return min(1.0, self.accumulator / self.dt)
+
+
+# Events per second over a sliding window
+class RateCounter:
+    def __init__(self, window=1.0, clock=time.perf_counter):
+        self.window = window
+        self.clock = clock
+        self._times = deque()
+
+    def _expire(self, now):
+        times = self._times
+        while times and now - times[0] > self.window:
+            times.popleft()
+
+    def tick(self, count=1):
+        now = self.clock()
+        self._times.extend([now] * count)
+        self._expire(now)
+
+    @property
+    def rate(self):
+        self._expire(self.clock())
+        return len(self._times) / self.window
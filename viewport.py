@@ -0,0 +1,144 @@
+import math
+
+import pygame
+
+BORDER = (0, 0, 0)  # Letterbox color when the window aspect ratio differs
+
+
+def fit(size, bounds):
+    # Largest rect with the aspect ratio of `size`, centered in `bounds`
+    width, height = size
+    bounds_width, bounds_height = bounds
+    scale = min(bounds_width / width, bounds_height / height)
+    fitted = pygame.Rect(0, 0, max(1, round(width * scale)), max(1, round(height * scale)))
+    fitted.center = (bounds_width // 2, bounds_height // 2)
+    return fitted
+
+
+def scale_into(source, dest, smooth=True):
+    # smoothscale only handles 24 and 32 bit surfaces
+    if smooth and source.get_bitsize() in (24, 32) and dest.get_bitsize() in (24, 32):
+        pygame.transform.smoothscale(source, dest.get_size(), dest)
+    else:
+        pygame.transform.scale(source, dest.get_size(), dest)
+    return dest
+
+
+# Separates the logical play field (the coordinates the game simulates and
+# lays out in) from the window it is shown in. Frames are drawn into
+# `canvas`, which is the logical size times render_scale, and scaled to
+# fit the window with the aspect ratio kept. Drawing cost depends only on
+# the canvas: a 0.5 scale cuts fill work to a quarter, and a large or
+# fullscreen window costs one scale call per frame instead of more sprite
+# pixels. When the canvas would match the window exactly it is the window
+# surface itself, so the default setup pays no extra copy.
+class Viewport:
+    def __init__(self, logical_size, render_scale=1.0, smooth=True):
+        if render_scale <= 0:
+            raise ValueError("render_scale must be positive")
+        self.logical_size = tuple(logical_size)
+        self.render_scale = render_scale
+        self.size = tuple(max(1, round(side * render_scale)) for side in self.logical_size)
+        self.smooth = smooth  # smoothscale when scaling, else nearest neighbour
+        self.fullscreen = False
+        self.vsync = False
+        self.canvas = None
+        self.target = None  # Window area the canvas is scaled into
+        self.resizes = 0
+        self._window = None
+        self._window_size = None
+        self._scaled_canvas = None
+
+    @property
+    def direct(self):
+        # True when the canvas is the window surface
+        return self.canvas is not None and self.canvas is self._window
+
+    def open(self, fullscreen=False, vsync=False):
+        self.fullscreen = fullscreen
+        self.vsync = vsync
+        if vsync:
+            # pygame only honours vsync for SCALED or OpenGL windows; SDL
+            # then stretches the logical-size window surface on the GPU
+            flags = pygame.SCALED | pygame.RESIZABLE | (pygame.FULLSCREEN if fullscreen else 0)
+            pygame.display.set_mode(self.logical_size, flags, vsync=1)
+        elif fullscreen:
+            pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            pygame.display.set_mode(self.logical_size, pygame.RESIZABLE)
+        self.sync()
+        return self.canvas
+
+    def toggle_fullscreen(self):
+        if self.vsync:
+            pygame.display.toggle_fullscreen()
+            self.fullscreen = not self.fullscreen
+        else:
+            self.open(not self.fullscreen)
+        self.sync()
+
+    def sync(self):
+        # Re-fit to the current window. Returns True when the layout changed,
+        # i.e. the window and possibly the canvas need a full redraw.
+        window = pygame.display.get_surface()
+        if window is None:
+            return False
+        if window is self._window and window.get_size() == self._window_size:
+            return False
+        self._window = window
+        self._window_size = window.get_size()
+        self.target = fit(self.logical_size, self._window_size)
+        if self._window_size == self.size:
+            self.canvas = window
+        else:
+            if self._scaled_canvas is None:
+                self._scaled_canvas = pygame.Surface(self.size).convert(window)
+            self.canvas = self._scaled_canvas
+            window.fill(BORDER)
+        self.resizes += 1
+        return True
+
+    def window_rect(self, rect):
+        # Window pixels covered by a canvas rect, padded for smoothscale bleed
+        target = self.target
+        scale_x = target.width / self.size[0]
+        scale_y = target.height / self.size[1]
+        pad = 1 if self.smooth else 0
+        left = target.x + int(rect.x * scale_x) - pad
+        top = target.y + int(rect.y * scale_y) - pad
+        right = target.x + math.ceil(rect.right * scale_x) + pad
+        bottom = target.y + math.ceil(rect.bottom * scale_y) + pad
+        return pygame.Rect(left, top, right - left, bottom - top).clip(target)
+
+    def present(self, rects=None):
+        # Show the canvas; rects (canvas coordinates) limits the window update
+        # to those areas. Scaling always covers the whole canvas, so rects
+        # only save the push to the display.
+        if self.direct:
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+            return
+        scale_into(self.canvas, self._window.subsurface(self.target), self.smooth)
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update([self.window_rect(rect) for rect in rects])
+
+    def show(self, frame):
+        # Show a logical-size frame (menus) scaled to the window
+        self.sync()
+        window = self._window
+        if frame.get_size() == window.get_size():
+            window.blit(frame, (0, 0))
+        else:
+            window.fill(BORDER)
+            scale_into(frame, window.subsurface(self.target), self.smooth)
+        pygame.display.flip()
+
+    def snapshot(self):
+        # Logical-size copy of the last canvas, e.g. behind a menu
+        if self.size == self.logical_size:
+            return self.canvas.copy()
+        return scale_into(self.canvas, pygame.Surface(self.logical_size).convert(self.canvas), self.smooth)